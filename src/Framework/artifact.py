@@ -0,0 +1,94 @@
+from Framework.transpile_cache import TRANSPILE_CACHE, backend_name
+
+# qiskit is imported where used, so that importing the generator stays cheap
+
+
+class CircuitArtifact:
+    """
+    A circuit produced by the generator, kept in memory so that drawing, simulating or
+    exporting it does not go through QASM text and back.
+
+    The QASM is serialized on first access and the circuit is parsed on first access when
+    the artifact was built from QASM (e.g. served from the result cache). Transpiled circuits
+    are taken from a TranspileCache, shared by default, and kept per backend, optimization
+    level and measurement.
+
+    Parameters
+    ----------
+    circuit: the QuantumCircuit, None if only its QASM is known
+    qasm: its QASM 2.0 text, None to serialize the circuit when asked
+    serializer: function returning the QASM of the circuit, `qasm2.dumps(circuit)` by default
+    parameterized / parameter_values: the parameterized circuit `circuit` was bound from and
+        the values bound, when known the parameterized circuit is transpiled instead, once
+        for all the values
+    """
+
+    def __init__(self, circuit=None, qasm: str = None, serializer=None, parameterized=None, parameter_values=None):
+        if circuit is None and qasm is None:
+            raise ValueError("A circuit artifact needs a circuit or its QASM")
+        self._circuit = circuit
+        self._qasm = qasm
+        self._serializer = serializer
+        self._parameterized = parameterized
+        self._parameter_values = parameter_values
+        self._transpiled = {}
+
+    @property
+    def circuit(self):
+        if self._circuit is None:
+            from qiskit import qasm2
+            self._circuit = qasm2.loads(self._qasm, custom_instructions=qasm2.LEGACY_CUSTOM_INSTRUCTIONS)
+        return self._circuit
+
+    @property
+    def qasm(self) -> str:
+        if self._qasm is None:
+            if self._serializer is not None:
+                self._qasm = self._serializer()
+            else:
+                from qiskit import qasm2
+                self._qasm = qasm2.dumps(self._circuit)
+        return self._qasm
+
+    @property
+    def has_circuit(self):
+        """True if the QuantumCircuit is in memory, i.e. reading `circuit` does not parse QASM."""
+        return self._circuit is not None
+
+    def matches(self, qasm):
+        """True if `qasm` is the QASM of this artifact, without serializing it."""
+        return self._qasm is not None and self._qasm.strip() == qasm.strip()
+
+    @property
+    def num_qubits(self):
+        return self.circuit.num_qubits
+
+    def depth(self):
+        return self.circuit.depth()
+
+    def transpiled(self, backend=None, optimization_level=1, measure=False, cache=None):
+        """
+        The circuit transpiled for `backend` (None for no particular backend), computed once.
+
+        Parameters
+        ----------
+        measure: measure every qubit at the end, as needed by backends returning counts
+        cache: TranspileCache to look the circuit up in, TRANSPILE_CACHE by default
+        """
+        key = (backend_name(backend), optimization_level, measure)
+        compiled = self._transpiled.get(key)
+        if compiled is None:
+            cache = cache if cache is not None else TRANSPILE_CACHE
+            if self._parameterized is not None:
+                compiled = cache.bind(self._parameterized, self._parameter_values, backend=backend,
+                                      optimization_level=optimization_level, measure=measure)
+            else:
+                compiled = cache.get(self.circuit, backend=backend, optimization_level=optimization_level,
+                                     measure=measure)
+            self._transpiled[key] = compiled
+        return compiled
+
+    def __repr__(self):
+        return (f'CircuitArtifact(parsed={self._circuit is not None}, serialized={self._qasm is not None}, '
+                f'transpiled={len(self._transpiled)})')
+
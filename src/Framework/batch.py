@@ -0,0 +1,190 @@
+"""
+Batch mode for QASMGenerator: fan classical codes out over a process pool and stream the
+results back as they complete.
+
+Command line usage (from the `src` directory)::
+
+    python -m Framework.batch codes.jsonl --output results.jsonl --workers 32
+
+The input is either a JSON-lines file with one {"id": ..., "classical_code": ...} object per
+line, a directory of `.py` files, or `-` to read JSON lines from stdin. Inputs are read lazily
+and at most `max_pending` codes are in flight, so large batches are never held in memory.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from concurrent.futures.process import BrokenProcessPool
+
+# one generator per worker process, created on its first job
+_generator = None
+# whether the generators of this worker plot solutions, set by `_init_worker`
+_render_images = True
+
+
+def _init_worker(render_images):
+    global _render_images
+    _render_images = render_images
+
+
+def _get_generator():
+    global _generator
+    if _generator is None:
+        from Framework.generator import QASMGenerator
+        _generator = QASMGenerator(render_images=_render_images)
+    return _generator
+
+
+def _generate_one(index, item_id, classical_code):
+    start = time.perf_counter()
+    record = {'index': index, 'id': item_id, 'problem_type': None,
+              'qasm_codes': {}, 'img_ios': {}, 'error': None}
+    generator = None
+    try:
+        generator = _get_generator()
+        qasm_codes, img_ios = generator.qasm_generate(classical_code, verbose=False)
+        record['qasm_codes'] = qasm_codes
+        record['img_ios'] = img_ios
+    except Exception as e:
+        record['error'] = f'{type(e).__name__}: {e}'
+        record['traceback'] = traceback.format_exc()
+    timings = {}
+    if generator is not None:
+        timings.update(generator.timings)
+        if generator.problem_type is not None:
+            record['problem_type'] = generator.problem_type.name
+    timings['total'] = time.perf_counter() - start
+    record['timings'] = timings
+    return record
+
+
+def _items(codes):
+    """Normalize the accepted inputs into (index, id, classical_code) triples, lazily."""
+    for index, item in enumerate(codes):
+        if isinstance(item, str):
+            yield index, index, item
+        elif isinstance(item, dict):
+            yield index, item.get('id', index), item['classical_code']
+        else:
+            item_id, classical_code = item
+            yield index, item_id, classical_code
+
+
+def qasm_generate_batch(codes, workers=None, callback=None, max_pending=None, render_images=True):
+    """
+    Run `QASMGenerator.qasm_generate` on every classical code of `codes` using a process pool.
+
+    Parameters
+    ----------
+    codes: iterable of classical code strings, (id, code) pairs or {"id", "classical_code"} dicts.
+        It is consumed lazily.
+    workers: number of worker processes, defaults to the number of cpus
+    callback: optional function called with every result record as soon as it completes
+    max_pending: maximum number of codes submitted but not yet completed, defaults to 2 * workers
+    render_images: if False, the workers skip the solution plots and `img_ios` stays empty
+
+    Returns
+    -------
+    generator of result records, in completion order. A record holds `index`, `id`,
+    `problem_type`, `qasm_codes`, `img_ios`, `timings` (seconds per stage plus `total`) and
+    `error`, which is None unless this item failed. A failing item never stops the batch.
+    """
+    workers = workers or os.cpu_count() or 1
+    max_pending = max_pending or 2 * workers
+
+    def new_executor():
+        return ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(render_images,))
+
+    executor = new_executor()
+    pending = {}
+
+    def submit(item):
+        nonlocal executor
+        try:
+            future = executor.submit(_generate_one, *item)
+        except BrokenProcessPool:
+            # a worker died (e.g. killed by the OOM killer), start over with a fresh pool
+            executor.shutdown(wait=False, cancel_futures=True)
+            executor = new_executor()
+            future = executor.submit(_generate_one, *item)
+        pending[future] = item
+
+    def collect(return_when):
+        done, _ = wait(pending, return_when=return_when)
+        for future in done:
+            index, item_id, _ = pending.pop(future)
+            try:
+                record = future.result()
+            except Exception as e:
+                record = {'index': index, 'id': item_id, 'problem_type': None,
+                          'qasm_codes': {}, 'img_ios': {}, 'timings': {},
+                          'error': f'{type(e).__name__}: {e}'}
+            if callback is not None:
+                callback(record)
+            yield record
+
+    try:
+        for item in _items(codes):
+            submit(item)
+            if len(pending) >= max_pending:
+                yield from collect(FIRST_COMPLETED)
+        while pending:
+            yield from collect(FIRST_COMPLETED)
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def read_codes(path):
+    """Lazily read batch inputs from a JSON-lines file, a directory of .py files or stdin ('-')."""
+    if path == '-':
+        for line in sys.stdin:
+            if line.strip():
+                yield json.loads(line)
+    elif os.path.isdir(path):
+        for name in sorted(os.listdir(path)):
+            if name.endswith('.py'):
+                with open(os.path.join(path, name)) as f:
+                    yield {'id': name, 'classical_code': f.read()}
+    else:
+        with open(path) as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description="Generate QASM for a batch of classical codes.")
+    arg_parser.add_argument('input', help="JSON-lines file, directory of .py files or '-' for stdin")
+    arg_parser.add_argument('-o', '--output', default='-', help="JSON-lines output file, stdout by default")
+    arg_parser.add_argument('-w', '--workers', type=int, default=None, help="number of worker processes")
+    arg_parser.add_argument('--no-images', action='store_true',
+                            help="skip the solution plots and drop img_ios from the output")
+    args = arg_parser.parse_args(argv)
+
+    out = sys.stdout if args.output == '-' else open(args.output, 'w')
+    count = failures = 0
+    stage_totals = {}
+    try:
+        for record in qasm_generate_batch(read_codes(args.input), workers=args.workers,
+                                          render_images=not args.no_images):
+            count += 1
+            failures += record['error'] is not None
+            for stage, seconds in record['timings'].items():
+                stage_totals[stage] = stage_totals.get(stage, 0.0) + seconds
+            if args.no_images:
+                record.pop('img_ios')
+            out.write(json.dumps(record) + '\n')
+            out.flush()
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    means = ', '.join(f'{stage}={seconds / count:.3f}s' for stage, seconds in stage_totals.items()) if count else ''
+    print(f'{count} codes, {failures} failed. mean timings: {means}', file=sys.stderr)
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
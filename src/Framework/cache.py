@@ -0,0 +1,264 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+
+import networkx as nx
+import numpy as np
+
+# bump whenever the generator output for the same problem changes
+CACHE_VERSION = 1
+
+
+def canonicalize(value):
+    """
+    Convert parsed problem data into a JSON-serializable form that does not depend on how
+    the classical code was written (formatting, variable names, int vs float literals...).
+
+    Parameters
+    ----------
+    value: parser data, e.g. networkx graph, numpy array, CNF clause list or dict of operands
+
+    Returns
+    -------
+    A structure made of lists, dicts, strings and numbers.
+    """
+    if isinstance(value, nx.Graph):
+        edges = []
+        for u, v, attrs in value.edges(data=True):
+            if not value.is_directed():
+                u, v = sorted((u, v), key=repr)
+            edges.append([canonicalize(u), canonicalize(v), canonicalize(attrs.get('weight', 1))])
+        edges.sort(key=repr)
+        isolated = sorted((canonicalize(n) for n in value.nodes if value.degree(n) == 0), key=repr)
+        return {'graph': edges, 'isolated': isolated, 'directed': value.is_directed()}
+    if isinstance(value, np.ndarray):
+        if value.dtype.kind in 'biuf':
+            value = value.astype(np.float64)
+        digest = hashlib.sha256(np.ascontiguousarray(value).tobytes()).hexdigest()
+        return {'ndarray': digest, 'shape': list(value.shape), 'dtype': value.dtype.str}
+    if isinstance(value, np.generic):
+        return canonicalize(value.item())
+    if isinstance(value, bool) or value is None or isinstance(value, str):
+        return value
+    if isinstance(value, float):
+        return int(value) if value.is_integer() else value
+    if isinstance(value, int):
+        return value
+    if isinstance(value, complex):
+        return {'complex': [canonicalize(value.real), canonicalize(value.imag)]}
+    if isinstance(value, dict):
+        return {str(k): canonicalize(v) for k, v in sorted(value.items(), key=lambda kv: repr(kv[0]))}
+    if isinstance(value, (list, tuple)):
+        return [canonicalize(v) for v in value]
+    return repr(value)
+
+
+def problem_key(problem_type, specific_problem=None, data=None, extra=None):
+    """
+    Content-addressed key of a parsed problem.
+
+    Parameters
+    ----------
+    problem_type: ProblemType detected by the parser
+    specific_problem: specific graph problem / arithmetic operation, if any
+    data: parser data
+    extra: any additional generator setting that changes the output
+
+    Returns
+    -------
+    str: hex sha256 digest
+    """
+    payload = [CACHE_VERSION,
+               getattr(problem_type, 'name', problem_type),
+               specific_problem,
+               canonicalize(data),
+               canonicalize(extra)]
+    encoded = json.dumps(payload, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(encoded.encode('utf-8')).hexdigest()
+
+
+class MemoryBackend:
+    """In-process LRU store bounded by number of entries and total payload size."""
+
+    def __init__(self, max_entries=128, max_bytes=64 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._size = 0
+
+    def get(self, key):
+        payload = self._entries.get(key)
+        if payload is not None:
+            self._entries.move_to_end(key)
+        return payload
+
+    def put(self, key, payload):
+        if key in self._entries:
+            self._size -= len(self._entries.pop(key))
+        if len(payload) > self.max_bytes:
+            return
+        self._entries[key] = payload
+        self._size += len(payload)
+        while len(self._entries) > self.max_entries or self._size > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self._size -= len(evicted)
+
+    def clear(self):
+        self._entries.clear()
+        self._size = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class DiskBackend:
+    """
+    One file per entry under `directory`, LRU order taken from file modification times so
+    that it survives restarts. Reads refresh the modification time. Entries are looked up by
+    file name and the bounds are enforced on the directory listing, so several processes
+    can share the directory: each sees the entries the others write.
+    """
+    suffix = '.json'
+
+    def __init__(self, directory, max_entries=1024, max_bytes=512 * 1024 * 1024):
+        self.directory = directory
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        os.makedirs(directory, exist_ok=True)
+        self._evict()
+
+    def _path(self, key):
+        return os.path.join(self.directory, key + self.suffix)
+
+    def _listing(self):
+        """(modification time, key, size) of the entries in the directory, oldest first."""
+        files = []
+        with os.scandir(self.directory) as entries:
+            for entry in entries:
+                if not entry.name.endswith(self.suffix):
+                    continue
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    # removed by another process in the meantime
+                    continue
+                files.append((stat.st_mtime_ns, entry.name[:-len(self.suffix)], stat.st_size))
+        files.sort()
+        return files
+
+    def get(self, key):
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                payload = f.read()
+        except OSError:
+            return None
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return payload
+
+    def put(self, key, payload):
+        if len(payload) > self.max_bytes:
+            return
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        with os.fdopen(fd, 'wb') as f:
+            f.write(payload)
+        os.replace(tmp_path, self._path(key))
+        self._evict()
+
+    def _evict(self):
+        files = self._listing()
+        count = len(files)
+        size = sum(file_size for _, _, file_size in files)
+        for _, key, file_size in files:
+            if count <= self.max_entries and size <= self.max_bytes:
+                break
+            try:
+                os.remove(self._path(key))
+            except OSError:
+                pass
+            count -= 1
+            size -= file_size
+
+    def clear(self):
+        for _, key, _ in self._listing():
+            try:
+                os.remove(self._path(key))
+            except OSError:
+                pass
+
+    def __len__(self):
+        return len(self._listing())
+
+
+class ResultCache:
+    """
+    Cache of `QASMGenerator.qasm_generate` outputs keyed on the parsed problem rather than
+    on the raw source text. A memory LRU sits in front of an optional on-disk store.
+
+    Parameters
+    ----------
+    directory: where to persist entries, None keeps the cache in memory only
+    max_entries: bound on the number of entries kept in memory
+    max_bytes: bound on the payload size kept in memory
+    disk_max_entries / disk_max_bytes: bounds of the on-disk store
+    """
+
+    def __init__(self, directory=None, max_entries=128, max_bytes=64 * 1024 * 1024,
+                 disk_max_entries=1024, disk_max_bytes=512 * 1024 * 1024):
+        self._memory = MemoryBackend(max_entries=max_entries, max_bytes=max_bytes)
+        self._disk = None
+        if directory is not None:
+            self._disk = DiskBackend(directory, max_entries=disk_max_entries, max_bytes=disk_max_bytes)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key_for(parser, extra=None):
+        """Key of a parsed problem, None if the problem cannot be cached (data only known at run time)."""
+        if parser is None or parser.problem_type is None or parser.data is None:
+            return None
+        specific = parser.specific_graph_problem or parser.specific_arithmetic_operation
+        return problem_key(parser.problem_type, specific, parser.data, extra)
+
+    def get(self, key):
+        """Return `(qasm_codes, img_ios)` stored under `key` or None."""
+        with self._lock:
+            payload = self._memory.get(key)
+            if payload is None and self._disk is not None:
+                payload = self._disk.get(key)
+                if payload is not None:
+                    self._memory.put(key, payload)
+            if payload is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        entry = json.loads(payload)
+        return entry['qasm_codes'], entry['img_ios']
+
+    def put(self, key, qasm_codes, img_ios):
+        payload = json.dumps({'qasm_codes': qasm_codes, 'img_ios': img_ios}).encode('utf-8')
+        with self._lock:
+            self._memory.put(key, payload)
+            if self._disk is not None:
+                self._disk.put(key, payload)
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+            if self._disk is not None:
+                self._disk.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self):
+        return {'hits': self.hits,
+                'misses': self.misses,
+                'memory_entries': len(self._memory),
+                'disk_entries': len(self._disk) if self._disk is not None else 0}
@@ -0,0 +1,203 @@
+"""
+Data files referenced by the parsed code instead of inline literals, e.g.::
+
+    G = nx.read_weighted_edgelist('graphs/g.txt')
+    matrix = np.load('hamiltonians/h2.npy')
+    elist, num_nodes, num_edges = read_gset_file('gset/G1')
+
+The visitor records such loader calls as `DataReference`s and `ProblemParser.extract_data`
+loads the ones it needs. Paths are resolved against the data directory of the parser and
+may not leave it. `.npy` arrays are memory-mapped read-only and never unpickled, and graphs
+are built from the edge arrays of one bulk parse rather than line by line, with int nodes
+when the labels are numbers.
+"""
+import ast
+import os
+
+import networkx as nx
+import numpy as np
+
+from src.classiq_exceptions import DataReferenceError
+
+# dotted name of a loader call -> kind of the file it reads
+DATA_LOADERS = {
+    'np.load': 'npy', 'numpy.load': 'npy',
+    'np.loadtxt': 'text', 'numpy.loadtxt': 'text',
+    'nx.read_edgelist': 'edgelist', 'networkx.read_edgelist': 'edgelist', 'read_edgelist': 'edgelist',
+    'nx.read_weighted_edgelist': 'weighted_edgelist', 'networkx.read_weighted_edgelist': 'weighted_edgelist',
+    'read_weighted_edgelist': 'weighted_edgelist',
+}
+# loaders recognized whatever module they are called from
+GRAPH_FILE_LOADERS = {'read_gset_file': 'gset', 'load_gset': 'gset', 'load_tsplib': 'tsplib'}
+GRAPH_KINDS = frozenset(['edgelist', 'weighted_edgelist', 'gset', 'tsplib'])
+# keyword arguments passed on to the loaders when given as constants
+LOADER_OPTIONS = frozenset(['delimiter', 'comments', 'skiprows'])
+_PATH_KEYWORDS = ('file', 'fname', 'path', 'filepath', 'filename')
+
+
+class DataReference:
+    """
+    A loader call of the parsed code, with a constant path.
+
+    Attributes
+    ----------
+    kind: 'npy', 'text', 'edgelist', 'weighted_edgelist', 'gset' or 'tsplib'
+    path: path as written in the code, relative to the data directory
+    options: constant keyword arguments of the call among LOADER_OPTIONS
+    """
+    __slots__ = ('kind', 'path', 'options')
+
+    def __init__(self, kind, path, options=None):
+        self.kind = kind
+        self.path = path
+        self.options = options or {}
+
+    @property
+    def key(self):
+        return self.kind, self.path, tuple(sorted(self.options.items()))
+
+    def __repr__(self):
+        return f"DataReference({self.kind}, {self.path!r})"
+
+
+def _dotted_name(node):
+    if isinstance(node, ast.Name):
+        return node.id
+    if isinstance(node, ast.Attribute):
+        value = _dotted_name(node.value)
+        return f"{value}.{node.attr}" if value else node.attr
+    return None
+
+
+def data_reference(node):
+    """DataReference of a loader call node with a constant path, None for any other node."""
+    if not isinstance(node, ast.Call):
+        return None
+    name = _dotted_name(node.func)
+    if name is None:
+        return None
+    keywords = {keyword.arg: keyword.value for keyword in node.keywords if keyword.arg is not None}
+    path = node.args[0] if node.args else next((keywords[key] for key in _PATH_KEYWORDS if key in keywords), None)
+    if not (isinstance(path, ast.Constant) and isinstance(path.value, str)):
+        return None
+    kind = DATA_LOADERS.get(name) or GRAPH_FILE_LOADERS.get(name.rpartition('.')[2])
+    if path.value.lower().endswith('.tsp'):
+        # TSPLIB instances whatever the library reading them (tsplib95.load, ...)
+        kind = 'tsplib'
+    if kind is None:
+        return None
+    options = {key: value.value for key, value in keywords.items()
+               if key in LOADER_OPTIONS and isinstance(value, ast.Constant)}
+    return DataReference(kind, path.value, options)
+
+
+def resolve_path(data_dir, path):
+    """
+    Absolute path of a referenced file, which must be inside `data_dir` once symbolic links
+    are followed.
+
+    Raises
+    ------
+    DataReferenceError: no data directory is configured, the path leaves it or the file is missing
+    """
+    if data_dir is None:
+        raise DataReferenceError(path, "No data directory is configured to load the referenced file.")
+    root = os.path.realpath(data_dir)
+    resolved = os.path.realpath(os.path.join(root, path))
+    if os.path.commonpath([root, resolved]) != root:
+        raise DataReferenceError(path, "The referenced file is outside of the data directory.")
+    if not os.path.isfile(resolved):
+        raise DataReferenceError(path, "The referenced file does not exist in the data directory.")
+    return resolved
+
+
+def graph_from_arrays(sources, targets, weights=None):
+    """networkx graph of edge arrays, weight 1 for every edge when `weights` is None."""
+    weights = np.ones(len(sources)) if weights is None else np.asarray(weights, dtype=float)
+    graph = nx.Graph()
+    graph.add_weighted_edges_from(zip(np.asarray(sources).tolist(), np.asarray(targets).tolist(), weights.tolist()))
+    return graph
+
+
+def graph_from_rows(rows):
+    """networkx graph of an (m, 2) or (m, 3) array of (u, v) or (u, v, weight) rows with integer nodes."""
+    rows = np.asarray(rows)
+    if rows.ndim != 2 or rows.shape[1] < 2:
+        raise ValueError(f"Edges are (u, v) or (u, v, weight) rows, got an array of shape {rows.shape}")
+    nodes = rows[:, :2]
+    if nodes.dtype.kind == 'f':
+        if not np.array_equal(nodes, np.round(nodes)):
+            raise ValueError("Edge rows must hold integer nodes")
+        nodes = nodes.astype(np.int64)
+    return graph_from_arrays(nodes[:, 0], nodes[:, 1], rows[:, 2] if rows.shape[1] > 2 else None)
+
+
+def _load_npy(path, options):
+    array = np.load(path, mmap_mode='r', allow_pickle=False)
+    if isinstance(array, np.lib.npyio.NpzFile):
+        # archives are not mapped, the first array is read
+        with array:
+            return array[array.files[0]]
+    return array
+
+
+def _load_text(path, options):
+    return np.loadtxt(path, **options)
+
+
+def _load_edgelist(path, options, weighted=False):
+    """
+    Graph of an edge list file. Numeric node labels are read as ints, as `nodetype=int` would,
+    since the graph problems index their nodes 0..n-1; nx.read_edgelist called without it
+    keeps them as strings. A third column is the weight for read_weighted_edgelist only,
+    edges of read_edgelist all weigh 1.
+    """
+    try:
+        rows = np.loadtxt(path, ndmin=2, **options)
+        return graph_from_rows(rows if weighted else rows[:, :2])
+    except ValueError:
+        # node labels or edge attributes that are not numbers: the networkx reader handles them
+        reader = nx.read_weighted_edgelist if weighted else nx.read_edgelist
+        return reader(path, **{key: value for key, value in options.items() if key != 'skiprows'})
+
+
+def _load_gset(path, options):
+    from src.applications.graph.gset import load_gset
+    return load_gset(path)
+
+
+def _load_tsplib(path, options):
+    from src.applications.graph.gset import load_tsplib
+    return load_tsplib(path)
+
+
+_LOADERS = {
+    'npy': _load_npy,
+    'text': _load_text,
+    'edgelist': _load_edgelist,
+    'weighted_edgelist': lambda path, options: _load_edgelist(path, options, weighted=True),
+    'gset': _load_gset,
+    'tsplib': _load_tsplib,
+}
+
+
+def load_reference(reference, data_dir):
+    """
+    Load a referenced file from `data_dir`.
+
+    Returns
+    -------
+    read-only memmap for .npy files, ndarray for .npz and text arrays, networkx graph for
+    edge lists (int nodes when the labels are numbers, see `_load_edgelist`), gset.EdgeList
+    for Gset and TSPLIB files
+
+    Raises
+    ------
+    DataReferenceError: see `resolve_path`, or the file cannot be read as its kind
+    """
+    path = resolve_path(data_dir, reference.path)
+    try:
+        return _LOADERS[reference.kind](path, reference.options)
+    except (OSError, ValueError, KeyError, TypeError) as error:
+        raise DataReferenceError(reference.path, f"Cannot load the referenced {reference.kind} file: {error}") \
+            from error
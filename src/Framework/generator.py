@@ -1,73 +1,139 @@
-import matplotlib.pyplot as plt
-from qiskit.circuit.library import TwoLocal
-from qiskit_algorithms import SamplingVQE
-from qiskit_algorithms.optimizers import SPSA
-from qiskit_optimization.converters import QuadraticProgramToQubo
-
-from src.applications.arithmetic.factorization import quantum_factor_mul_oracle
-from src.applications.graph.grover_applications.graph_oracle import independent_set_to_sat, \
-    cnf_to_quantum_oracle
-from src.applications.graph.grover_applications.grover_auxiliary import get_top_measurements, \
-    plot_triangle_finding, \
-    plot_multiple_graph_colorings, plot_multiple_independent_sets
-from src.applications.graph.ising_auxiliary import plot_first_valid_coloring_solutions
-from Framework.parser import ProblemParser, ProblemType
-from src.algorithms.vqe_algorithm import VQEAlgorithm
-from src.applications.quantum_machine_learning.quantum_kernel_ml import QMLKernel
-from qiskit import qasm2
-from qiskit.primitives import Estimator
-from qiskit.transpiler.preset_passmanagers import generate_preset_pass_manager
-from src.algorithms.grover import GroverWrapper
+import importlib
+import logging
 import os
 import tempfile
-from qiskit.circuit.library.phase_oracle import PhaseOracle
-from qiskit_aer import Aer
-from qiskit import transpile
-from openqaoa.problems import *
-from src.applications.graph.grover_applications.graph_color import GraphColor
-from src.applications.graph.graph_problem import GraphProblem
-from src.applications.graph.Ising import Ising
-from src.applications.graph.grover_applications.triangle_finding import TriangleFinding
-from src.applications.arithmetic.quantum_arithmetic import *
-from src.utils import *
-from qiskit.visualization import plot_histogram
-from src.Framework.interpreter import *
-from qiskit_optimization.algorithms import MinimumEigenOptimizer
-from qiskit_optimization.applications.tsp import Tsp
+from collections import OrderedDict
+
+from Framework.parser import ProblemParser, ProblemType
+from Framework.cache import ResultCache
+from Framework.batch import qasm_generate_batch
+from Framework.profiling import Profiler, NULL_PROFILER
+from Framework.artifact import CircuitArtifact
 
+# Backends are referenced as "module:attribute" and only imported once their problem type is
+# dispatched, so that e.g. an arithmetic request never loads openqaoa, pennylane or qiskit_aer.
 arithmetic_mapping = {
-    "Addition": [quantum_add],
-    "Subtraction": [quantum_subtract],
-    "Multiplication": [quantum_multiplication]
+    "Addition": ["src.applications.arithmetic.quantum_arithmetic:quantum_add"],
+    "Subtraction": ["src.applications.arithmetic.quantum_arithmetic:quantum_subtract"],
+    "Multiplication": ["src.applications.arithmetic.quantum_arithmetic:quantum_multiplication"]
 }
+ISING = "src.applications.graph.Ising:Ising"
+GRAPH_PROBLEM = "src.applications.graph.graph_problem:GraphProblem"
+GRAPH_COLOR = "src.applications.graph.grover_applications.graph_color:GraphColor"
+TRIANGLE_FINDING = "src.applications.graph.grover_applications.triangle_finding:TriangleFinding"
+TSP = "qiskit_optimization.applications.tsp:Tsp"
 algorithms_mapping = {
-    "Knapsack": [Knapsack],
-    "SlackFreeKnapsack": [SlackFreeKnapsack],
-    "MaximumCut": [Ising],
-    "MinimumVertexCover": [Ising],
-    "NumberPartition": [NumberPartition],
-    "ShortestPath": [Ising],
-    "TSP": [Ising],
-    "TSP_LP": [TSP_LP],
-    "PortfolioOptimization": [PortfolioOptimization],
-    "MIS": [Ising, GraphProblem],
-    "BinPacking": [BinPacking],
-    "VRP": [Ising],
-    "SK": [SK],
-    "BPSP": [BPSP],
-    "KColor": [Ising, GraphColor],
-    "FromDocplex2IsingModel": [FromDocplex2IsingModel],
-    "QUBO": [QUBO],
-    "Triangle": [TriangleFinding]
+    "Knapsack": ["openqaoa.problems:Knapsack"],
+    "SlackFreeKnapsack": ["openqaoa.problems:SlackFreeKnapsack"],
+    "MaximumCut": [ISING],
+    "MinimumVertexCover": [ISING],
+    "NumberPartition": ["openqaoa.problems:NumberPartition"],
+    "ShortestPath": [ISING],
+    "TSP": [ISING],
+    "TSP_LP": ["openqaoa.problems:TSP_LP"],
+    "PortfolioOptimization": ["openqaoa.problems:PortfolioOptimization"],
+    "MIS": [ISING, GRAPH_PROBLEM],
+    "BinPacking": ["openqaoa.problems:BinPacking"],
+    "VRP": [ISING],
+    "SK": ["openqaoa.problems:SK"],
+    "BPSP": ["openqaoa.problems:BPSP"],
+    "KColor": [ISING, GRAPH_COLOR],
+    "FromDocplex2IsingModel": ["openqaoa.problems:FromDocplex2IsingModel"],
+    "QUBO": ["openqaoa.problems:QUBO"],
+    "Triangle": [TRIANGLE_FINDING]
 }
 
+# artifacts of QASM strings handed to the simulators, most recently used last
+_PARSED_ARTIFACTS_SIZE = 16
+_parsed_artifacts = OrderedDict()
+
+
+def load_algorithm(reference):
+    """
+    Import the backend behind a registry entry.
+
+    Parameters
+    ----------
+    reference: "module:attribute" string of `algorithms_mapping` or `arithmetic_mapping`
+
+    Returns
+    -------
+    the class or function named by the reference
+    """
+    module_name, _, attribute = reference.partition(':')
+    return getattr(importlib.import_module(module_name), attribute)
+
 
 class QASMGenerator:
-    def __init__(self, args=None):
+    def __init__(self, args=None, cache: ResultCache = None, profile=False, log_spans=False, render_images=True,
+                 qaoa_parameters=None, presolve=False, data_dir=None, sandbox=None):
+        """
+        Parameters
+        ----------
+        cache: optional ResultCache serving problems already solved
+        profile: if True, the problem classes report their own spans (optimizer evaluations,
+            circuit stats...) under the generator stages, see `profile_report`
+        log_spans: if True, every closed span is logged as a JSON line to the
+            'Framework.generator' logger
+        render_images: if False, solution plots are skipped and `img_ios` is left empty
+        qaoa_parameters: optional src.algorithms.qaoa_parameters.ParameterStore shared by the
+            QAOA runs of graph problems, which then start from the angles of similar instances
+        presolve: if True, graph problems are reduced classically first (see
+            src.applications.graph.reduction) and each remaining connected component is solved
+            on its own, its circuits and images are then suffixed with '_<component index>'
+            when there are several, and a problem the rules solve entirely yields no circuit.
+            The reduction is kept in `self.reduction`, the solutions of the components are
+            lifted back to the original nodes in `self.solution` and plotted as the
+            'presolve' image
+        data_dir: directory of the data files the classical code may reference (np.load,
+            nx.read_edgelist, read_gset_file...), see `Framework.data_references`
+        sandbox: Framework.sandbox.SandboxPool running the classical code of machine learning
+            problems to get their training data, the shared `Framework.sandbox.SANDBOX` by default
+        """
         self.shots = 1024
         self.observable = None
         self.problem_type = None
         self.parser = None
+        # circuits of the last generate call, by name
+        self.artifacts = {}
+        self.cache = cache
+        self.profile = profile
+        self.log_spans = log_spans
+        self.render_images = render_images
+        self.qaoa_parameters = qaoa_parameters
+        self.presolve = presolve
+        self.data_dir = data_dir
+        self.sandbox = sandbox
+        self.reduction = None
+        # original node -> value of the presolved graph problem, None when not lifted
+        self.solution = None
+        # spans of the last qasm_generate call, the generator stages are always recorded
+        self.profiler = Profiler(logger=logging.getLogger(__name__) if log_spans else None)
+        # handed to the problem classes, whose spans are only recorded when profiling
+        self._problem_profiler = self.profiler if profile else NULL_PROFILER
+
+    @property
+    def timings(self):
+        """
+        Wall time in seconds spent in each stage of the last qasm_generate call: 'parse',
+        'import', 'model' (building the problem and its circuits), 'optimize' (running the
+        algorithm), 'plot' and 'export' (QASM dumps). 'solve' spans every stage after parsing.
+        When profiling, the spans of the problem classes are included too.
+        """
+        return self.profiler.totals()
+
+    def profile_report(self):
+        """
+        Spans of the last qasm_generate call.
+
+        Returns
+        -------
+        dict with the nested `spans` (name, wall and cpu seconds, counters, attributes,
+        children), the `timings` per span name and the `counters` summed per span
+        """
+        return {'spans': self.profiler.report(),
+                'timings': self.profiler.totals(),
+                'counters': self.profiler.counters()}
 
     def qasm_generate(self, classical_code, verbose=False):
         """
@@ -79,40 +145,139 @@ class QASMGenerator:
 
         Returns
         -------
+        qasm_codes, img_ios: dicts of qasm strings and base64 png images. When a result cache is
+        configured and not verbose, problems already solved (same parsed problem, whatever the
+        formatting or variable names of the classical code) are served from the cache.
+        """
+        artifacts, img_ios = self.generate(classical_code, verbose=verbose)
+        with self._stage('export'):
+            qasm_codes = {name: artifact.qasm for name, artifact in artifacts.items()}
+        return qasm_codes, img_ios
+
+    def generate(self, classical_code, verbose=False):
+        """
+        Like `qasm_generate`, but the circuits are returned as CircuitArtifact objects holding
+        the QuantumCircuit built by the solver. The QASM is only serialized when asked for, and
+        the artifacts of the last call are kept in `self.artifacts`, so that simulating one of
+        them with `run_qasm_simulator` or `run_qasm_aer` does not parse it again.
 
+        Returns
+        -------
+        artifacts, img_ios: dicts of CircuitArtifact and base64 png images
         """
-        self.__init__()
-        self.parser = ProblemParser()
-        self.parser.parse_code(classical_code)
+        self.__init__(cache=self.cache, profile=self.profile, log_spans=self.log_spans,
+                      render_images=self.render_images, qaoa_parameters=self.qaoa_parameters,
+                      presolve=self.presolve, data_dir=self.data_dir, sandbox=self.sandbox)
+        self.parser = ProblemParser(data_dir=self.data_dir)
+        with self._stage('parse') as span:
+            self.parser.parse_code(classical_code)
+            span.set(**self.parser.diagnostics)
         self.problem_type = self.parser.problem_type
-        qasm_codes = {}
+        artifacts = {}
         img_ios = {}
         if verbose:
             print(f'problem type: {self.parser.problem_type} data: {self.parser.data}')
-        if self.problem_type == ProblemType.EIGENVALUE:
+        cache_key = None
+        if self.cache is not None and not verbose:
+            # results without images or presolved are cached apart, they must not be served to other requests
+            extra = {}
+            if not self.render_images:
+                extra['images'] = False
+            if self.presolve:
+                extra['presolve'] = True
+            cache_key = self.cache.key_for(self.parser, extra=extra or None)
+            cached = self.cache.get(cache_key) if cache_key is not None else None
+            if cached is not None:
+                qasm_codes, img_ios = cached
+                if self.problem_type == ProblemType.EIGENVALUE:
+                    # run_qasm_simulator(primitive='estimator') measures it on the cached circuit
+                    from src.utils import decompose_into_pauli
+                    self.observable = decompose_into_pauli(self.parser.data)
+                self.artifacts = {name: CircuitArtifact(qasm=qasm) for name, qasm in qasm_codes.items()}
+                return self.artifacts, img_ios
+        with self._stage('solve'):
+            self._solve(classical_code, verbose, artifacts, img_ios)
+        self.artifacts = artifacts
+        if cache_key is not None:
+            with self._stage('export'):
+                qasm_codes = {name: artifact.qasm for name, artifact in artifacts.items()}
+            self.cache.put(cache_key, qasm_codes, img_ios)
+        return artifacts, img_ios
+
+    def qasm_generate_batch(self, codes, workers=None, callback=None):
+        """
+        Run `qasm_generate` over many classical codes on a process pool, see `Framework.batch`.
+        The workers render images as this generator does.
+
+        Returns
+        -------
+        generator of result records, in completion order
+        """
+        return qasm_generate_batch(codes, workers=workers, callback=callback, render_images=self.render_images)
+
+    def _stage(self, name):
+        return self.profiler.span(name)
+
+    def _solve(self, classical_code, verbose, artifacts, img_ios):
+        solvers = {
+            ProblemType.EIGENVALUE: self._solve_eigenvalue,
+            ProblemType.MACHINELEARNING: self._solve_machine_learning,
+            ProblemType.CNF: self._solve_cnf,
+            ProblemType.GRAPH: self._solve_graph,
+            ProblemType.ARITHMETICS: self._solve_arithmetic,
+            ProblemType.FACTOR: self._solve_factor,
+        }
+        solver = solvers.get(self.problem_type)
+        if solver is None:
+            raise ValueError("Unsupported problem type")
+        solver(classical_code, verbose, artifacts, img_ios)
+
+    def _solve_eigenvalue(self, classical_code, verbose, artifacts, img_ios):
+        with self._stage('import'):
+            from src.algorithms.vqe_algorithm import VQEAlgorithm
+            from src.utils import decompose_into_pauli, qubit_num
+        with self._stage('model'):
             self.observable = decompose_into_pauli(self.parser.data)
             algorithm = VQEAlgorithm(self.observable,
                                      qubit_num(len(self.parser.data[0])),
                                      reps=2)
-            algorithm.run(verbose=verbose)
-            qasm_codes['vqe'] = algorithm.export_to_qasm()
-        if self.problem_type == ProblemType.MACHINELEARNING:
-            local_vars = {}
-            exec(classical_code, {}, local_vars)
+        with self._stage('optimize'):
+            algorithm.run(verbose=verbose, profiler=self._problem_profiler)
+        with self._stage('export'):
+            artifacts['vqe'] = CircuitArtifact(algorithm.export_circuit(), parameterized=algorithm.ansatz,
+                                               parameter_values=algorithm.result.optimal_point)
+
+    def _solve_machine_learning(self, classical_code, verbose, artifacts, img_ios):
+        with self._stage('import'):
+            from src.applications.quantum_machine_learning.quantum_kernel_ml import QMLKernel
+            from Framework.sandbox import SANDBOX
+        with self._stage('model'):
+            # the classical code runs on a warm sandbox worker, away from this process
+            sandbox = self.sandbox if self.sandbox is not None else SANDBOX
+            local_vars = sandbox.run(classical_code, ('X_train', 'y_train', 'X_test', 'y_test'))
             # Variables from the classical code
             X_train = local_vars['X_train']
             y_train = local_vars['y_train']
             X_test = local_vars['X_test']
             y_test = local_vars['y_test']
 
-            qmlk = QMLKernel(locals()['X_train'], locals()['y_train'], locals()['X_test'], locals()['y_test'],
-                             model='svc')
-            qmlk.run()
-            if verbose:
+            qmlk = QMLKernel(X_train, y_train, X_test, y_test, model='svc')
+        with self._stage('optimize'):
+            qmlk.run(profiler=self._problem_profiler)
+        if verbose:
+            with self._stage('plot'):
                 qmlk.plot_data()
                 qmlk.show_result()
-            qasm_codes['qml'] = qmlk.generate_qasm()
-        if self.problem_type == ProblemType.CNF:
+        with self._stage('export'):
+            artifacts['qml'] = CircuitArtifact(qmlk.export_circuit())
+
+    def _solve_cnf(self, classical_code, verbose, artifacts, img_ios):
+        with self._stage('import'):
+            from qiskit.circuit.library.phase_oracle import PhaseOracle
+            from src.algorithms.grover import GroverWrapper
+            from src.algorithms.grover_iterations import count_cnf_solutions
+            from src.utils import generate_dimacs
+        with self._stage('model'):
             dimacs = generate_dimacs(self.parser.data)
             fp = tempfile.NamedTemporaryFile(mode="w+t", delete=False)
             fp.write(dimacs)
@@ -125,134 +290,316 @@ class QASMGenerator:
                 print(ex)
             finally:
                 os.remove(file_name)
-            wrapper = GroverWrapper(oracle, iterations=2, is_good_state=oracle.evaluate_bitstring)
-            wrapper.run(verbose=verbose)
-            qasm_codes['grover'] = wrapper.export_to_qasm()
-        if self.problem_type == ProblemType.GRAPH:
-            if verbose:
-                print(f'-------graph problem type:{self.parser.specific_graph_problem}--------')
-            algorithms = algorithms_mapping.get(self.parser.specific_graph_problem)
-            for algorithm in algorithms:
-                if verbose: print(algorithm)
-                if issubclass(algorithm, Ising):
-                    problem = Ising(self.parser.data, self.parser.specific_graph_problem)
-                    res = problem.run(verbose=verbose)
-                    solutions = res.most_probable_states.get('solutions_bitstrings')
-                    if verbose:
-                        if self.parser.specific_graph_problem == 'KColor':
-                            print(solutions)
-                            plot_first_valid_coloring_solutions(solutions, problem)
-                        else:
-                            problem.plot_graph_solution()
-                            plt.show()
-                    else:
-                        if self.parser.specific_graph_problem == 'KColor':
-                            plot_first_valid_coloring_solutions(solutions, problem)
-                            img_ios['qaoa'] = plot_gen_img_io()
-                        else:
-                            problem.plot_graph_solution()
-                            img_ios['qaoa'] = plot_gen_img_io()
-                    _, qasm_codes['qaoa'] = problem.generate_qasm()
-                elif issubclass(algorithm, TriangleFinding):
-                    problem = TriangleFinding(self.parser.data)
-                    res = problem.run(verbose=verbose)
-                    if verbose:
-                        top_measurements = get_top_measurements(res, 0.001, num=20)
-                        plot_triangle_finding(problem.graph(), top_measurements)
-                        plt.show()
-                    else:
-                        top_measurements = get_top_measurements(res, 0.001, num=20)
-                        plot_triangle_finding(problem.graph(), top_measurements)
-                        img_ios['grover'] = plot_gen_img_io()
-                    qasm_codes['grover'] = problem.export_to_qasm()
-                elif issubclass(algorithm, GraphColor):
-                    problem = GraphColor(self.parser.data)
-                    res = problem.run(verbose=verbose)
-                    if verbose:
-                        top_measurements = get_top_measurements(res, 0.001, num=20)
-                        plot_multiple_graph_colorings(problem.graph(), top_measurements, num_per_row=3)
-                        plt.show()
-                    else:
-                        top_measurements = get_top_measurements(res, 0.001, num=20)
-                        plot_multiple_graph_colorings(problem.graph(), top_measurements, num_per_row=3)
-                        img_ios['grover'] = plot_gen_img_io()
-                    qasm_codes['grover'] = problem.export_to_qasm()
-                elif issubclass(algorithm, GraphProblem):
-                    # only implement IS now...
-                    problem = GraphProblem(self.parser.data)
-                    independent_set_cnf = independent_set_to_sat(problem.graph())
-                    independent_set_oracle = cnf_to_quantum_oracle(independent_set_cnf)
-                    grover = GroverWrapper(oracle=independent_set_oracle,
-                                           iterations=1,
-                                           objective_qubits=list(range(problem.num_nodes)))
-                    res = grover.run(verbose=verbose)
-                    qasm_codes['grover'] = grover.export_to_qasm()
-                    if verbose:
-                        if self.parser.specific_graph_problem == 'MIS':
-                            top_is_measurements = get_top_measurements(res, num=100)
-                            plot_multiple_independent_sets(problem.graph(), top_is_measurements)
-                            plt.show()
+            # unknown past the limit, the wrapper then falls back to the BBHT schedule
+            num_solutions = count_cnf_solutions(self.parser.data, num_vars=oracle.num_qubits)
+            wrapper = GroverWrapper(oracle, is_good_state=oracle.evaluate_bitstring, num_solutions=num_solutions)
+        with self._stage('optimize'):
+            wrapper.run(verbose=verbose, profiler=self._problem_profiler)
+        with self._stage('export'):
+            artifacts['grover'] = CircuitArtifact(wrapper.circuit, serializer=wrapper.export_to_qasm)
+
+    def _solve_graph(self, classical_code, verbose, artifacts, img_ios):
+        problem_name = self.parser.specific_graph_problem
+        if verbose:
+            print(f'-------graph problem type:{problem_name}--------')
+        graphs = [self.parser.data]
+        if self.presolve:
+            with self._stage('presolve'):
+                from src.applications.graph.reduction import reduce_graph
+                self.reduction = reduce_graph(self.parser.data, problem_name)
+            graphs = self.reduction.subproblems
+            if verbose: print(self.reduction)
+        solutions = []
+        for index, graph in enumerate(graphs):
+            graph_artifacts, graph_img_ios = {}, {}
+            solutions.append(self._solve_graph_instance(graph, verbose, graph_artifacts, graph_img_ios))
+            suffix = f'_{index}' if len(graphs) > 1 else ''
+            artifacts.update({name + suffix: artifact for name, artifact in graph_artifacts.items()})
+            img_ios.update({name + suffix: img_io for name, img_io in graph_img_ios.items()})
+        if self.presolve:
+            self._lift_graph_solution(solutions, verbose, img_ios)
+
+    def _lift_graph_solution(self, solutions, verbose, img_ios):
+        """Solution of the presolved problem from those of its components, when each has one."""
+        from src.applications.graph.reduction import REDUCIBLE_PROBLEMS
+        if self.reduction.problem not in REDUCIBLE_PROBLEMS or any(solution is None for solution in solutions):
+            if verbose: print('no solution to lift for some component')
+            return
+        with self._stage('lift'):
+            self.solution = self.reduction.lift(solutions)
+        if verbose:
+            print(f'solution: {self.solution}')
+        if verbose or self.render_images:
+            with self._stage('plot'):
+                import matplotlib.pyplot as plt
+                from src.applications.graph.reduction import plot_lifted_solution
+                from src.utils import plot_gen_img_io
+                plot_lifted_solution(self.reduction, self.solution)
+                if verbose:
+                    plt.show()
+                else:
+                    img_ios['presolve'] = plot_gen_img_io()
+
+    def _solve_graph_instance(self, graph, verbose, artifacts, img_ios):
+        """
+        Run the algorithms of the graph problem on `graph`.
+
+        Returns
+        -------
+        dict node -> value of the first valid solution found (see
+        `src.applications.graph.reduction.is_solution`), None if there is none
+        """
+        from src.applications.graph.reduction import is_solution
+        problem_name = self.parser.specific_graph_problem
+        solution = None
+        for reference in algorithms_mapping.get(problem_name):
+            with self._stage('import'):
+                algorithm = load_algorithm(reference)
+            if verbose: print(algorithm)
+            candidates = []
+            if reference == ISING:
+                candidates = self._run_ising(algorithm, graph, verbose, artifacts, img_ios)
+            elif reference == TRIANGLE_FINDING:
+                self._run_triangle_finding(algorithm, graph, verbose, artifacts, img_ios)
+            elif reference == GRAPH_COLOR:
+                candidates = self._run_graph_color(algorithm, graph, verbose, artifacts, img_ios)
+            elif reference == GRAPH_PROBLEM:
+                candidates = self._run_independent_set(algorithm, graph, verbose, artifacts, img_ios)
+            elif reference == TSP:
+                self._run_tsp(algorithm, graph, verbose, artifacts, img_ios)
+            if solution is None:
+                solution = next((candidate for candidate in candidates
+                                 if is_solution(graph, problem_name, candidate)), None)
+        return solution
+
+    def _run_ising(self, algorithm, graph, verbose, artifacts, img_ios):
+        with self._stage('import'):
+            import matplotlib.pyplot as plt
+            from src.applications.graph.ising_auxiliary import plot_first_valid_coloring_solutions
+            from src.applications.graph.reduction import ising_assignment
+            from src.utils import plot_gen_img_io
+        with self._stage('model'):
+            problem = algorithm(graph, self.parser.specific_graph_problem,
+                                parameter_store=self.qaoa_parameters)
+        with self._stage('optimize'):
+            res = problem.run(verbose=verbose, profiler=self._problem_profiler)
+        solutions = res.most_probable_states.get('solutions_bitstrings')
+        if verbose or self.render_images:
+            with self._stage('plot'):
+                if verbose:
+                    if self.parser.specific_graph_problem == 'KColor':
+                        print(solutions)
+                        plot_first_valid_coloring_solutions(solutions, problem)
                     else:
-                        if self.parser.specific_graph_problem == 'MIS':
-                            top_is_measurements = get_top_measurements(res, num=100)
-                            plot_multiple_independent_sets(problem.graph(), top_is_measurements)
-                            img_ios['grover'] = plot_gen_img_io()
-                elif issubclass(algorithm, Tsp):
-                    problem = Tsp.create_random_instance(n=3)
-                    qp = problem.to_quadratic_program()
-                    qp2qubo = QuadraticProgramToQubo()
-                    qubo = qp2qubo.convert(qp)
-                    qubitOp, offset = qubo.to_ising()
-                    optimizer = SPSA(maxiter=300)
-                    ry = TwoLocal(qubitOp.num_qubits, "ry", "cz", reps=5, entanglement="linear")
-                    vqe = SamplingVQE(sampler=Sampler(), ansatz=ry, optimizer=optimizer)
-                    result = vqe.compute_minimum_eigenvalue(qubitOp)
-
-                    x = problem.sample_most_likely(result.eigenstate)
-                    solution = problem.interpret(x)
-                    Interpreter.draw_tsp_solution(problem.graph, solution)
-                    if verbose:
-                        print('solution:', solution)
+                        problem.plot_graph_solution()
                         plt.show()
+                else:
+                    if self.parser.specific_graph_problem == 'KColor':
+                        plot_first_valid_coloring_solutions(solutions, problem)
+                        img_ios['qaoa'] = plot_gen_img_io()
                     else:
+                        problem.plot_graph_solution()
                         img_ios['qaoa'] = plot_gen_img_io()
-                    params = [0 for i in ry.parameters]
-                    qasm_codes['qaoa'] = qasm2.dumps(ry.bind_parameters(params))
-                    #plot_tsp_solution(problem.graph, solution)
-        elif self.problem_type == ProblemType.ARITHMETICS:
-            left = self.parser.data.get('left')
-            right = self.parser.data.get('right')
-            operation = arithmetic_mapping.get(self.parser.specific_arithmetic_operation)
+        with self._stage('export'):
+            artifacts['qaoa'] = CircuitArtifact(problem.export_circuit())
+        return [assignment for assignment in (ising_assignment(bitstring, graph.number_of_nodes(),
+                                                               self.parser.specific_graph_problem)
+                                              for bitstring in solutions or []) if assignment is not None]
+
+    def _run_triangle_finding(self, algorithm, graph, verbose, artifacts, img_ios):
+        with self._stage('import'):
+            import matplotlib.pyplot as plt
+            from src.applications.graph.grover_applications.grover_auxiliary import get_top_measurements, \
+                plot_triangle_finding
+            from src.utils import plot_gen_img_io
+        with self._stage('model'):
+            problem = algorithm(graph)
+        with self._stage('optimize'):
+            res = problem.run(verbose=verbose, profiler=self._problem_profiler)
+        top_measurements = get_top_measurements(res, 0.001, num=20)
+        if verbose or self.render_images:
+            with self._stage('plot'):
+                plot_triangle_finding(problem.graph(), top_measurements)
+                if verbose:
+                    plt.show()
+                else:
+                    img_ios['grover'] = plot_gen_img_io()
+        with self._stage('export'):
+            artifacts['grover'] = CircuitArtifact(problem.circuit)
+
+    def _run_graph_color(self, algorithm, graph, verbose, artifacts, img_ios):
+        with self._stage('import'):
+            import matplotlib.pyplot as plt
+            from src.applications.graph.grover_applications.grover_auxiliary import get_top_measurements, \
+                plot_multiple_graph_colorings
+            from src.utils import plot_gen_img_io
+        with self._stage('model'):
+            problem = algorithm(graph)
+        with self._stage('optimize'):
+            res = problem.run(verbose=verbose, profiler=self._problem_profiler)
+        top_measurements = get_top_measurements(res, 0.001, num=20)
+        if verbose or self.render_images:
+            with self._stage('plot'):
+                plot_multiple_graph_colorings(problem.graph(), top_measurements, num_per_row=3)
+                if verbose:
+                    plt.show()
+                else:
+                    img_ios['grover'] = plot_gen_img_io()
+        with self._stage('export'):
+            artifacts['grover'] = CircuitArtifact(problem.circuit)
+        # bit pairs from the left, as plot_multiple_graph_colorings reads them
+        return [{node: int(bitstring[2 * node:2 * node + 2], 2) for node in range(len(bitstring) // 2)}
+                for measurement in top_measurements for bitstring in measurement]
+
+    def _run_independent_set(self, algorithm, graph, verbose, artifacts, img_ios):
+        # only implement IS now...
+        with self._stage('import'):
+            import matplotlib.pyplot as plt
+            from src.algorithms.grover import GroverWrapper
+            from src.algorithms.grover_iterations import count_cnf_solutions
+            from src.applications.graph.grover_applications.graph_oracle import independent_set_to_sat, \
+                compile_cnf_oracle
+            from src.applications.graph.grover_applications.grover_auxiliary import get_top_measurements, \
+                plot_multiple_independent_sets
+            from src.utils import plot_gen_img_io
+        with self._stage('model'):
+            problem = algorithm(graph)
+            independent_set_cnf = independent_set_to_sat(problem.graph())
+            # one ancilla per vertex instead of one per edge, the edge clauses share their endpoints
+            independent_set_oracle = compile_cnf_oracle(independent_set_cnf, num_vars=problem.num_nodes)
+            # unknown on large graphs with many independent sets, the wrapper then follows the BBHT schedule
+            grover = GroverWrapper(oracle=independent_set_oracle,
+                                   objective_qubits=list(range(problem.num_nodes)),
+                                   num_solutions=count_cnf_solutions(independent_set_cnf, num_vars=problem.num_nodes))
+        with self._stage('optimize'):
+            res = grover.run(verbose=verbose, profiler=self._problem_profiler)
+        with self._stage('export'):
+            artifacts['grover'] = CircuitArtifact(grover.circuit, serializer=grover.export_to_qasm)
+        if self.parser.specific_graph_problem == 'MIS' and (verbose or self.render_images):
+            with self._stage('plot'):
+                top_is_measurements = get_top_measurements(res, num=100)
+                plot_multiple_independent_sets(problem.graph(), top_is_measurements)
+                if verbose:
+                    plt.show()
+                else:
+                    img_ios['grover'] = plot_gen_img_io()
+        # node i is the rightmost bit i of the measurement
+        return [{node: int(bit) for node, bit in enumerate(reversed(bitstring))}
+                for measurement in get_top_measurements(res, num=100) for bitstring in measurement]
+
+    def _run_tsp(self, algorithm, graph, verbose, artifacts, img_ios):
+        with self._stage('import'):
+            import matplotlib.pyplot as plt
+            from qiskit.circuit.library import TwoLocal
+            from qiskit.primitives import Sampler
+            from qiskit_algorithms import SamplingVQE
+            from qiskit_algorithms.optimizers import SPSA
+            from qiskit_optimization.converters import QuadraticProgramToQubo
+            from src.Framework.interpreter import Interpreter
+            from src.applications.quadratic_program import SparseIsing
+            from src.utils import plot_gen_img_io
+        with self._stage('model'):
+            problem = algorithm.create_random_instance(n=3)
+            qp = problem.to_quadratic_program()
+            qp2qubo = QuadraticProgramToQubo()
+            qubo = qp2qubo.convert(qp)
+            qubitOp, offset = SparseIsing.from_quadratic_program(qubo).to_ising()
+            optimizer = SPSA(maxiter=300)
+            ry = TwoLocal(qubitOp.num_qubits, "ry", "cz", reps=5, entanglement="linear")
+            vqe = SamplingVQE(sampler=Sampler(), ansatz=ry, optimizer=optimizer)
+        with self._stage('optimize'):
+            result = vqe.compute_minimum_eigenvalue(qubitOp)
+
+        x = problem.sample_most_likely(result.eigenstate)
+        solution = problem.interpret(x)
+        if verbose or self.render_images:
+            with self._stage('plot'):
+                Interpreter.draw_tsp_solution(problem.graph, solution)
+                if verbose:
+                    print('solution:', solution)
+                    plt.show()
+                else:
+                    img_ios['qaoa'] = plot_gen_img_io()
+        with self._stage('export'):
+            params = [0 for i in ry.parameters]
+            artifacts['qaoa'] = CircuitArtifact(ry.bind_parameters(params), parameterized=ry, parameter_values=params)
+        #plot_tsp_solution(problem.graph, solution)
+
+    def _solve_arithmetic(self, classical_code, verbose, artifacts, img_ios):
+        left = self.parser.data.get('left')
+        right = self.parser.data.get('right')
+        with self._stage('import'):
+            operation = [load_algorithm(reference)
+                         for reference in arithmetic_mapping.get(self.parser.specific_arithmetic_operation)]
+        with self._stage('optimize'):
             res, circuit = operation[0](left, right)
-            if verbose: print(f'quantum {self.parser.specific_arithmetic_operation} result: {res}')
-            qasm_codes['QFT'] = qasm2.dumps(circuit)
-        elif self.problem_type == ProblemType.FACTOR:
-            number = self.parser.data.get('composite number')
+        if verbose: print(f'quantum {self.parser.specific_arithmetic_operation} result: {res}')
+        with self._stage('export'):
+            artifacts['QFT'] = CircuitArtifact(circuit)
+
+    def _solve_factor(self, classical_code, verbose, artifacts, img_ios):
+        with self._stage('import'):
+            from src.algorithms.grover import GroverWrapper
+            from src.applications.arithmetic.factorization import quantum_factor_mul_oracle, count_factor_pairs
+            from src.applications.graph.grover_applications.grover_auxiliary import get_top_measurements
+        number = self.parser.data.get('composite number')
+        with self._stage('model'):
             oracle, prep_state, obj_bits = quantum_factor_mul_oracle(number)
+            num_solutions, search_space_size = count_factor_pairs(number)
             grover = GroverWrapper(oracle=oracle,
-                                   iterations=1,
                                    state_preparation=prep_state,
-                                   objective_qubits=obj_bits
+                                   objective_qubits=obj_bits,
+                                   num_solutions=num_solutions,
+                                   search_space_size=search_space_size
                                    )
-            res = grover.run(verbose=False)
-            if verbose:
+        with self._stage('optimize'):
+            res = grover.run(verbose=False, profiler=self._problem_profiler)
+        if verbose:
+            with self._stage('plot'):
+                import matplotlib.pyplot as plt
+                from qiskit.visualization import plot_histogram
                 plot_histogram(res.circuit_results)
                 plt.show()
-            solutions = get_top_measurements(res)
-            if verbose: print(solutions)
-            qasm_codes['grover'] = grover.export_to_qasm()
-        else:
-            raise ValueError("Unsupported problem type")
-        return qasm_codes, img_ios
+        solutions = get_top_measurements(res)
+        if verbose: print(solutions)
+        with self._stage('export'):
+            artifacts['grover'] = CircuitArtifact(grover.circuit, serializer=grover.export_to_qasm)
 
     def run_locally(self):
         pass
 
+    def _artifact(self, circuit):
+        """
+        The artifact behind a QASM string: one of the last generate call when it produced that
+        QASM, else a parsed one kept among the most recent few.
+        """
+        if isinstance(circuit, CircuitArtifact):
+            return circuit
+        for artifact in self.artifacts.values():
+            if artifact.matches(circuit):
+                return artifact
+        key = circuit.strip()
+        artifact = _parsed_artifacts.pop(key, None)
+        if artifact is None:
+            artifact = CircuitArtifact(qasm=circuit)
+            if len(_parsed_artifacts) >= _PARSED_ARTIFACTS_SIZE:
+                _parsed_artifacts.popitem(last=False)
+        _parsed_artifacts[key] = artifact
+        return artifact
+
     def run_qasm_simulator(self, str, primitive: str = 'sampler'):
+        """
+        Run a circuit on the reference primitives.
+
+        Parameters
+        ----------
+        str: QASM string or CircuitArtifact, its transpiled circuit is reused across calls and
+            across equal circuits, see Framework.transpile_cache
+        """
+        import numpy as np
+        from qiskit.primitives import Estimator, Sampler
         seed = int(np.random.randint(1, 1000000))
-        circuit = qasm2.loads(str, custom_instructions=qasm2.LEGACY_CUSTOM_INSTRUCTIONS)
-        pm = generate_preset_pass_manager(optimization_level=1)
-        optimized_circuit = pm.run(circuit)
+        optimized_circuit = self._artifact(str).transpiled(optimization_level=1)
         if primitive == "sampler":
             #optimized_circuit.measure_all()
             sampler = Sampler()
@@ -265,13 +612,8 @@ class QASMGenerator:
             return result
 
     def run_qasm_aer(self, str, primitive: str = 'sampler', noise=None):
-        circuit = qasm2.loads(str)
-        circuit.measure_all()
+        from qiskit_aer import Aer
         simulator = Aer.get_backend('qasm_simulator')
-        compiled_circuit = transpile(circuit, simulator)
+        compiled_circuit = self._artifact(str).transpiled(backend=simulator, measure=True)
         result = simulator.run(compiled_circuit, shots=self.shots).result()
         return result.get_counts(compiled_circuit)
-
-
-
-
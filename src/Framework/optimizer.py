@@ -1,3 +1,6 @@
+from Framework.generator import algorithms_mapping, load_algorithm
+
+
 # TODO
 class Optimizer:
     def __init__(self, available_hardware, problem_type, verbose=False):
@@ -12,7 +15,7 @@ class Optimizer:
         algorithms = algorithms_mapping.get(parser.specific_graph_problem)
         # For simplicity, we can assume the first algorithm is the default choice.
         # More complex logic could involve checking the hardware capabilities, problem size, etc.
-        selected_algorithm = algorithms[0]
+        selected_algorithm = load_algorithm(algorithms[0])
 
         if self.verbose:
             print(f'Selected algorithm: {selected_algorithm.__name__}')
@@ -28,11 +31,26 @@ class Optimizer:
         return {}
 
     def find_optimal_grover_iterations(self, problem):
-        # Simplified optimization logic for Grover's iterations
-        optimal_iterations = 2  # Example default value
-        # Perform optimization logic (e.g., grid search or other methods)
-        # This is where you would implement the actual optimization strategy.
-        return optimal_iterations
+        """
+        Iterations maximizing the success probability of the independent set search on
+        `problem`, from the number of models of its CNF encoding. When there are too many to
+        count, the BBHT schedule of iteration counts to try in turn.
+        """
+        from src.algorithms.grover_iterations import bbht_schedule, count_cnf_solutions, optimal_iterations, \
+            success_table
+        from src.applications.graph.grover_applications.graph_oracle import independent_set_to_sat
+        num_solutions = count_cnf_solutions(independent_set_to_sat(problem.graph()), num_vars=problem.num_nodes)
+        search_space_size = 2 ** problem.num_nodes
+        if num_solutions is None:
+            schedule = bbht_schedule(search_space_size)
+            if self.verbose:
+                print(f'too many solutions to count, BBHT schedule of {len(schedule)} iteration counts')
+            return schedule
+        iterations = optimal_iterations(num_solutions, search_space_size)
+        if self.verbose:
+            print(f'{num_solutions} solutions, {iterations} iterations, success probability per iteration count: '
+                  f'{success_table(num_solutions, search_space_size)}')
+        return iterations
 
     def run(self, generated_code, parser, qasm_codes, img_ios):
         selected_algorithm = self.select_algorithm(algorithms_mapping, parser)
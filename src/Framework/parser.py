@@ -1,10 +1,15 @@
 import ast
+import json
+import keyword
 import re
+import time
 
 import networkx as nx
 import numpy as np
 from enum import Enum
 from src.classiq_exceptions import *
+from Framework.data_references import DataReference, GRAPH_KINDS, data_reference, graph_from_rows, \
+    load_reference
 import operator
 
 ml_dic = ['SVC']
@@ -26,7 +31,114 @@ factorization_keywords = ["factorization", "factorizations", "factorization", "f
 verbose = False
 
 
-def extract_matrix(node):
+# numeric list and tuple literals of at least this many characters are converted in bulk,
+# see elide_literals
+BULK_LITERAL_CHARS = 1024
+# an opening bracket followed by enough characters that can only be numbers and brackets
+_LITERAL_RUN = re.compile(r'[\[(](?=[\d\s.,+\-eE\[\]()]{%d})' % (BULK_LITERAL_CHARS - 1), re.ASCII)
+_BRACKETS = re.compile(r'[\[\]()]')
+_PRECEDING_WORD = re.compile(r'(\w+)\s*$')
+_PLACEHOLDER = '__classiq_literal_{}__'
+_CLOSING = {']': '[', ')': '('}
+
+
+def _literal_end(source, start):
+    """End of the bracketed span opening at `start` if its brackets pair up, else None."""
+    stack = []
+    for match in _BRACKETS.finditer(source, start):
+        bracket = match.group()
+        if bracket in '[(':
+            stack.append(bracket)
+        elif not stack or stack.pop() != _CLOSING[bracket]:
+            return None
+        if not stack:
+            return match.end()
+    return None
+
+
+def _opens_literal(source, start):
+    """Whether the bracket at `start` opens a display rather than a call or a subscript."""
+    before = source[max(0, start - 32):start].rstrip()
+    if not before:
+        return True
+    if before[-1] in ')]}\'"':
+        return False
+    word = _PRECEDING_WORD.search(before)
+    return word is None or keyword.iskeyword(word.group(1))
+
+
+def _bulk_value(text):
+    """Python value of a numeric list/tuple literal, tuples as lists, None if it is not one."""
+    try:
+        value = json.loads(text.translate({ord('('): '[', ord(')'): ']'}))
+    except ValueError:
+        return None
+    if '(' in text:
+        # a one element list from parentheses was a grouping, not a tuple
+        lists = [value]
+        while lists:
+            current = lists.pop()
+            if len(current) == 1:
+                return None
+            lists.extend(item for item in current if isinstance(item, list))
+    return value
+
+
+def elide_literals(source):
+    """
+    Replace large numeric list and tuple literals of a script by placeholder names, so they
+    are neither parsed nor visited node by node. Their values are read in one pass by the
+    json module; unary minus is part of the number, literals with any other expression are
+    left to `extract_variable`.
+
+    Returns
+    -------
+    (source, literals): the script with each literal replaced by a parenthesized placeholder
+    spanning as many lines, and the dict placeholder -> value (lists, tuples as lists)
+    """
+    literals = {}
+    if _PLACEHOLDER.format('') in source:
+        return source, literals
+    pieces = []
+    copied = 0
+    position = 0
+    while True:
+        run = _LITERAL_RUN.search(source, position)
+        if run is None:
+            break
+        start = run.start()
+        # step into the parentheses of calls and brackets of subscripts
+        while start is not None and not _opens_literal(source, start):
+            start += 1
+            while start < len(source) and source[start].isspace():
+                start += 1
+            if start >= len(source) or source[start] not in '[(':
+                start = None
+        end = None if start is None else _literal_end(source, start)
+        if end is None:
+            position = run.start() + 1
+            continue
+        if end - start < BULK_LITERAL_CHARS:
+            # the literals nested in a short one are shorter still
+            position = end
+            continue
+        value = _bulk_value(source[start:end])
+        if value is None:
+            # the rows of a literal may still be converted on their own
+            position = start + 1
+            continue
+        name = _PLACEHOLDER.format(len(literals))
+        literals[name] = value
+        pieces.append(source[copied:start])
+        pieces.append(f"({name}{chr(10) * source.count(chr(10), start, end)})")
+        copied = position = end
+    pieces.append(source[copied:])
+    return ''.join(pieces), literals
+
+
+def extract_matrix(node, literals=None):
+    if literals and isinstance(node, ast.Name) and node.id in literals:
+        return np.array(literals[node.id])
     matrix = []
     for row in node.elts:
         matrix_row = []
@@ -42,24 +154,34 @@ def extract_matrix(node):
     return np.array(matrix)
 
 
-def extract_variable(node):
+def extract_variable(node, literals=None):
+    """
+    Value of an expression node.
+
+    Parameters
+    ----------
+    literals: placeholder name -> value of the literals taken out of the script by
+        `elide_literals`
+    """
     if isinstance(node, ast.Constant):
         return node.value
+    if literals and isinstance(node, ast.Name) and node.id in literals:
+        return literals[node.id]
     if isinstance(node, ast.UnaryOp):
         if isinstance(node.op, ast.USub) and isinstance(node.operand, ast.Constant):
             return -node.operand.value
         elif isinstance(node.op, ast.UAdd):  # Handle Unary Plus (UAdd)
-            return extract_variable(node.operand)
+            return extract_variable(node.operand, literals)
     if isinstance(node, ast.List) or isinstance(node, ast.Tuple):
-        return [extract_variable(e) for e in node.elts]
+        return [extract_variable(e, literals) for e in node.elts]
     if isinstance(node, ast.Call) and isinstance(node.func, ast.Attribute):
         if node.func.attr == 'array' and isinstance(node.func.value, ast.Name):
             if node.func.value.id in {'np', 'numpy'}:
-                return extract_matrix(node.args[0])
+                return extract_matrix(node.args[0], literals)
     if isinstance(node, ast.BinOp):
         # Extract the left and right operands
-        left_value = extract_variable(node.left)
-        right_value = extract_variable(node.right)
+        left_value = extract_variable(node.left, literals)
+        right_value = extract_variable(node.right, literals)
 
         # Debugging output
         if verbose:
@@ -94,12 +216,134 @@ class ProblemType(Enum):
     ARITHMETICS = 6
 
 
+class KeywordIndex:
+    """
+    All keyword lists compiled into one regex alternation, to find the groups whose keywords
+    appear in a name with a single scan instead of one substring test per keyword.
+
+    Parameters
+    ----------
+    groups: dict group name -> keywords, a keyword may belong to several groups
+    """
+    # distinct names remembered by `contained`, scripts repeat the same few names
+    max_cached = 4096
+
+    def __init__(self, groups):
+        keyword_groups = {}
+        for group, keywords in groups.items():
+            for keyword in keywords:
+                keyword_groups.setdefault(keyword, set()).add(group)
+        self._exact = {keyword: frozenset(names) for keyword, names in keyword_groups.items()}
+        # the lookahead finds one keyword per position, the longest; the shorter keywords
+        # matching there are its prefixes, so their groups are folded into its own
+        self._prefixed = {keyword: frozenset().union(*(names for other, names in keyword_groups.items()
+                                                       if keyword.startswith(other)))
+                          for keyword in keyword_groups}
+        alternation = '|'.join(re.escape(keyword) for keyword in sorted(keyword_groups, key=len, reverse=True))
+        self._pattern = re.compile(f'(?=({alternation}))')
+        self._cache = {}
+
+    def exact(self, name):
+        """Groups with a keyword equal to `name`."""
+        return self._exact.get(name, frozenset())
+
+    def contained(self, name):
+        """Groups with a keyword that is a substring of `name`."""
+        groups = self._cache.get(name)
+        if groups is None:
+            groups = frozenset().union(*(self._prefixed[match.group(1)] for match in self._pattern.finditer(name)))
+            if len(self._cache) < self.max_cached:
+                self._cache[name] = groups
+        return groups
+
+
+SIGNAL_TYPES = {
+    'eigenvalue': ProblemType.EIGENVALUE,
+    'machine_learning': ProblemType.MACHINELEARNING,
+    'cnf': ProblemType.CNF,
+    'graph': ProblemType.GRAPH,
+    'arithmetic': ProblemType.ARITHMETICS,
+    'factor': ProblemType.FACTOR,
+    'networkx': ProblemType.GRAPH,
+    'sklearn': ProblemType.MACHINELEARNING,
+}
+# graph sub-problems by precedence, the first one with a signal is picked
+GRAPH_PROBLEM_KEYWORDS = {
+    'Clique Problem': clique_keywords,
+    'MaximumCut': maxcut_keywords,
+    'MIS': independent_set_keywords,
+    'TSP': tsp_keywords,
+    'KColor': coloring_keywords,
+    'Triangle': triangle_finding_keywords,
+    'VRP': vrp_keywords,
+}
+KEYWORDS = KeywordIndex({'eigenvalue': eigenvalue_keywords, 'machine_learning': ml_keywords, 'cnf': cnf_keywords,
+                         'graph': graph_keywords, 'arithmetic': arithmetic_keywords,
+                         'factor': factorization_keywords, 'networkx': ['networkx', 'nx'], 'sklearn': ['sklearn'],
+                         **GRAPH_PROBLEM_KEYWORDS})
+# sources of problem-type signals, in the order their signals take precedence
+SIGNAL_SOURCES = ('variables', 'functions', 'main_logic', 'imports')
+ARITHMETIC_CALLS = frozenset(['addition', 'subtraction', 'multiplication', 'division',
+                              'add', 'subtract', 'multiply', 'divide', 'mul', 'sub'])
+FACTOR_CALLS = frozenset(factorization_keywords)
+
+
+def _first_signal(groups, order):
+    """Problem type of the first group of `order` found in `groups`, None if there is none."""
+    for group in order:
+        if group in groups:
+            return SIGNAL_TYPES[group]
+    return None
+
+
+def variable_signal(name):
+    return _first_signal(KEYWORDS.exact(name), ('eigenvalue', 'graph', 'factor'))
+
+
+def function_signal(name, args):
+    if any('eigenvalue' in KEYWORDS.exact(arg) for arg in args):
+        return ProblemType.EIGENVALUE
+    return _first_signal(KEYWORDS.contained(name.lower()), ('machine_learning', 'cnf', 'graph', 'arithmetic', 'factor'))
+
+
+def statement_signal(node):
+    """Signal of a top-level statement, only calls count."""
+    if not (isinstance(node, ast.Expr) and isinstance(node.value, ast.Call)):
+        return None
+    func = node.value.func
+    if isinstance(func, ast.Attribute):
+        return ProblemType.EIGENVALUE if 'eigenvalue' in KEYWORDS.exact(func.attr) else None
+    if isinstance(func, ast.Name):
+        if 'machine_learning' in KEYWORDS.exact(func.id):
+            return ProblemType.MACHINELEARNING
+        return _first_signal(KEYWORDS.contained(func.id.lower()), ('cnf', 'graph', 'factor'))
+    return None
+
+
+def import_signal(name):
+    return _first_signal(KEYWORDS.contained(name), ('networkx', 'sklearn', 'eigenvalue', 'cnf', 'factor'))
+
+
+def graph_problem_signals(name):
+    """Graph sub-problems with a keyword in `name`."""
+    groups = KEYWORDS.contained(name)
+    return [problem for problem in GRAPH_PROBLEM_KEYWORDS if problem in groups]
+
+
 def handle_constant(node):
     return node.value
 
 
 class ProblemParser:
-    def __init__(self):
+    def __init__(self, data_dir=None):
+        """
+        Parameters
+        ----------
+        data_dir: directory the data files referenced by the code (np.load, nx.read_edgelist,
+            read_gset_file, TSPLIB files...) are read from, see `Framework.data_references`.
+            Without one, code referencing files cannot be parsed
+        """
+        self.data_dir = data_dir
         self.composite_numer = None
         self.arithmetic_arguments = None
         self.visitor = None
@@ -108,103 +352,73 @@ class ProblemParser:
         self.data = None
         self.specific_graph_problem = None
         self.specific_arithmetic_operation = None
+        # referenced files loaded by extract_data, by DataReference.key
+        self.data_files = {}
+        self.load_seconds = 0.0
+        # timings (seconds) and sizes of the last parse_code
+        self.diagnostics = {}
 
     def parse_code(self, code):
-        self.__init__()
-        self.visitor = MyVisitor()
+        self.__init__(data_dir=self.data_dir)
+        started = time.perf_counter()
+        source, literals = elide_literals(code)
+        elided = time.perf_counter()
+        tree = None
+        if literals:
+            try:
+                tree = ast.parse(source)
+            except SyntaxError:
+                pass
+            # a placeholder inside a string or a comment is not a name: parse the script as is
+            if tree is not None and not set(literals) <= {node.id for node in ast.walk(tree)
+                                                          if isinstance(node, ast.Name)}:
+                tree = None
+            if tree is None:
+                literals = {}
+        if tree is None:
+            tree = ast.parse(code)
+        parsed = time.perf_counter()
+        self.visitor = MyVisitor(literals)
         self.source_code = code
-        self.visitor.visit(ast.parse(code))
+        self.visitor.visit(tree)
+        visited = time.perf_counter()
         self.evaluate_problem_type()
+        self.diagnostics = {
+            'parse_seconds': parsed - elided,
+            'visit_seconds': visited - parsed,
+            # loading the referenced data files is reported apart
+            'classify_seconds': time.perf_counter() - visited - self.load_seconds,
+            'load_seconds': self.load_seconds,
+            # bulk conversion of literals plus the extraction of variables during the visit
+            'extraction_seconds': elided - started + self.visitor.extraction_seconds,
+            'bulk_literals': len(literals),
+            'source_chars': len(code),
+            'data_files': len(self.data_files),
+        }
 
     def evaluate_problem_type(self):
         """ Evaluate the problem type based on parsed data and also fetch data"""
         if self.visitor is None:
             raise NotParsedError
-        # Check variables for problem type
-        for var_name in self.visitor.variables:
-            if var_name in eigenvalue_keywords:
-                self._set_problem_type(ProblemType.EIGENVALUE)
-            elif var_name in graph_keywords:
-                self._set_problem_type(ProblemType.GRAPH)
-            elif var_name in factorization_keywords:
-                self._set_problem_type(ProblemType.FACTOR)
-
-        # Check function definitions for problem type
-        for func in self.visitor.functions:
-            if any(arg in eigenvalue_keywords for arg in func['args']):
-                self._set_problem_type(ProblemType.EIGENVALUE)
-            elif any(keyword in func['name'].lower() for keyword in ml_keywords):
-                self._set_problem_type(ProblemType.MACHINELEARNING)
-            elif any(keyword in func['name'].lower() for keyword in cnf_keywords):
-                self._set_problem_type(ProblemType.CNF)
-            elif any(keyword in func['name'].lower() for keyword in graph_keywords):
-                self._set_problem_type(ProblemType.GRAPH)
-            elif any(keyword in func['name'].lower() for keyword in arithmetic_keywords):
-                self._set_problem_type(ProblemType.ARITHMETICS)
-            elif any(keyword in func['name'].lower() for keyword in factorization_keywords):
-                self._set_problem_type(ProblemType.FACTOR)
-
-        # Check main logic for problem type
-        for node in self.visitor.main_logic:
-            if isinstance(node, ast.Expr) and isinstance(node.value, ast.Call):
-                func = node.value.func
-                if isinstance(func, ast.Attribute) and func.attr in eigenvalue_keywords:
-                    self._set_problem_type(ProblemType.EIGENVALUE)
-                elif isinstance(func, ast.Name):
-                    func_name = func.id
-                    if func_name in ml_keywords:
-                        self._set_problem_type(ProblemType.MACHINELEARNING)
-                    elif any(keyword in func_name.lower() for keyword in cnf_keywords):
-                        self._set_problem_type(ProblemType.CNF)
-                    elif any(keyword in func_name.lower() for keyword in graph_keywords):
-                        self._set_problem_type(ProblemType.GRAPH)
-                    elif any(keyword in func_name.lower() for keyword in factorization_keywords):
-                        self._set_problem_type(ProblemType.FACTOR)
-
-        # Check imports for problem type
-        for imp in self.visitor.imports:
-            if 'networkx' in imp or 'nx' in imp:
-                self._set_problem_type(ProblemType.GRAPH)
-            elif 'sklearn' in imp:
-                self._set_problem_type(ProblemType.MACHINELEARNING)
-            elif any(eigen in imp for eigen in eigenvalue_keywords):
-                self._set_problem_type(ProblemType.EIGENVALUE)
-            elif 'sat' in imp or 'cnf' in imp:
-                self._set_problem_type(ProblemType.CNF)
-            elif any(factor in imp for factor in factorization_keywords):
-                self._set_problem_type(ProblemType.FACTOR)
-
-        def extract_variable_names_from_strings(name_strings):
-            variable_names = []
-            for name_string in name_strings:
-                # Use regex to find the content between "id='" and "',"
-                match = re.search(r"id='(.*?)'", name_string)
-                if match:
-                    variable_names.append(match.group(1))
-            return variable_names
+        # Signals were tallied while visiting: the first one sets the problem type, any
+        # other type raises, variables first, then functions, main logic and imports
+        for source in SIGNAL_SOURCES:
+            for problem_type in self.visitor.signals[source]:
+                self._set_problem_type(problem_type)
 
         # Check function calls for arithmetic operations
         for call in self.visitor.calls:
-            if call['func_name'] in ['addition', 'subtraction', 'multiplication', 'division',
-                                     'add', 'subtract', 'multiply', 'divide','mul',
-                                     'sub', ]:
+            if call.func_name in ARITHMETIC_CALLS:
                 self._set_problem_type(ProblemType.ARITHMETICS)
-                arguments_string = call.get('args')
-                if len(arguments_string) != 2:
+                if len(call.kinds) != 2:
                     raise ValueError("Basic arithmetic problems require only two operands")
-
-                arguments = extract_variable_names_from_strings(arguments_string)
-
-                self.arithmetic_arguments = arguments
+                self.arithmetic_arguments = [name for name in call.names if name is not None]
                 break
-            elif call['func_name'].lower() in factorization_keywords:
+            elif call.func_name.lower() in FACTOR_CALLS:
                 self._set_problem_type(ProblemType.FACTOR)
-                arguments_string = call.get('args')
-                if len(arguments_string) != 1:
+                if len(call.kinds) != 1:
                     raise ValueError("Factorization problems require only 1 operands")
-                composite_numer = extract_variable_names_from_strings(arguments_string)
-
-                self.composite_numer = composite_numer
+                self.composite_numer = [name for name in call.names if name is not None]
                 break
 
         if self.problem_type == ProblemType.GRAPH:
@@ -230,75 +444,46 @@ class ProblemParser:
         division_keywords = ['division', 'divide', '/']
 
         # Check for addition-related keywords or operations
-        if any(call['func_name'] in addition_keywords for call in self.visitor.calls):
+        if any(call.func_name in addition_keywords for call in self.visitor.calls):
             self.specific_arithmetic_operation = "Addition"
 
         # Check for subtraction-related keywords or operations
-        elif any(call['func_name'] in subtraction_keywords for call in self.visitor.calls):
+        elif any(call.func_name in subtraction_keywords for call in self.visitor.calls):
             self.specific_arithmetic_operation = "Subtraction"
 
         # Check for multiplication-related keywords or operations
-        elif any(call['func_name'] in multiplication_keywords for call in self.visitor.calls):
+        elif any(call.func_name in multiplication_keywords for call in self.visitor.calls):
             self.specific_arithmetic_operation = "Multiplication"
 
         # Check for division-related keywords or operations
-        elif any(call['func_name'] in division_keywords for call in self.visitor.calls):
+        elif any(call.func_name in division_keywords for call in self.visitor.calls):
             self.specific_arithmetic_operation = "Division"
 
     def _determine_specific_graph_problem(self):
         """Determine the specific graph problem type if it's a graph problem."""
 
-        # Function to check if any keyword is a substring in a list of strings
-        def vars_contains_keyword(vars, keywords):
-            return any(any(keyword in var for keyword in keywords) for var in vars)
-
-        def calls_contains_keyword(calls, keywords):
-            return any(any(keyword in call.get("func_name") for keyword in keywords) for call in calls)
-
-        # Check for clique-related keywords
-        if vars_contains_keyword(self.visitor.variables, clique_keywords) or calls_contains_keyword(self.visitor.calls,
-                                                                                                    clique_keywords):
-            self.problem_type = ProblemType.GRAPH
-            self.specific_graph_problem = "Clique Problem"
-
-        # Check for max-cut-related keywords
-        elif vars_contains_keyword(self.visitor.variables, maxcut_keywords) or calls_contains_keyword(
-                self.visitor.calls,
-                maxcut_keywords):
-            self.problem_type = ProblemType.GRAPH
-            self.specific_graph_problem = "MaximumCut"
-
-        # Check for independent set keywords
-        elif vars_contains_keyword(self.visitor.variables, independent_set_keywords) or calls_contains_keyword(
-                self.visitor.calls,
-                independent_set_keywords):
-            self.problem_type = ProblemType.GRAPH
-            self.specific_graph_problem = "MIS"
-
-        # Check for TSP-related keywords
-        elif vars_contains_keyword(self.visitor.variables, tsp_keywords) or calls_contains_keyword(self.visitor.calls,
-                                                                                                   tsp_keywords):
-            self.problem_type = ProblemType.GRAPH
-            self.specific_graph_problem = "TSP"
-
-        # Check for graph coloring keywords
-        elif vars_contains_keyword(self.visitor.variables, coloring_keywords) or calls_contains_keyword(
-                self.visitor.calls,
-                coloring_keywords):
-            self.problem_type = ProblemType.GRAPH
-            self.specific_graph_problem = "KColor"
-
-        # Check for triangle finding keywords
-        elif vars_contains_keyword(self.visitor.variables, triangle_finding_keywords) or calls_contains_keyword(
-                self.visitor.calls,
-                triangle_finding_keywords):
-            self.problem_type = ProblemType.GRAPH
-            self.specific_graph_problem = "Triangle"
-        # Check for vrp keywords
-        elif vars_contains_keyword(self.visitor.variables, vrp_keywords) or calls_contains_keyword(self.visitor.calls,
-                                                                                                   vrp_keywords):
-            self.problem_type = ProblemType.GRAPH
-            self.specific_graph_problem = "VRP"
+        graph_signals = self.visitor.graph_signals
+        for problem in GRAPH_PROBLEM_KEYWORDS:
+            if graph_signals.get(problem):
+                self.problem_type = ProblemType.GRAPH
+                self.specific_graph_problem = problem
+                break
+
+    def signal_scores(self):
+        """
+        Signals the classification was made from, for debugging.
+
+        Returns
+        -------
+        dict with 'problem_types': for each source of SIGNAL_SOURCES, the number of names
+        pointing to each problem type, and 'graph_problems': the number of variable names and
+        calls pointing to each graph sub-problem
+        """
+        if self.visitor is None:
+            raise NotParsedError
+        return {'problem_types': {source: {problem_type.name: count for problem_type, count in tally.items()}
+                                  for source, tally in self.visitor.signals.items()},
+                'graph_problems': dict(self.visitor.graph_signals)}
 
     def evaluation(self):
         """ Evaluate the parsed code and provide a summary """
@@ -357,9 +542,9 @@ class ProblemParser:
         # 6. Summary of Function Calls
         if self.visitor.calls:
             report.append("\nFunction Calls:")
-            for call in self.visitor.calls:
-                args = ", ".join(call['args'])
-                report.append(f" - {call['func_name']}({args})")
+            for call, dumps in zip(self.visitor.calls, self._argument_dumps()):
+                args = ", ".join(dumps)
+                report.append(f" - {call.func_name}({args})")
         else:
             report.append("No function calls found.")
 
@@ -370,6 +555,17 @@ class ProblemParser:
         final_report = "\n".join(report)
         return final_report
 
+    def _argument_dumps(self):
+        """
+        ast.dump of the positional arguments of each call, in the order of visitor.calls.
+        Call records keep no nodes, so the script is parsed again for these reports.
+        """
+        literals = self.visitor.literals
+        source = elide_literals(self.source_code)[0] if literals else self.source_code
+        return [[f'Literal({arg.id})' if isinstance(arg, ast.Name) and arg.id in literals else ast.dump(arg)
+                 for arg in call.args]
+                for call in _calls_in_visit_order(ast.parse(source))]
+
     def _set_problem_type(self, problem_type):
         """Set the problem type if not already set, or raise an error if there's a conflict"""
         if not self.problem_type:
@@ -377,12 +573,35 @@ class ProblemParser:
         elif self.problem_type != problem_type:
             raise ValueError(f"Multiple problem types detected: {self.problem_type.name} and {problem_type.name}")
 
+    def _variable(self, name):
+        """Value of a variable of the code, loading it first when it references a data file."""
+        value = self.visitor.variables.get(name)
+        if isinstance(value, DataReference):
+            value = self._load(value)
+            self.visitor.variables[name] = value
+        return value
+
+    def _load(self, reference):
+        # names unpacked from one call share its file
+        if reference.key not in self.data_files:
+            started = time.perf_counter()
+            self.data_files[reference.key] = load_reference(reference, self.data_dir)
+            self.load_seconds += time.perf_counter() - started
+        return self.data_files[reference.key]
+
+    def _referenced_graph(self):
+        """Graph of the first variable referencing a graph file (edge list, Gset, TSPLIB), None without one."""
+        for name, value in list(self.visitor.variables.items()):
+            if isinstance(value, DataReference) and value.kind in GRAPH_KINDS:
+                return self._variable(name)
+        return None
+
     def extract_data(self):
         """Extract relevant data based on the detected problem type"""
         if self.problem_type == ProblemType.EIGENVALUE:
             # Try to find 'matrix' or 'observable'
-            matrix = self.visitor.variables.get('matrix')
-            observable = self.visitor.variables.get('observable')
+            matrix = self._variable('matrix')
+            observable = self._variable('observable')
             if matrix is not None:
                 self.data = matrix
             elif observable is not None:
@@ -392,9 +611,8 @@ class ProblemParser:
             pass
         elif self.problem_type == ProblemType.CNF:
             # For CNF problems, look for the relevant CNF formula representation
-            self.data = (self.visitor.variables.get('cnf') or self.visitor.variables.get(
-                '3sat') or self.visitor.variables.get('cnf_formula') or
-                         self.visitor.variables.get('formula'))
+            self.data = (self._variable('cnf') or self._variable('3sat') or self._variable('cnf_formula') or
+                         self._variable('formula'))
         elif self.problem_type == ProblemType.GRAPH:
             # List of possible variable names for nodes and edges
             possible_edge_names = ['edges', 'elists', 'edge', 'Edge']
@@ -404,25 +622,29 @@ class ProblemParser:
             # Extract graph data
             graph_data = {}
             for edge_name in possible_edge_names:
-                edges = self.visitor.variables.get(edge_name)
-                if edges:
+                edges = self._variable(edge_name)
+                if _has_items(edges):
                     graph_data['edges'] = edges
                     break
 
             for node_name in possible_node_names:
-                nodes = self.visitor.variables.get(node_name)
-                if nodes:
+                nodes = self._variable(node_name)
+                if _has_items(nodes):
                     graph_data['nodes'] = nodes
                     break
             for adj_matrix_name in possible_adj_matrix_names:
-                adj_matrix = self.visitor.variables.get(adj_matrix_name)
+                adj_matrix = self._variable(adj_matrix_name)
                 if adj_matrix is not None:
                     graph_data['adjacency_matrix'] = adj_matrix
                     break
             # If edges were found, construct the graph
             if 'edges' in graph_data:
-                G = nx.Graph()
                 edges_list = graph_data['edges']
+                if isinstance(edges_list, (nx.Graph, np.ndarray)) or hasattr(edges_list, 'sources'):
+                    # read from a data file
+                    self.data = _graph_of(edges_list, graph_from_rows)
+                    return
+                G = nx.Graph()
                 default_weight = 1
                 # Convert list of lists to list of tuples, handling missing weights
                 edges = [(edge[0], edge[1], edge[2]) if len(edge) == 3 else (edge[0], edge[1], default_weight) for edge
@@ -432,51 +654,149 @@ class ProblemParser:
                 return  # Return if edges found
             # If adjacency matrix was found, construct the graph using the matrix
             elif 'adjacency_matrix' in graph_data:
-                adj_matrix = np.array(graph_data['adjacency_matrix'])
-                G = nx.from_numpy_array(adj_matrix)
-                self.data = G  # Store the graph in self.data if needed.
+                self.data = _graph_of(graph_data['adjacency_matrix'],
+                                      lambda matrix: nx.from_numpy_array(np.asarray(matrix)))
                 return  # Return if matrix found
+            # a graph file assigned to any other name, e.g. G = nx.read_edgelist('graph.txt')
+            graph = self._referenced_graph()
+            if graph is not None:
+                self.data = _graph_of(graph, graph_from_rows)
         elif self.problem_type == ProblemType.ARITHMETICS:
-            data = {"left": self.visitor.variables.get(self.arithmetic_arguments[0]),
-                    "right": self.visitor.variables.get(self.arithmetic_arguments[1])}
+            data = {"left": self._variable(self.arithmetic_arguments[0]),
+                    "right": self._variable(self.arithmetic_arguments[1])}
             self.data = data
         elif self.problem_type == ProblemType.FACTOR:
-            data = {"composite number": self.visitor.variables.get(self.composite_numer[0])}
+            data = {"composite number": self._variable(self.composite_numer[0])}
             self.data = data
             # Add additional checks or data extraction for other graph-related needs
             # TODO: Add other cases for GRAPH, FACTOR, etc.
 
 
+def _has_items(value):
+    if value is None:
+        return False
+    return len(value) > 0 if hasattr(value, '__len__') else bool(value)
+
+
+def _graph_of(value, from_array):
+    """networkx graph of a loaded value: a graph as is, an EdgeList converted, an array through `from_array`."""
+    if isinstance(value, nx.Graph):
+        return value
+    if hasattr(value, 'sources'):
+        return value.to_networkx()
+    return from_array(value)
+
+
+def _first_name(node):
+    """Id of the first Name in the subtree, in the field order of ast.dump, None without one."""
+    stack = [node]
+    while stack:
+        current = stack.pop()
+        if isinstance(current, ast.Name):
+            return current.id
+        stack.extend(reversed(list(ast.iter_child_nodes(current))))
+    return None
+
+
+class CallRecord:
+    """
+    A call of the parsed script, holding what classification needs instead of the call node.
+
+    Attributes
+    ----------
+    func_name: dotted name of the called function
+    kinds: kind of each positional argument: 'name', 'constant', 'literal' for the literals
+        of elide_literals, else the lower-cased node type ('call', 'binop', ...)
+    values: value of each constant argument, None for the others
+    names: first variable name in each positional argument, None for those without one
+    """
+    __slots__ = ('func_name', 'kinds', 'values', 'names')
+
+    def __init__(self, func_name, args, literals=None):
+        literals = literals or {}
+        self.func_name = func_name
+        self.kinds = tuple('literal' if isinstance(arg, ast.Name) and arg.id in literals
+                           else type(arg).__name__.lower() for arg in args)
+        self.values = tuple(arg.value if isinstance(arg, ast.Constant) else None for arg in args)
+        self.names = tuple(None if kind == 'literal' else _first_name(arg) for kind, arg in zip(self.kinds, args))
+
+    def __repr__(self):
+        return f"CallRecord({self.func_name}, kinds={list(self.kinds)})"
+
+
+def _calls_in_visit_order(node):
+    """Call nodes of a tree in the order MyVisitor records them (pre-order)."""
+    stack = [node]
+    while stack:
+        current = stack.pop()
+        if isinstance(current, ast.Call):
+            yield current
+        stack.extend(reversed(list(ast.iter_child_nodes(current))))
+
+
 class MyVisitor(ast.NodeVisitor):
-    def __init__(self):
+    def __init__(self, literals=None):
+        # placeholder name -> value of the literals taken out of the script, see elide_literals
+        self.literals = literals or {}
+        self.extraction_seconds = 0.0
         self.functions = []
         self.comments = []
         self.imports = []
         self.main_logic = []
         self.variables = {}
         self.calls = []
+        # per source, problem type -> number of names pointing to it, in order of first signal
+        self.signals = {source: {} for source in SIGNAL_SOURCES}
+        # graph sub-problem -> number of variable names and calls pointing to it
+        self.graph_signals = {}
         self.assign_dispatch_table = {
             ast.Name: self.handle_assign_name,
             ast.Tuple: self.handle_assign_tuple,
             ast.List: self.handle_assign_List
         }
 
+    def _tally(self, source, problem_type):
+        if problem_type is not None:
+            tally = self.signals[source]
+            tally[problem_type] = tally.get(problem_type, 0) + 1
+
+    def _tally_graph_problems(self, name):
+        for problem in graph_problem_signals(name):
+            self.graph_signals[problem] = self.graph_signals.get(problem, 0) + 1
+
+    def _extract(self, node, extract=extract_variable):
+        started = time.perf_counter()
+        value = extract(node, self.literals)
+        self.extraction_seconds += time.perf_counter() - started
+        return value
+
+    def _value(self, node):
+        # loader calls of data files are kept as references, loaded by ProblemParser.extract_data
+        reference = data_reference(node)
+        return reference if reference is not None else self._extract(node)
+
+    def _set_variable(self, var_name, value):
+        if var_name not in self.variables:
+            self._tally('variables', variable_signal(var_name))
+            self._tally_graph_problems(var_name)
+        self.variables[var_name] = value
+
     def handle_assign_name(self, node):
         # Assign with a function call like matrix=np.array([...])
         var_name = node.targets[0].id
-        self.variables[var_name] = extract_variable(node.value)
+        self._set_variable(var_name, self._value(node.value))
         self.generic_visit(node)
 
     def handle_assign_tuple(self, node):
         for elt in node.targets[0].elts:
             if isinstance(elt, ast.Name):
                 var_name = elt.id
-                self.variables[var_name] = extract_variable(node.value)
+                self._set_variable(var_name, self._value(node.value))
         self.generic_visit(node)
 
     def handle_assign_List(self, node):
         var_name = node.targets[0].id
-        self.variables[var_name] = extract_matrix(node.values)
+        self._set_variable(var_name, self._extract(node.values, extract_matrix))
 
     def handle_unknown_assign(self, node):
         self.generic_visit(node)
@@ -489,17 +809,14 @@ class MyVisitor(ast.NodeVisitor):
     def visit_Call(self, node):
         # Capture details about the function call
         func_name = self._get_function_name(node.func)
-        call_info = {
-            'func_name': func_name,
-            'args': [ast.dump(arg) for arg in node.args]
-        }
-        self.calls.append(call_info)
+        self.calls.append(CallRecord(func_name, node.args, self.literals))
+        self._tally_graph_problems(func_name)
 
         # Check if this is a call to add_edges_from and extract the edges
         if func_name.endswith('add_edges_from') and len(node.args) == 1:
-            edges = extract_variable(node.args[0])
+            edges = self._extract(node.args[0])
             if isinstance(edges, list):
-                self.variables["edges"] = edges
+                self._set_variable("edges", edges)
 
         self.generic_visit(node)
 
@@ -517,21 +834,26 @@ class MyVisitor(ast.NodeVisitor):
 
     def visit_FunctionDef(self, node):
         docstring = ast.get_docstring(node)
+        args = [arg.arg for arg in node.args.args]
         self.functions.append({
             'name': node.name,
             'docstring': docstring,
-            'args': [arg.arg for arg in node.args.args]
+            'args': args
         })
+        self._tally('functions', function_signal(node.name, args))
         self.generic_visit(node)
 
     def visit_Import(self, node):
         for alias in node.names:
             self.imports.append(alias.name)
+            self._tally('imports', import_signal(alias.name))
         self.generic_visit(node)
 
     def visit_ImportFrom(self, node):
         for alias in node.names:
-            self.imports.append(f"{node.module}.{alias.name}")
+            name = f"{node.module}.{alias.name}"
+            self.imports.append(name)
+            self._tally('imports', import_signal(name))
         self.generic_visit(node)
 
     def visit_Expr(self, node):
@@ -540,15 +862,11 @@ class MyVisitor(ast.NodeVisitor):
         self.generic_visit(node)
 
     def visit_Module(self, node):
+        # top-level docstrings, functions and imports are recorded by their visit_ methods,
+        # the rest is main logic; the tree is walked once
         for n in node.body:
-            if isinstance(n, ast.Expr) and isinstance(n.value, ast.Str):
-                self.comments.append(n.value.s)
-            elif isinstance(n, ast.FunctionDef):
-                self.visit_FunctionDef(n)
-            elif isinstance(n, ast.Import):
-                self.visit_Import(n)
-            elif isinstance(n, ast.ImportFrom):
-                self.visit_ImportFrom(n)
-            else:
+            if not (isinstance(n, ast.Expr) and isinstance(n.value, ast.Str)) and \
+                    not isinstance(n, (ast.FunctionDef, ast.Import, ast.ImportFrom)):
                 self.main_logic.append(n)
+                self._tally('main_logic', statement_signal(n))
         self.generic_visit(node)
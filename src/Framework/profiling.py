@@ -0,0 +1,189 @@
+"""
+Spans for profiling the generator and the problem classes.
+
+A span times a block of code in wall and CPU seconds and carries counters (e.g. optimizer
+evaluations) and attributes (e.g. circuit stats)::
+
+    profiler = Profiler()
+    with profiler.span('optimize') as span:
+        result = vqe.compute_minimum_eigenvalue(observable)
+        span.count('evaluations', result.cost_function_evals)
+    profiler.report()
+
+Spans opened inside another span are nested under it. The problem classes take an optional
+profiler in `run` and default to NULL_PROFILER, whose spans do nothing.
+"""
+import json
+import time
+
+
+def circuit_stats(circuit):
+    """Qubit count, depth, size and operation counts of a circuit."""
+    return {'qubits': circuit.num_qubits,
+            'depth': circuit.depth(),
+            'size': circuit.size(),
+            'ops': {name: int(count) for name, count in circuit.count_ops().items()}}
+
+
+class Span:
+    def __init__(self, profiler, name, attributes):
+        self.profiler = profiler
+        self.name = name
+        self.attributes = attributes
+        self.counters = {}
+        self.children = []
+        self.wall = 0.0
+        self.cpu = 0.0
+        self.error = None
+        self._start = None
+        self._start_cpu = None
+
+    def __enter__(self):
+        self.profiler._open(self)
+        self._start_cpu = time.process_time()
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.wall = time.perf_counter() - self._start
+        self.cpu = time.process_time() - self._start_cpu
+        if exc_type is not None:
+            self.error = exc_type.__name__
+        self.profiler._close(self)
+        return False
+
+    def count(self, name, value=1):
+        """Add `value` to the counter `name` of this span."""
+        self.counters[name] = self.counters.get(name, 0) + value
+
+    def set(self, **attributes):
+        """Attach attributes to this span."""
+        self.attributes.update(attributes)
+
+    def record_circuit(self, name, circuit):
+        """Attach the stats of `circuit` under `circuits.<name>`."""
+        self.attributes.setdefault('circuits', {})[name] = circuit_stats(circuit)
+
+    def to_dict(self):
+        report = {'name': self.name, 'wall': self.wall, 'cpu': self.cpu}
+        if self.counters:
+            report['counters'] = dict(self.counters)
+        if self.attributes:
+            report['attributes'] = dict(self.attributes)
+        if self.error is not None:
+            report['error'] = self.error
+        if self.children:
+            report['children'] = [child.to_dict() for child in self.children]
+        return report
+
+
+class Profiler:
+    """
+    Collects the spans of one run.
+
+    Parameters
+    ----------
+    logger: optional logging.Logger, every closed span is logged to it as one JSON line
+    """
+
+    enabled = True
+
+    def __init__(self, logger=None):
+        self.logger = logger
+        self.spans = []
+        self._stack = []
+
+    def span(self, name, **attributes):
+        """Context manager timing the block, nested under the span currently open."""
+        return Span(self, name, attributes)
+
+    def current(self):
+        """The innermost open span, None outside of any span."""
+        return self._stack[-1] if self._stack else None
+
+    def _open(self, span):
+        (self._stack[-1].children if self._stack else self.spans).append(span)
+        self._stack.append(span)
+
+    def _close(self, span):
+        self._stack.pop()
+        if self.logger is not None:
+            path = '/'.join([open_span.name for open_span in self._stack] + [span.name])
+            entry = {'span': path, 'wall': round(span.wall, 6), 'cpu': round(span.cpu, 6)}
+            if span.counters:
+                entry['counters'] = span.counters
+            if span.error is not None:
+                entry['error'] = span.error
+            self.logger.info(json.dumps(entry, default=str))
+
+    def walk(self):
+        """Every span, parents before their children."""
+        stack = list(reversed(self.spans))
+        while stack:
+            span = stack.pop()
+            yield span
+            stack.extend(reversed(span.children))
+
+    def totals(self):
+        """Wall seconds per span name, summed over every span of that name."""
+        totals = {}
+        for span in self.walk():
+            totals[span.name] = totals.get(span.name, 0.0) + span.wall
+        return totals
+
+    def counters(self):
+        """Counters summed over every span, keyed by '<span name>.<counter>'."""
+        counters = {}
+        for span in self.walk():
+            for name, value in span.counters.items():
+                key = f'{span.name}.{name}'
+                counters[key] = counters.get(key, 0) + value
+        return counters
+
+    def report(self):
+        """The spans as nested dicts of name, wall, cpu, counters, attributes and children."""
+        return [span.to_dict() for span in self.spans]
+
+
+class _NullSpan:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return False
+
+    def count(self, name, value=1):
+        pass
+
+    def set(self, **attributes):
+        pass
+
+    def record_circuit(self, name, circuit):
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class NullProfiler:
+    """Profiler doing nothing, its spans are a shared no-op object."""
+
+    enabled = False
+
+    def span(self, name, **attributes):
+        return _NULL_SPAN
+
+    def current(self):
+        return None
+
+    def totals(self):
+        return {}
+
+    def counters(self):
+        return {}
+
+    def report(self):
+        return []
+
+
+NULL_PROFILER = NullProfiler()
@@ -0,0 +1,271 @@
+"""
+Warm worker processes running submitted code under CPU time and memory limits.
+
+The MACHINELEARNING path needs the training arrays the classical code builds, which means
+executing it. Doing so in the server process pays the sklearn imports and the dataset
+loading on every request, and a runaway script stalls everything else. A `SandboxPool`
+keeps a few worker processes with numpy and sklearn already imported; each job runs under
+RLIMIT_CPU and RLIMIT_AS, a wall-clock timeout kills a stuck worker, and workers are replaced
+after `max_jobs` jobs so that whatever a script leaves behind does not pile up::
+
+    arrays = SANDBOX.run(classical_code, ('X_train', 'y_train', 'X_test', 'y_test'))
+
+Arrays come back through shared memory rather than the pipe: the worker saves them as .npy
+files in a tmpfs directory (/dev/shm) and the caller memory-maps them copy-on-write, so
+nothing is pickled or copied on the way back.
+"""
+import multiprocessing
+import os
+import resource
+import shutil
+import signal
+import tempfile
+import threading
+import weakref
+from collections import deque
+
+import numpy as np
+
+from src.classiq_exceptions import SandboxError
+
+# imported by each worker before its first job
+WARM_MODULES = ('numpy', 'sklearn', 'sklearn.datasets', 'sklearn.model_selection', 'sklearn.preprocessing',
+                'sklearn.svm')
+SHARED_MEMORY_DIR = '/dev/shm'
+
+
+def _warm(modules):
+    import importlib
+    for module in modules:
+        try:
+            importlib.import_module(module)
+        except ImportError:
+            pass
+
+
+def _limit_cpu(cpu_seconds):
+    """Soft CPU limit `cpu_seconds` past what the worker has used so far, SIGXCPU kills it beyond."""
+    if cpu_seconds is None:
+        return
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    _, hard = resource.getrlimit(resource.RLIMIT_CPU)
+    soft = int(usage.ru_utime + usage.ru_stime + cpu_seconds) + 1
+    if hard != resource.RLIM_INFINITY:
+        soft = min(soft, hard)
+    resource.setrlimit(resource.RLIMIT_CPU, (soft, hard))
+
+
+def _export(values, directory, prefix):
+    """Arrays saved as .npy files in `directory`, other values (and object arrays) sent as they are."""
+    exported = {}
+    for name, value in values.items():
+        array = np.asarray(value)
+        if array.dtype.hasobject or array.size == 0:
+            exported[name] = ('value', value)
+            continue
+        path = os.path.join(directory, f'{prefix}-{name}.npy')
+        np.save(path, array, allow_pickle=False)
+        exported[name] = ('npy', path)
+    return exported
+
+
+def _run_job(code, names, cpu_seconds, directory, prefix):
+    _limit_cpu(cpu_seconds)
+    try:
+        local_vars = {}
+        exec(code, {}, local_vars)
+        missing = [name for name in names if name not in local_vars]
+        if missing:
+            return 'error', f"NameError: the code does not define {', '.join(missing)}"
+        return 'ok', _export({name: local_vars[name] for name in names}, directory, prefix)
+    except BaseException as e:
+        return 'error', f'{type(e).__name__}: {e}'
+
+
+def _serve(connection, directory, memory_bytes, warm_modules):
+    """Main loop of a worker: run (code, names, cpu_seconds) jobs until told to stop with None."""
+    _warm(warm_modules)
+    if memory_bytes is not None:
+        resource.setrlimit(resource.RLIMIT_AS, (memory_bytes, memory_bytes))
+    jobs = 0
+    while True:
+        try:
+            job = connection.recv()
+        except (EOFError, OSError):
+            return
+        if job is None:
+            return
+        jobs += 1
+        code, names, cpu_seconds = job
+        connection.send(_run_job(code, names, cpu_seconds, directory, f'{os.getpid()}-{jobs}'))
+
+
+def _import(exported):
+    """Values of `_export`, the arrays memory-mapped copy-on-write and their files unlinked."""
+    values = {}
+    for name, (kind, value) in exported.items():
+        if kind == 'npy':
+            try:
+                # the mapping outlives the file name
+                values[name] = np.load(value, mmap_mode='c', allow_pickle=False)
+            finally:
+                os.remove(value)
+        else:
+            values[name] = value
+    return values
+
+
+class _Worker:
+    def __init__(self, context, directory, memory_bytes, warm_modules):
+        self.connection, child = context.Pipe()
+        self.process = context.Process(target=_serve, args=(child, directory, memory_bytes, warm_modules),
+                                       daemon=True)
+        self.process.start()
+        child.close()
+        self.jobs = 0
+
+    def stop(self):
+        try:
+            self.connection.send(None)
+        except (OSError, ValueError):
+            pass
+        self.connection.close()
+
+    def kill(self):
+        self.process.kill()
+        self.process.join()
+        self.connection.close()
+
+    def failure(self):
+        """Why the worker died during a job."""
+        self.process.join(1)
+        if self.process.exitcode == -signal.SIGXCPU:
+            return "the code exceeded its CPU time limit"
+        return f"the worker died with exit code {self.process.exitcode}"
+
+
+class SandboxPool:
+    """
+    Pool of warm worker processes running submitted code, see the module docstring.
+    Workers are started on the first job or on `start`, then kept until `shutdown`.
+
+    Parameters
+    ----------
+    workers: number of worker processes, as many jobs run at once
+    max_jobs: jobs a worker runs before it is replaced by a fresh one
+    cpu_seconds: CPU time limit of a job, None for no limit
+    memory_bytes: address space limit of a worker, None for no limit
+    timeout: default wall-clock limit of a job in seconds, its worker is killed past it
+    warm_modules: modules imported by the workers before their first job
+    """
+
+    def __init__(self, workers=1, max_jobs=50, cpu_seconds=30, memory_bytes=4 * 1024 ** 3, timeout=60,
+                 warm_modules=WARM_MODULES):
+        self.workers = workers
+        self.max_jobs = max_jobs
+        self.cpu_seconds = cpu_seconds
+        self.memory_bytes = memory_bytes
+        self.timeout = timeout
+        self.warm_modules = tuple(warm_modules)
+        # the default start method, as the other process pools of the framework
+        self._context = multiprocessing.get_context()
+        self._idle = deque()
+        self._condition = threading.Condition()
+        self._directory = None
+        self._started = False
+        self.jobs = 0
+        self.recycled = 0
+        self.killed = 0
+
+    def _spawn(self):
+        return _Worker(self._context, self._directory, self.memory_bytes, self.warm_modules)
+
+    def start(self):
+        """Start the workers now, so that the first jobs find them warm."""
+        with self._condition:
+            if self._started:
+                return
+            shared = SHARED_MEMORY_DIR if os.path.isdir(SHARED_MEMORY_DIR) else None
+            self._directory = tempfile.mkdtemp(prefix='classiq-sandbox-', dir=shared)
+            self._cleanup = weakref.finalize(self, shutil.rmtree, self._directory, True)
+            self._idle.extend(self._spawn() for _ in range(self.workers))
+            self._started = True
+
+    def _acquire(self):
+        self.start()
+        with self._condition:
+            while not self._idle:
+                self._condition.wait()
+            self.jobs += 1
+            return self._idle.popleft()
+
+    def _release(self, worker, replace=False):
+        with self._condition:
+            if not self._started:
+                worker.stop()
+                return
+            if replace:
+                worker = self._spawn()
+            elif worker.jobs >= self.max_jobs:
+                worker.stop()
+                worker = self._spawn()
+                self.recycled += 1
+            self._idle.append(worker)
+            self._condition.notify()
+
+    def run(self, code, names, timeout=None):
+        """
+        Execute `code` on a worker and return the variables it defines under `names`.
+
+        Parameters
+        ----------
+        timeout: wall-clock limit in seconds, `self.timeout` by default
+
+        Returns
+        -------
+        dict of name -> value, arrays memory-mapped copy-on-write
+
+        Raises
+        ------
+        SandboxError: the code raised, lacks one of `names`, timed out or exceeded a limit
+        """
+        timeout = self.timeout if timeout is None else timeout
+        worker = self._acquire()
+        worker.jobs += 1
+        try:
+            worker.connection.send((code, tuple(names), self.cpu_seconds))
+            if not worker.connection.poll(timeout):
+                worker.kill()
+                self.killed += 1
+                self._release(worker, replace=True)
+                raise SandboxError(f"the code did not finish within {timeout} s")
+            status, payload = worker.connection.recv()
+        except (EOFError, OSError) as e:
+            reason = worker.failure()
+            worker.kill()
+            self.killed += 1
+            self._release(worker, replace=True)
+            raise SandboxError(reason) from e
+        self._release(worker)
+        if status != 'ok':
+            raise SandboxError(payload)
+        return _import(payload)
+
+    def stats(self):
+        return {'workers': self.workers,
+                'idle': len(self._idle),
+                'jobs': self.jobs,
+                'recycled': self.recycled,
+                'killed': self.killed}
+
+    def shutdown(self):
+        with self._condition:
+            while self._idle:
+                self._idle.popleft().stop()
+            if self._started:
+                self._cleanup()
+            self._started = False
+
+
+# shared by the generators that are not given their own pool, started on the first ML problem
+SANDBOX = SandboxPool()
@@ -0,0 +1,182 @@
+"""
+Transpiled circuits shared across calls.
+
+Circuits are keyed by a structural hash (operations, their parameters and the bits they act
+on, gate definitions included) together with the backend, the optimization level and whether
+every qubit is measured, so that re-running a circuit with other seeds or shots, or re-building
+an equal circuit, does not transpile it again::
+
+    compiled = TRANSPILE_CACHE.get(circuit, backend=simulator, measure=True)
+
+Parameterized circuits (QAOA and VQE ansatze) are transpiled once with their parameters free,
+and each set of values is bound to the transpiled circuit::
+
+    compiled = TRANSPILE_CACHE.bind(ansatz, optimal_point, optimization_level=1)
+
+qiskit is imported where used, so that importing the generator stays cheap.
+"""
+import hashlib
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+
+def structural_hash(circuit):
+    """
+    Hash of the structure of a circuit. Circuits with the same operations, with the same
+    parameter values or parameter names, on the same bits, have the same hash.
+    """
+    from qiskit.circuit.library import get_standard_gate_name_mapping
+    standard = get_standard_gate_name_mapping()
+    definitions = {}
+
+    def circuit_digest(circuit):
+        digest = hashlib.sha256()
+        digest.update(f'{circuit.num_qubits},{circuit.num_clbits},{_param_repr(circuit.global_phase)}'
+                      .encode('utf-8'))
+        qubits = {qubit: index for index, qubit in enumerate(circuit.qubits)}
+        clbits = {clbit: index for index, clbit in enumerate(circuit.clbits)}
+        for instruction in circuit.data:
+            operation = instruction.operation
+            digest.update(operation.name.encode('utf-8'))
+            digest.update(','.join(_param_repr(param) for param in operation.params).encode('utf-8'))
+            digest.update(f'|{[qubits[qubit] for qubit in instruction.qubits]}'
+                          f'{[clbits[clbit] for clbit in instruction.clbits]}'.encode('utf-8'))
+            condition = getattr(operation, 'condition', None)
+            if condition is not None:
+                digest.update(repr(condition).encode('utf-8'))
+            if operation.name not in standard:
+                # custom gates of the same name may differ, e.g. the oracles of two problems
+                definition = getattr(operation, 'definition', None)
+                if definition is not None:
+                    if id(definition) not in definitions:
+                        definitions[id(definition)] = circuit_digest(definition)
+                    digest.update(definitions[id(definition)].encode('utf-8'))
+        return digest.hexdigest()
+
+    return circuit_digest(circuit)
+
+
+def _param_repr(param):
+    if isinstance(param, (int, float, complex, np.number)):
+        return repr(complex(param) if isinstance(param, complex) else float(param))
+    if isinstance(param, np.ndarray):
+        return hashlib.sha256(np.ascontiguousarray(param).tobytes()).hexdigest()
+    # ParameterExpression and the rest, by their text
+    return str(param)
+
+
+def backend_name(backend):
+    """Name of a backend as used in cache keys, None for no particular backend."""
+    if backend is None:
+        return None
+    name = getattr(backend, 'name', None)
+    return name() if callable(name) else name or repr(backend)
+
+
+class TranspileCache:
+    """
+    LRU cache of transpiled circuits, bounded by number of entries and total operation count
+    of the transpiled circuits, with hit and miss counters.
+
+    Parameters
+    ----------
+    max_entries: maximum number of transpiled circuits kept
+    max_operations: maximum sum of their sizes (instruction counts), a proxy for their memory
+    """
+
+    def __init__(self, max_entries=128, max_operations=1_000_000):
+        self.max_entries = max_entries
+        self.max_operations = max_operations
+        self._entries = OrderedDict()
+        self._operations = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.bindings = 0
+
+    @staticmethod
+    def key_for(circuit, backend=None, optimization_level=1, measure=False):
+        return structural_hash(circuit), backend_name(backend), optimization_level, measure
+
+    def get(self, circuit, backend=None, optimization_level=1, measure=False):
+        """
+        `circuit` transpiled for `backend` (None for no particular backend), computed on the
+        first request for that structure. The returned circuit is shared, do not modify it.
+
+        Parameters
+        ----------
+        measure: measure every qubit at the end, as needed by backends returning counts
+        """
+        key = self.key_for(circuit, backend, optimization_level, measure)
+        with self._lock:
+            compiled = self._entries.get(key)
+            if compiled is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return compiled
+            self.misses += 1
+        # transpiled outside of the lock, two threads may then both compile a new circuit
+        from qiskit import transpile
+        source = circuit.measure_all(inplace=False) if measure else circuit
+        compiled = transpile(source, backend=backend, optimization_level=optimization_level)
+        self._put(key, compiled)
+        return compiled
+
+    def bind(self, circuit, values, backend=None, optimization_level=1, measure=False):
+        """
+        A parameterized circuit transpiled once, then bound to `values`.
+
+        Parameters
+        ----------
+        values: dict of Parameter (or parameter name) to value, or sequence of values in the
+            order of `circuit.parameters`
+        """
+        if isinstance(values, dict):
+            by_name = {getattr(parameter, 'name', parameter): value for parameter, value in values.items()}
+        else:
+            values = list(values)
+            if len(values) != circuit.num_parameters:
+                raise ValueError(f"Expected {circuit.num_parameters} parameter values, got {len(values)}")
+            by_name = {parameter.name: value for parameter, value in zip(circuit.parameters, values)}
+        compiled = self.get(circuit, backend, optimization_level, measure)
+        with self._lock:
+            self.bindings += 1
+        # the cached circuit may come from an equal circuit with other Parameter objects, bind by name
+        return compiled.assign_parameters({parameter: by_name[parameter.name] for parameter in compiled.parameters})
+
+    def _put(self, key, compiled):
+        size = compiled.size()
+        with self._lock:
+            if key in self._entries:
+                self._operations -= self._entries.pop(key).size()
+            if size > self.max_operations:
+                return
+            self._entries[key] = compiled
+            self._operations += size
+            while len(self._entries) > self.max_entries or self._operations > self.max_operations:
+                _, evicted = self._entries.popitem(last=False)
+                self._operations -= evicted.size()
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._operations = 0
+
+    def stats(self):
+        return {'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'bindings': self.bindings,
+                'entries': len(self._entries),
+                'operations': self._operations}
+
+    def __len__(self):
+        return len(self._entries)
+
+
+# shared by the generator and the circuit artifacts
+TRANSPILE_CACHE = TranspileCache()
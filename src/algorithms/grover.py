@@ -12,21 +12,48 @@ from qiskit.circuit import QuantumCircuit
 from qiskit_algorithms import AmplificationProblem
 
 from src.algorithms.base_algorithm import BaseAlgorithm
+from src.algorithms.grover_simulator import StatevectorGrover, oracle_agrees, phase_mask
+from src.algorithms.grover_iterations import MAX_COUNTING_QUBITS, count_solutions, optimal_iterations, \
+    success_table, bbht_schedule
 from qiskit.circuit.library import PhaseOracle, GroverOperator
 from qiskit_algorithms import AmplificationProblem, Grover
 from qiskit import qasm2
 from qiskit.primitives import Sampler
 
+from src.Framework.profiling import NULL_PROFILER
+
 
 class GroverWrapper(BaseAlgorithm):
     def __init__(self,
                  oracle: QuantumCircuit,
-                 iterations,
+                 iterations=None,
                  is_good_state = None,
                  state_preparation: QuantumCircuit = None,
-                 objective_qubits=None
+                 objective_qubits=None,
+                 engine='auto',
+                 num_solutions=None,
+                 search_space_size=None
                  ):
+        """
+        Parameters
+        ----------
+        iterations: number of Grover iterations, or a list of them to try in turn until a good
+            state is measured. None picks the optimal count for `num_solutions`; if that is
+            unknown, solutions are counted with `is_good_state` on small problems, otherwise
+            iterations follow the BBHT exponential search schedule.
+        engine: 'sampler' simulates the whole circuit, ancillas included, with qiskit's Sampler.
+            'statevector' simulates the objective qubits only, evaluating `is_good_state`
+            classically instead of the oracle: the caller vouches that the predicate marks the
+            states the oracle does, and the oracle is never simulated. 'auto' picks 'statevector' when `is_good_state`
+            is given, the state preparation only acts on the objective qubits and the oracle
+            flips the phase of exactly the states the predicate accepts, checked once by
+            simulating the oracle; otherwise 'sampler'.
+        num_solutions: number of good states, when known
+        search_space_size: number of states the state preparation spreads over, 2^len(objective_qubits)
+            by default
+        """
         super().__init__()
+        has_good_state = is_good_state is not None
         self._grover_op = GroverOperator(oracle,
                                          reflection_qubits=objective_qubits)
         if objective_qubits is None:
@@ -38,21 +65,81 @@ class GroverWrapper(BaseAlgorithm):
             def func(state):
                 return True
             is_good_state = func
-        self.circuit = QuantumCircuit(oracle.num_qubits, len(objective_qubits))
-        self.circuit.compose(state_preparation, inplace=True)
-        self.circuit.compose(self._grover_op.power(iterations),
-                             inplace=True)
-        self.circuit.measure(objective_qubits,
-                             objective_qubits)
+        if search_space_size is None:
+            search_space_size = 2 ** len(objective_qubits)
+        if iterations is None and num_solutions is None and has_good_state \
+                and len(objective_qubits) <= MAX_COUNTING_QUBITS:
+            num_solutions = count_solutions(is_good_state, len(objective_qubits))
+        # expected success probability per iteration count, known along with the number of solutions
+        self.success_probabilities = None
+        if num_solutions is not None:
+            self.success_probabilities = success_table(num_solutions, search_space_size)
+        if iterations is None:
+            if num_solutions is not None:
+                iterations = optimal_iterations(num_solutions, search_space_size)
+            else:
+                iterations = bbht_schedule(search_space_size)
+        self.iterations = iterations
+        self.num_solutions = num_solutions
+        self._objective_qubits = objective_qubits
+        self._state_preparation = state_preparation
+        self._build_circuit(iterations if isinstance(iterations, int) else iterations[0])
         self.problem = AmplificationProblem(oracle,
                                             state_preparation=state_preparation,
                                             is_good_state=is_good_state,
                                             objective_qubits=objective_qubits)
-        self.grover = Grover(sampler=Sampler(), iterations=iterations)
+        if engine == 'auto':
+            use_statevector = has_good_state and StatevectorGrover.supports(self.problem) \
+                and oracle_agrees(oracle, phase_mask(self.problem.is_good_state, len(objective_qubits)), objective_qubits)
+        elif engine == 'statevector':
+            if not StatevectorGrover.supports(self.problem):
+                raise ValueError("The statevector engine needs a state preparation acting on the objective qubits only")
+            use_statevector = True
+        elif engine == 'sampler':
+            use_statevector = False
+        else:
+            raise ValueError(f"Unknown Grover engine: {engine}")
+        self.engine = 'statevector' if use_statevector else 'sampler'
+        if use_statevector:
+            self.grover = StatevectorGrover(iterations=iterations)
+        else:
+            self.grover = Grover(sampler=Sampler(), iterations=iterations)
+
+    def _build_circuit(self, power):
+        self.power = power
+        self.circuit = QuantumCircuit(self._grover_op.num_qubits, len(self._objective_qubits))
+        self.circuit.compose(self._state_preparation, inplace=True)
+        self.circuit.compose(self._grover_op.power(power),
+                             inplace=True)
+        self.circuit.measure(self._objective_qubits,
+                             self._objective_qubits)
+
+    @property
+    def expected_success_probability(self):
+        if self.success_probabilities is None or not isinstance(self.iterations, int):
+            return None
+        return self.success_probabilities.get(self.iterations)
 
-    def run(self, verbose=False):
-        result = self.grover.amplify(self.problem)
+    def run(self, verbose=False, profiler=None):
+        """
+        Parameters
+        ----------
+        profiler: optional Framework.profiling.Profiler recording a 'grover.amplify' span, with
+            the number of Grover iterations run and the stats of the exported circuit
+        """
+        profiler = profiler or NULL_PROFILER
+        with profiler.span('grover.amplify', engine=self.engine) as span:
+            result = self.grover.amplify(self.problem)
+            span.count('rounds', len(result.iterations))
+            span.count('iterations', sum(result.iterations))
+        if not isinstance(self.iterations, int) and result.iterations[-1] != self.power:
+            # exported circuit of the iteration count that ended the search
+            self._build_circuit(result.iterations[-1])
+        span.record_circuit('grover', self.circuit)
         if verbose:
+            if self.success_probabilities is not None:
+                print(f'{self.num_solutions} solutions, success probability per iteration count: '
+                      f'{ {k: round(p, 4) for k, p in self.success_probabilities.items()} }')
             print(result)
         return result
 
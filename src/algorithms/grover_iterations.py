@@ -0,0 +1,149 @@
+import math
+
+import numpy as np
+
+# beyond this many objective qubits, counting solutions by evaluating the predicate is too slow
+MAX_COUNTING_QUBITS = 16
+# models enumerated one blocking clause at a time before counting gives up on the SAT solver
+MAX_COUNTED_MODELS = 4096
+
+
+def rotation_angle(num_solutions, search_space_size):
+    """Angle theta with sin^2(theta) = M / N, the rotation of one Grover iteration is 2 * theta."""
+    return math.asin(math.sqrt(num_solutions / search_space_size))
+
+
+def success_probability(iterations, num_solutions, search_space_size):
+    """Probability of measuring a solution after `iterations` Grover iterations: sin^2((2k + 1) theta)."""
+    theta = rotation_angle(num_solutions, search_space_size)
+    return math.sin((2 * iterations + 1) * theta) ** 2
+
+
+def optimal_iterations(num_solutions, search_space_size):
+    """
+    Number of Grover iterations maximizing the success probability.
+
+    Parameters
+    ----------
+    num_solutions: number of marked states M
+    search_space_size: number of states N the search runs over
+
+    Returns
+    -------
+    int, 0 when there is no solution or when M / N is large enough that sampling the
+    prepared state directly is the best option
+    """
+    if num_solutions <= 0 or num_solutions >= search_space_size:
+        return 0
+    best = math.pi / (4 * rotation_angle(num_solutions, search_space_size)) - 0.5
+    candidates = {max(0, math.floor(best)), max(0, math.ceil(best))}
+    return max(sorted(candidates), key=lambda k: success_probability(k, num_solutions, search_space_size))
+
+
+def success_table(num_solutions, search_space_size, max_iterations=None):
+    """
+    Expected success probability per iteration count, from 0 to `max_iterations`
+    (twice the optimal count by default).
+
+    Returns
+    -------
+    dict mapping iteration counts to success probabilities
+    """
+    if max_iterations is None:
+        max_iterations = 2 * optimal_iterations(num_solutions, search_space_size) + 1
+    return {k: success_probability(k, num_solutions, search_space_size) for k in range(max_iterations + 1)}
+
+
+def count_cnf_models(cnf, num_vars=None, limit=None):
+    """
+    Count the satisfying assignments of a CNF formula with a SAT solver.
+
+    Parameters
+    ----------
+    cnf: pysat CNF formula, or a list of clauses
+    num_vars: number of variables of the search space, variables that appear in no clause
+        double the count. Defaults to the largest variable of the formula
+    limit: stop enumerating models past this many
+
+    Returns
+    -------
+    int number of models, or None if there are more than `limit`
+    """
+    from pysat.formula import CNF
+    from pysat.solvers import Solver
+    if not isinstance(cnf, CNF):
+        cnf = CNF(from_clauses=cnf)
+    used = sorted({abs(literal) for clause in cnf.clauses for literal in clause})
+    if num_vars is None:
+        num_vars = max(used, default=0)
+    count = 0
+    with Solver(bootstrap_with=cnf.clauses) as solver:
+        while solver.solve():
+            count += 1
+            if limit is not None and count > limit:
+                return None
+            model = solver.get_model()
+            # block this assignment of the variables used by the formula
+            solver.add_clause([-literal for literal in model if abs(literal) in used])
+            if not used:
+                break
+    return count * 2 ** (num_vars - len(used))
+
+
+def count_cnf_solutions(cnf, num_vars=None, limit=MAX_COUNTED_MODELS):
+    """
+    Count the satisfying assignments of a CNF formula, with the SAT solver up to `limit`
+    models, then by evaluating the clauses over every assignment when they use at most
+    MAX_COUNTING_QUBITS variables.
+
+    Returns
+    -------
+    int number of models, or None when there are more than `limit` on a larger formula
+    """
+    from pysat.formula import CNF
+    clauses = cnf.clauses if isinstance(cnf, CNF) else cnf
+    count = count_cnf_models(clauses, num_vars=num_vars, limit=limit)
+    if count is not None:
+        return count
+    used = sorted({abs(literal) for clause in clauses for literal in clause})
+    if num_vars is None:
+        num_vars = max(used, default=0)
+    if len(used) > MAX_COUNTING_QUBITS:
+        return None
+    column = {variable: j for j, variable in enumerate(used)}
+    # row i is assignment i of the variables used by the formula
+    bits = ((np.arange(2 ** len(used))[:, None] >> np.arange(len(used))) & 1).astype(bool)
+    satisfied = np.ones(2 ** len(used), dtype=bool)
+    for clause in clauses:
+        satisfied &= np.any([bits[:, column[abs(literal)]] == (literal > 0) for literal in clause], axis=0)
+    return int(satisfied.sum()) * 2 ** (num_vars - len(used))
+
+
+def count_solutions(is_good_state, num_qubits):
+    """Count the bitstrings of `num_qubits` bits accepted by the `is_good_state` predicate."""
+    from src.algorithms.grover_simulator import phase_mask
+    return int(phase_mask(is_good_state, num_qubits).sum())
+
+
+def bbht_schedule(search_space_size, growth=6 / 5, seed=None):
+    """
+    Iteration counts of the exponential search of Boyer, Brassard, Hoyer and Tapp for an
+    unknown number of solutions: round i draws k uniformly below m_i = min(growth^i, sqrt(N)).
+    The schedule stops once the total number of iterations reaches 9/4 sqrt(N), after which
+    the search concludes that there is no solution.
+
+    Returns
+    -------
+    list of iteration counts, to be tried in order until a solution is measured
+    """
+    rng = np.random.default_rng(seed)
+    bound = math.sqrt(search_space_size)
+    schedule = []
+    m = 1.0
+    total = 0
+    while total < 9 / 4 * bound:
+        k = int(rng.integers(math.ceil(m)))
+        schedule.append(k)
+        total += max(k, 1)
+        m = min(growth * m, bound)
+    return schedule
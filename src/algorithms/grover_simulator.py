@@ -0,0 +1,160 @@
+import numpy as np
+from qiskit.circuit import QuantumCircuit
+from qiskit.quantum_info import Statevector
+from qiskit_algorithms import AmplificationProblem, Grover, GroverResult
+
+# widest oracle, ancillas included, whose phases are checked against the predicate
+MAX_ORACLE_QUBITS = 20
+
+
+def phase_mask(is_good_state, num_qubits):
+    """
+    Classically evaluate the oracle over the objective subspace.
+
+    Parameters
+    ----------
+    is_good_state: predicate on measured bitstrings, as in AmplificationProblem
+    num_qubits: number of objective qubits k
+
+    Returns
+    -------
+    boolean array of size 2^k, True where the oracle flips the phase. Index i is the
+    measurement outcome whose bit j is objective qubit j.
+    """
+    return np.fromiter((bool(is_good_state(np.binary_repr(i, num_qubits))) for i in range(2 ** num_qubits)),
+                       dtype=bool, count=2 ** num_qubits)
+
+
+def oracle_agrees(oracle, good, objective_qubits):
+    """
+    Whether `oracle` flips the phase of exactly the `good` states of the objective qubits.
+
+    The oracle is simulated once on the uniform superposition of the objective qubits with
+    its ancillas in |0>. A phase oracle leaves the ancillas in |0> and multiplies each basis
+    state by a sign, which must be -1 on the good states and +1 on the others, up to a
+    global phase.
+
+    Parameters
+    ----------
+    oracle: circuit on the objective qubits and its ancillas
+    good: boolean phase mask of the predicate, see `phase_mask`
+    objective_qubits: qubits of the oracle the mask is indexed by
+
+    Returns
+    -------
+    False as well when the oracle is wider than MAX_ORACLE_QUBITS or cannot be simulated
+    """
+    if oracle.num_qubits > MAX_ORACLE_QUBITS:
+        return False
+    num_bits = len(objective_qubits)
+    prep = QuantumCircuit(oracle.num_qubits)
+    prep.h(objective_qubits)
+    try:
+        amplitudes = Statevector(prep).evolve(oracle).data
+    except Exception:
+        return False
+    # index of each objective bitstring in the full register, ancillas at 0
+    outcomes = np.arange(2 ** num_bits)
+    indices = np.zeros(2 ** num_bits, dtype=np.int64)
+    for position, qubit in enumerate(objective_qubits):
+        indices |= ((outcomes >> position) & 1) << qubit
+    phases = amplitudes[indices] * np.sqrt(2 ** num_bits)
+    if not np.allclose(np.abs(phases), 1.0, atol=1e-6):
+        # the ancillas were not uncomputed, or the oracle is not diagonal
+        return False
+    signs = np.where(good, -1.0, 1.0)
+    return bool(np.allclose(phases / phases[0], signs * signs[0], atol=1e-6))
+
+
+def prepared_state(state_preparation, objective_qubits):
+    """
+    Amplitudes of the state preparation restricted to the objective qubits.
+
+    Returns
+    -------
+    complex array of size 2^k, or None when the preparation touches any other qubit, in
+    which case the prepared state does not live in the objective subspace.
+    """
+    positions = {qubit: position for position, qubit in enumerate(objective_qubits)}
+    reduced = QuantumCircuit(len(objective_qubits))
+    for instruction in state_preparation.data:
+        if instruction.operation.name == 'barrier':
+            continue
+        if instruction.operation.name in ('measure', 'reset') or instruction.clbits:
+            return None
+        indices = [state_preparation.find_bit(qubit).index for qubit in instruction.qubits]
+        if any(index not in positions for index in indices):
+            return None
+        reduced.append(instruction.operation, [positions[index] for index in indices])
+    return Statevector(reduced).data
+
+
+def amplified_probabilities(initial_state, good, power):
+    """
+    Measurement probabilities after `power` Grover iterations.
+
+    The iterations rotate the state in the plane spanned by its good and bad components, so
+    the result follows from the weight of the good states alone: with sin^2(theta) that
+    weight, the good amplitudes are scaled by sin((2p+1)theta)/sin(theta) and the bad ones
+    by cos((2p+1)theta)/cos(theta).
+    """
+    probabilities = np.abs(initial_state) ** 2
+    good_weight = probabilities[good].sum()
+    if good_weight <= 0.0 or good_weight >= 1.0:
+        # the oracle acts as a global phase, the state does not move
+        return probabilities
+    theta = np.arcsin(np.sqrt(good_weight))
+    angle = (2 * power + 1) * theta
+    scale = np.where(good, np.sin(angle) ** 2 / good_weight, np.cos(angle) ** 2 / (1.0 - good_weight))
+    return probabilities * scale
+
+
+class StatevectorGrover(Grover):
+    """
+    Grover search simulated with NumPy on the 2^k amplitudes of the k objective qubits.
+
+    The oracle is replaced by the phase mask of `is_good_state`, so it is only exact when
+    the predicate agrees with the oracle (see `oracle_agrees`), and ancillas of the oracle
+    are never simulated.
+    `construct_circuit` still builds the full circuit for export.
+    """
+
+    def __init__(self, iterations):
+        super().__init__(iterations=iterations)
+        # like Grover, a list of iteration counts is tried in turn until a good state is measured
+        self._powers = list(iterations) if isinstance(iterations, (list, tuple)) else [iterations]
+
+    @staticmethod
+    def supports(problem: AmplificationProblem):
+        """True if the prepared state lives on the objective qubits only."""
+        return prepared_state(problem.state_preparation, problem.objective_qubits) is not None
+
+    def amplify(self, amplification_problem: AmplificationProblem) -> GroverResult:
+        objective_qubits = amplification_problem.objective_qubits
+        initial_state = prepared_state(amplification_problem.state_preparation, objective_qubits)
+        if initial_state is None:
+            raise ValueError("The state preparation acts outside of the objective qubits, "
+                             "use the sampler engine.")
+        num_bits = len(objective_qubits)
+        good = phase_mask(amplification_problem.is_good_state, num_bits)
+
+        iterations = []
+        all_circuit_results = []
+        for power in self._powers:
+            iterations.append(power)
+            probabilities = amplified_probabilities(initial_state, good, power)
+            all_circuit_results.append({np.binary_repr(int(i), num_bits): float(probabilities[i])
+                                        for i in np.flatnonzero(probabilities > 1e-12)})
+            top = int(np.argmax(probabilities))
+            if good[top]:
+                break
+
+        top_measurement = np.binary_repr(top, num_bits)
+        result = GroverResult()
+        result.iterations = iterations
+        result.top_measurement = top_measurement
+        result.assignment = amplification_problem.post_processing(top_measurement)
+        result.oracle_evaluation = bool(good[top])
+        result.circuit_results = all_circuit_results
+        result.max_probability = float(probabilities[top])
+        return result
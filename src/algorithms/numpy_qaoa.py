@@ -0,0 +1,247 @@
+import numpy as np
+from scipy.optimize import minimize
+
+from src.Framework.profiling import NULL_PROFILER
+
+# the statevectors of a batch take 16 * batch * 2^n bytes
+MAX_QUBITS = 24
+
+
+def cost_diagonal(num_qubits, terms, weights, constant=0.0):
+    """
+    Diagonal of the Ising cost Hamiltonian sum_k w_k prod_{i in term_k} Z_i + constant.
+
+    Returns
+    -------
+    float array of size 2^n, entry x is the cost of the basis state whose bit i is qubit i
+    """
+    indices = np.arange(2 ** num_qubits, dtype=np.int64)
+    cost = np.full(2 ** num_qubits, float(constant))
+    for term, weight in zip(terms, weights):
+        # Z eigenvalue of a product term is -1 where an odd number of its bits are set
+        parity = np.zeros(2 ** num_qubits, dtype=np.int64)
+        for qubit in set(int(qubit) for qubit in term):
+            parity ^= (indices >> qubit) & 1
+        cost += weight * (1 - 2 * parity)
+    return cost
+
+
+def apply_mixer(states, betas, num_qubits):
+    """
+    Apply exp(-i beta sum_j X_j) to a batch of statevectors, one beta per row, in place.
+
+    Each X_j swaps the amplitude pairs differing in bit j, and the exponentials of the X_j
+    commute, so the mixer is one cos / sin update per qubit on a reshaped view.
+    """
+    cos = np.cos(betas)[:, None, None, None]
+    sin = -1j * np.sin(betas)[:, None, None, None]
+    batch = states.shape[0]
+    for qubit in range(num_qubits):
+        view = states.reshape(batch, -1, 2, 2 ** qubit)
+        flipped = view[:, :, ::-1, :].copy()
+        view *= cos
+        view += sin * flipped
+    return states
+
+
+def apply_x_sum(states, num_qubits):
+    """sum_j X_j applied to a batch of statevectors."""
+    batch = states.shape[0]
+    result = np.zeros_like(states)
+    for qubit in range(num_qubits):
+        result.reshape(batch, -1, 2, 2 ** qubit)[...] += states.reshape(batch, -1, 2, 2 ** qubit)[:, :, ::-1, :]
+    return result
+
+
+def ramp_parameters(p, time=None):
+    """Linear ramp initial angles, gammas growing and betas shrinking as in an annealing schedule."""
+    time = 0.7 * p if time is None else time
+    fractions = (np.arange(p) + 0.5) / p
+    return np.concatenate((time / p * fractions, time / p * (1 - fractions)))
+
+
+class NumpyQAOAResult:
+    """
+    Outcome of NumpyQAOA.optimize, with the attributes of openqaoa's result that the Ising
+    class and the generator read: `optimized`, `most_probable_states`, `evals` and `plot_cost`.
+    """
+
+    def __init__(self, angles, cost, probabilities, solutions, energy, evals, costs):
+        self.optimized = {'angles': list(angles), 'cost': cost}
+        self.probabilities = probabilities
+        self.most_probable_states = {'solutions_bitstrings': solutions, 'bitstring_energy': energy}
+        self.evals = evals
+        self.intermediate = {'cost': costs}
+
+    def plot_cost(self):
+        import matplotlib.pyplot as plt
+        plt.plot(self.intermediate['cost'])
+        plt.xlabel('evaluation')
+        plt.ylabel('cost')
+
+    def __repr__(self):
+        return f'NumpyQAOAResult(optimized={self.optimized}, most_probable_states={self.most_probable_states})'
+
+
+class NumpyQAOA:
+    """
+    Exact QAOA on the statevector, with NumPy.
+
+    The cost Hamiltonian is diagonal, so its diagonal is computed once and a cost layer is an
+    elementwise phase, and the mixer is a cos / sin update per qubit. Whole batches of angle
+    sets are evaluated at once, expectations are exact and gradients are computed with the
+    adjoint method at the cost of about two more evaluations.
+
+    Angles are laid out as [gamma_1..gamma_p, beta_1..beta_p], layer k applying
+    exp(-i gamma_k C) then exp(-i beta_k sum_j X_j) to |+>^n.
+
+    Parameters
+    ----------
+    num_qubits: number of qubits n
+    terms / weights / constant: the Ising cost sum_k w_k prod_{i in term_k} Z_i + constant
+    p: number of layers
+    """
+
+    def __init__(self, num_qubits, terms, weights, constant=0.0, p=1):
+        if num_qubits > MAX_QUBITS:
+            raise ValueError(f"The numpy QAOA engine simulates up to {MAX_QUBITS} qubits, got {num_qubits}")
+        self.num_qubits = num_qubits
+        self.terms = [list(term) for term in terms]
+        self.weights = [float(weight) for weight in weights]
+        self.constant = float(constant)
+        self.p = p
+        self.cost = cost_diagonal(num_qubits, self.terms, self.weights, self.constant)
+        self.result = None
+
+    @classmethod
+    def from_qubo(cls, qubo, p=1):
+        """Engine for an openqaoa QUBO, whose terms and weights are already in Ising form."""
+        return cls(qubo.n, qubo.terms, qubo.weights, getattr(qubo, 'constant', 0.0), p=p)
+
+    @classmethod
+    def from_ising(cls, ising, p=1):
+        """Engine for a `SparseIsing` model."""
+        return cls(ising.num_variables, *ising.terms(), ising.offset, p=p)
+
+    def _split(self, params):
+        params = np.atleast_2d(np.asarray(params, dtype=float))
+        if params.shape[1] != 2 * self.p:
+            raise ValueError(f"Expected {2 * self.p} angles per set, got {params.shape[1]}")
+        return params[:, :self.p], params[:, self.p:]
+
+    def states(self, params):
+        """Final statevectors of a batch of angle sets, shape (batch, 2^n)."""
+        gammas, betas = self._split(params)
+        states = np.full((gammas.shape[0], 2 ** self.num_qubits), 2 ** (-self.num_qubits / 2), dtype=complex)
+        for layer in range(self.p):
+            states *= np.exp(-1j * gammas[:, layer, None] * self.cost[None, :])
+            apply_mixer(states, betas[:, layer], self.num_qubits)
+        return states
+
+    def expectation(self, params):
+        """Exact cost expectations of a batch of angle sets (or of one set)."""
+        states = self.states(params)
+        return (np.abs(states) ** 2) @ self.cost
+
+    def gradient(self, params):
+        """
+        Expectations and their gradients for a batch of angle sets, by the adjoint method.
+
+        Returns
+        -------
+        (energies of shape (batch,), gradients of shape (batch, 2p))
+        """
+        gammas, betas = self._split(params)
+        states = self.states(params)
+        energies = (np.abs(states) ** 2) @ self.cost
+        adjoint = states * self.cost[None, :]
+        gradients = np.zeros((states.shape[0], 2 * self.p))
+        # walk the layers back, d/dtheta of exp(-i theta G) is -i G exp(-i theta G), so the
+        # derivative of the expectation is 2 Im <adjoint|G|state> right after that gate
+        for layer in reversed(range(self.p)):
+            x_states = apply_x_sum(states, self.num_qubits)
+            gradients[:, self.p + layer] = 2 * np.imag(np.sum(adjoint.conj() * x_states, axis=1))
+            apply_mixer(states, -betas[:, layer], self.num_qubits)
+            apply_mixer(adjoint, -betas[:, layer], self.num_qubits)
+            gradients[:, layer] = 2 * np.imag(np.sum(adjoint.conj() * states * self.cost[None, :], axis=1))
+            phase = np.exp(1j * gammas[:, layer, None] * self.cost[None, :])
+            states *= phase
+            adjoint *= phase
+        return energies, gradients
+
+    def optimize(self, initial=None, starts=8, maxiter=200, shots=1024, seed=None, profiler=None):
+        """
+        Minimize the expectation from the best of a batch of starting angles with L-BFGS-B and
+        the analytic gradient, then sample the final state.
+
+        Parameters
+        ----------
+        initial: starting angles, the linear ramp by default
+        starts: number of starting points evaluated as one batch, the initial angles and
+            random ones around them
+        shots: number of samples of the final state the solutions are taken from
+        profiler: optional Framework.profiling.Profiler recording a 'qaoa.optimize' span
+
+        Returns
+        -------
+        NumpyQAOAResult
+        """
+        profiler = profiler or NULL_PROFILER
+        rng = np.random.default_rng(seed)
+        initial = ramp_parameters(self.p) if initial is None else np.asarray(initial, dtype=float)
+        with profiler.span('qaoa.optimize', engine='numpy') as span:
+            candidates = np.vstack([initial, initial + rng.normal(scale=0.3, size=(max(starts, 1) - 1, 2 * self.p))])
+            start = candidates[int(np.argmin(self.expectation(candidates)))]
+            costs = []
+
+            def objective(angles):
+                energies, gradients = self.gradient(angles)
+                costs.append(float(energies[0]))
+                return energies[0], gradients[0]
+
+            optimum = minimize(objective, start, jac=True, method='L-BFGS-B', options={'maxiter': maxiter})
+            evals = {'number_of_evals': len(candidates) + optimum.nfev, 'jac_evals': optimum.nfev}
+            span.count('evaluations', evals['number_of_evals'])
+            span.count('gradient_evaluations', evals['jac_evals'])
+            span.set(qubits=self.num_qubits, p=self.p)
+        probabilities = np.abs(self.states(optimum.x)[0]) ** 2
+        samples = np.unique(rng.choice(probabilities.size, size=shots, p=probabilities / probabilities.sum()))
+        energy = self.cost[samples].min()
+        solutions = [self.bitstring(x) for x in samples[np.isclose(self.cost[samples], energy)]]
+        self.result = NumpyQAOAResult(optimum.x, float(optimum.fun), probabilities, solutions, float(energy),
+                                      evals, costs)
+        return self.result
+
+    def bitstring(self, index):
+        """Basis state as a string whose character i is qubit i."""
+        return ''.join('1' if (index >> qubit) & 1 else '0' for qubit in range(self.num_qubits))
+
+    def circuit(self, params=None):
+        """
+        The QAOA circuit at `params`, the optimized angles by default, up to the global phase
+        of the constant.
+        """
+        from qiskit import QuantumCircuit
+        if params is None:
+            if self.result is None:
+                raise ValueError("No angles given and the engine was not optimized yet")
+            params = self.result.optimized['angles']
+        gammas, betas = self._split(params)
+        circuit = QuantumCircuit(self.num_qubits)
+        circuit.h(range(self.num_qubits))
+        for layer in range(self.p):
+            gamma = gammas[0, layer]
+            for term, weight in zip(self.terms, self.weights):
+                if len(term) == 1:
+                    circuit.rz(2 * gamma * weight, term[0])
+                elif len(term) == 2:
+                    circuit.rzz(2 * gamma * weight, term[0], term[1])
+                elif len(term) > 2:
+                    # parity of the term collected on its last qubit
+                    for control in term[:-1]:
+                        circuit.cx(control, term[-1])
+                    circuit.rz(2 * gamma * weight, term[-1])
+                    for control in reversed(term[:-1]):
+                        circuit.cx(control, term[-1])
+            circuit.rx(2 * betas[0, layer], range(self.num_qubits))
+        return circuit
@@ -12,24 +12,20 @@ draw_graph(graph, node_size=600, with_labels=True)
 
 from qiskit.quantum_info import SparsePauliOp
 
+from src.applications.graph.hamiltonians import zz_hamiltonian
+
+
+def build_max_cut_operator(graph: rx.PyGraph) -> SparsePauliOp:
+    """sum_ij w_ij Z_i Z_j over the edges of the graph, qubit i being node i."""
+    return zz_hamiltonian(graph.weighted_edge_list(), num_nodes=len(graph)).to_sparse_pauli_op()
+
 
 def build_max_cut_paulis(graph: rx.PyGraph) -> list[tuple[str, float]]:
     """Convert the graph to Pauli list.
 
     This function does the inverse of `build_max_cut_graph`
     """
-    pauli_list = []
-    for edge in list(graph.edge_list()):
-        paulis = ["I"] * len(graph)
-        print(paulis)
-        paulis[edge[0]], paulis[edge[1]] = "Z", "Z"
-
-        weight = graph.get_edge_data(edge[0], edge[1])
-        print("".join(paulis))
-        print("".join(paulis)[::-1])
-        pauli_list.append(("".join(paulis)[::-1], weight))
-
-    return pauli_list
+    return [(label, coeff.real) for label, coeff in build_max_cut_operator(graph).to_list()]
 
 
 max_cut_paulis = build_max_cut_paulis(graph)
@@ -0,0 +1,155 @@
+import json
+import os
+import tempfile
+import threading
+
+import numpy as np
+
+# features compared relative to their scale, see feature_distance
+FEATURES = ('nodes', 'edges', 'mean_degree', 'std_degree', 'max_degree', 'mean_weight', 'std_weight')
+
+
+def graph_features(graph):
+    """Size, degree distribution and weight statistics of a graph, as a dict of floats."""
+    degrees = np.array([degree for _, degree in graph.degree()], dtype=float)
+    weights = np.array([data.get('weight', 1.0) for _, _, data in graph.edges(data=True)], dtype=float)
+    if degrees.size == 0:
+        degrees = np.zeros(1)
+    if weights.size == 0:
+        weights = np.zeros(1)
+    return {'nodes': float(graph.number_of_nodes()),
+            'edges': float(graph.number_of_edges()),
+            'mean_degree': float(degrees.mean()),
+            'std_degree': float(degrees.std()),
+            'max_degree': float(degrees.max()),
+            'mean_weight': float(weights.mean()),
+            'std_weight': float(weights.std())}
+
+
+def feature_distance(left, right):
+    """Mean relative difference of two feature dicts, 0 for identical features."""
+    return float(np.mean([abs(left[name] - right[name]) / max(abs(left[name]), abs(right[name]), 1.0)
+                          for name in FEATURES]))
+
+
+def interpolate_angles(angles):
+    """
+    Angles of depth p + 1 from optimized angles of depth p, by linear interpolation of each
+    schedule (INTERP of Zhou et al.): x'_i = (i - 1) / p x_{i-1} + (p - i + 1) / p x_i.
+    """
+    p = len(angles)
+    padded = np.concatenate(([0.0], np.asarray(angles, dtype=float), [0.0]))
+    return [float((i - 1) / p * padded[i - 1] + (p - i + 1) / p * padded[i]) for i in range(1, p + 2)]
+
+
+class ParameterStore:
+    """
+    Optimized QAOA angles of solved instances, keyed by problem class and depth p, to start
+    new instances from. A new instance starts from the angles of the stored instance with
+    the nearest graph features, or from angles of depth p - 1 interpolated to depth p.
+
+    The store also counts the optimizer evaluations of cold and warm started runs, see `report`.
+
+    Parameters
+    ----------
+    path: JSON file persisting the store, None keeps it in memory only
+    max_distance: warm starts only come from instances whose features are at most this far,
+        see `feature_distance`
+    max_entries: number of instances kept per problem class and depth, the oldest are dropped
+    """
+
+    def __init__(self, path=None, max_distance=0.25, max_entries=256):
+        self.path = path
+        self.max_distance = max_distance
+        self.max_entries = max_entries
+        self._entries = {}
+        self._runs = {}
+        self._lock = threading.Lock()
+        if path is not None and os.path.exists(path):
+            with open(path) as f:
+                stored = json.load(f)
+            self._entries = stored.get('entries', {})
+            self._runs = stored.get('runs', {})
+
+    @staticmethod
+    def _key(class_name, p):
+        return f'{class_name}/{p}'
+
+    def initial_angles(self, class_name, p, graph):
+        """
+        Starting angles for a new instance.
+
+        Returns
+        -------
+        ({'gammas': [...], 'betas': [...]}, source) with source 'nearest' or 'interpolated',
+        or None when no stored instance is close enough
+        """
+        features = graph_features(graph)
+        for depth, source in ((p, 'nearest'), (p - 1, 'interpolated')):
+            if depth < 1:
+                continue
+            with self._lock:
+                candidates = list(self._entries.get(self._key(class_name, depth), []))
+            if not candidates:
+                continue
+            distance, nearest = min(((feature_distance(features, entry['features']), entry)
+                                     for entry in candidates), key=lambda pair: pair[0])
+            if distance > self.max_distance:
+                continue
+            angles = {'gammas': list(nearest['gammas']), 'betas': list(nearest['betas'])}
+            if depth != p:
+                angles = {name: interpolate_angles(values) for name, values in angles.items()}
+            return angles, source
+        return None
+
+    def record(self, class_name, p, graph, gammas, betas, evaluations=None, warm=False):
+        """
+        Store the optimized angles of an instance.
+
+        Parameters
+        ----------
+        evaluations: number of optimizer evaluations the run took, counted in `report`
+        warm: whether the run started from angles of this store
+        """
+        entry = {'features': graph_features(graph),
+                 'gammas': [float(gamma) for gamma in gammas],
+                 'betas': [float(beta) for beta in betas]}
+        key = self._key(class_name, p)
+        with self._lock:
+            entries = self._entries.setdefault(key, [])
+            entries.append(entry)
+            del entries[:-self.max_entries]
+            if evaluations is not None:
+                runs = self._runs.setdefault(key, {'cold': [], 'warm': []})
+                runs['warm' if warm else 'cold'].append(int(evaluations))
+                del runs['cold'][:-self.max_entries], runs['warm'][:-self.max_entries]
+        if self.path is not None:
+            self.save()
+
+    def report(self):
+        """
+        Mean optimizer evaluations of cold and warm started runs per problem class and depth,
+        and the fraction of evaluations warm starts saved.
+        """
+        report = {}
+        with self._lock:
+            for key, runs in self._runs.items():
+                cold = float(np.mean(runs['cold'])) if runs['cold'] else None
+                warm = float(np.mean(runs['warm'])) if runs['warm'] else None
+                report[key] = {'cold_runs': len(runs['cold']), 'warm_runs': len(runs['warm']),
+                               'cold_evaluations': cold, 'warm_evaluations': warm,
+                               'savings': 1.0 - warm / cold if cold and warm is not None else None}
+        return report
+
+    def save(self):
+        with self._lock:
+            payload = json.dumps({'entries': self._entries, 'runs': self._runs})
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        with os.fdopen(fd, 'w') as f:
+            f.write(payload)
+        os.replace(tmp_path, self.path)
+
+    def __len__(self):
+        return sum(len(entries) for entries in self._entries.values())
@@ -7,6 +7,8 @@ from qiskit import QuantumCircuit, qasm2
 from qiskit_algorithms.optimizers import SPSA
 from qiskit_algorithms import SamplingVQE, VQE
 
+from src.Framework.profiling import NULL_PROFILER
+
 
 class VQEAlgorithm(BaseAlgorithm):
     def __init__(self,
@@ -27,18 +29,29 @@ class VQEAlgorithm(BaseAlgorithm):
                        optimizer=SPSA(maxiter=100))
         self.is_executed = False
 
-    def run(self, verbose=False):
+    def run(self, verbose=False, profiler=None):
         """
         Generate and run the quantum code to find the minimum eigenvalue using VQE.
         Try to apply two-local ansatz
+        Args:
+            profiler: optional Framework.profiling.Profiler recording a 'vqe.optimize' span
         Returns:
             dict: The result containing the eigenvalue and optimal parameters.
         """
-        self.result = self.vqe.compute_minimum_eigenvalue(operator=self.observable)
+        profiler = profiler or NULL_PROFILER
+        with profiler.span('vqe.optimize') as span:
+            self.result = self.vqe.compute_minimum_eigenvalue(operator=self.observable)
+            span.count('evaluations', self.result.cost_function_evals or 0)
+            if profiler.enabled:
+                span.record_circuit('ansatz', self.ansatz.decompose())
         self.is_executed = True
         if verbose:
             print(self.result)
         return self.result
 
+    def export_circuit(self):
+        """The ansatz bound to the optimal point."""
+        return self.ansatz.bind_parameters(self.result.optimal_point)
+
     def export_to_qasm(self):
-        return qasm2.dumps(self.ansatz.bind_parameters(self.result.optimal_point))
+        return qasm2.dumps(self.export_circuit())
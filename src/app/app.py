@@ -1,19 +1,24 @@
 import tempfile
 
-from flask import Flask, render_template, request, jsonify
-from qiskit.visualization import circuit_drawer
-from qiskit import qasm2
-from applications.graph.Ising import Ising
-from Framework.generator import QASMGenerator
+from flask import Flask, render_template, request, jsonify, url_for, Response
 import os
 from werkzeug.utils import secure_filename
-from src.utils import *
+from src.app.jobs import LocalJobQueue
+from src.app.rendering import data_url
+from src.app.tasks import generate_circuit_result, graph_problem_result, circuit_renderer
+from src.classiq_exceptions import JobQueueFullError, JobNotFoundError
 
 app = Flask(__name__)
 
 # Dummy parser function for example
 app.config['UPLOAD_FOLDER'] = 'uploads'
 app.config['ALLOWED_EXTENSIONS'] = {'gset', 'txt', 'csv'}
+# solver jobs submitted through /jobs/... run on a bounded worker pool
+app.config['JOB_WORKERS'] = int(os.environ.get('CLASSIQ_JOB_WORKERS', 2))
+app.config['JOB_MAX_PENDING'] = int(os.environ.get('CLASSIQ_JOB_MAX_PENDING', 16))
+app.config['JOB_QUEUE'] = None
+# seconds a /render_circuit request waits for its diagram
+app.config['RENDER_TIMEOUT'] = float(os.environ.get('CLASSIQ_RENDER_TIMEOUT', 120))
 
 
 def allowed_file(filename):
@@ -35,85 +40,126 @@ def graph_problem():
     return render_template('graph_problem.html')
 
 
-@app.route('/generate_circuit', methods=['POST'])
-def generate_circuit():
-    data = request.json
-    classical_code = data['classical_code']
-
-    generator = QASMGenerator()
-    qasm_codes, img_ios = generator.qasm_generate(classical_code, verbose=False)
-    qasm_code_results = {}
-    circuit_images = {}
-    for key, qasm_code in qasm_codes.items():
-        # Convert QASM 2.0 code to QuantumCircuit
-        circuit = qasm2.loads(qasm_code,
-                              custom_instructions=qasm2.LEGACY_CUSTOM_INSTRUCTIONS)
-
-        # Transpile the circuit for visualization
-        transpiled_circuit = circuit
-
-        # Generate circuit diagram as an image
-        img = circuit_drawer(transpiled_circuit, output='mpl')
-
-        img_str = img_gen_img_io(img)
-        # Store the results in the dictionaries
-        qasm_code_results[key] = qasm_code.strip()
-        circuit_images[key] = f"data:image/png;base64,{img_str}"
-    for key, img_io in img_ios.items():
-        img_ios[key] = f"data:image/png;base64,{img_io}"
-    return jsonify({
-        'qasm_code': qasm_code_results,
-        'circuit_image': circuit_images,
-        'img_ios': img_ios
-    })
-
-
-@app.route('/graph_problem', methods=['POST'])
-def process_graph():
-    graph_problem_type = request.form['problem_type']
+def saved_graph_input():
+    """Path of the graph sent with a /graph_problem form, either uploaded or typed in."""
     if 'gset_file' in request.files:
         file = request.files['gset_file']
         if file and allowed_file(file.filename):
             filename = secure_filename(file.filename)
             file_path = os.path.join(app.config['UPLOAD_FOLDER'], filename)
             file.save(file_path)
-
+            return file_path
     elif 'gset_data' in request.form:
         manual_input = request.form['gset_data']
         with tempfile.NamedTemporaryFile(delete=False, suffix='.gset') as temp_file:
             temp_file.write(manual_input.encode('utf-8'))
-            file_path = temp_file.name
+            return temp_file.name
+    return None
+
+
+def images_requested():
+    """The `images` flag of a request, from its JSON body or form, True unless set to false."""
+    data = request.get_json(silent=True) or request.form
+    value = data.get('images', True)
+    if isinstance(value, str):
+        return value.lower() not in ('false', '0', 'no')
+    return bool(value)
+
+
+def get_job_queue():
+    """Job queue of the app, `app.config['JOB_QUEUE']` can be set to plug in another one."""
+    queue = app.config.get('JOB_QUEUE')
+    if queue is None:
+        queue = LocalJobQueue(max_workers=app.config['JOB_WORKERS'],
+                              max_pending=app.config['JOB_MAX_PENDING'])
+        app.config['JOB_QUEUE'] = queue
+    return queue
+
+
+@app.route('/generate_circuit', methods=['POST'])
+def generate_circuit():
+    data = request.json
+    classical_code = data['classical_code']
+    return jsonify(generate_circuit_result(classical_code, images_requested()))
+
+
+@app.route('/graph_problem', methods=['POST'])
+def process_graph():
+    graph_problem_type = request.form['problem_type']
+    file_path = saved_graph_input()
+    if not file_path:
+        return jsonify({'error': 'No valid input provided'}), 400
+    return jsonify(graph_problem_result(file_path, graph_problem_type, images_requested()))
+
+
+@app.route('/jobs/generate_circuit', methods=['POST'])
+def submit_generate_circuit():
+    data = request.json
+    return submit_job('generate_circuit', generate_circuit_result, data['classical_code'], images_requested())
+
+
+@app.route('/jobs/graph_problem', methods=['POST'])
+def submit_graph_problem():
+    graph_problem_type = request.form['problem_type']
+    file_path = saved_graph_input()
     if not file_path:
         return jsonify({'error': 'No valid input provided'}), 400
-    problem_instance = Ising(input_data=file_path,
-                             class_name=graph_problem_type)
-    problem_instance.run(verbose=True)
-    circuit, qasm_code = problem_instance.generate_qasm()
-    # Generate a QuantumCircuit from QASM code
-    # circuit = qiskit.qasm2.loads(qasm_code)
-    # Generate circuit diagram as an image
-    img = circuit_drawer(circuit.decompose(), output='mpl')
-
-    # Convert image to base64 string
-    buf = BytesIO()
-    img.figure.savefig(buf, format='png')
-    buf.seek(0)
-    circuit_img_str = base64.b64encode(buf.getvalue()).decode('utf-8')
-    buf.close()
-    plt.close()
-
-    problem_instance.plot_graph_solution()
-    buf = BytesIO()
-    plt.savefig(buf, format='png')
-    buf.seek(0)
-    graph_img_str = base64.b64encode(buf.getvalue()).decode('utf-8')
-    buf.close()
-    plt.close()
-    return jsonify({
-        'qasm_code': qasm_code.strip(),
-        'circuit_image': f"data:image/png;base64,{circuit_img_str}",
-        'graph_image': f"data:image/png;base64,{graph_img_str}"
-    })
+    return submit_job('graph_problem', graph_problem_result, file_path, graph_problem_type, images_requested())
+
+
+@app.route('/render_circuit', methods=['POST'])
+def render_circuit():
+    """
+    Diagram of a circuit, rendered on demand and cached by QASM hash. The body holds either
+    `qasm`, a QASM 2.0 string, or `qasm_codes`, a dict of them, and optionally `decompose`.
+    """
+    data = request.json
+    decompose = bool(data.get('decompose', False))
+    timeout = app.config['RENDER_TIMEOUT']
+    try:
+        if 'qasm_codes' in data:
+            pngs = circuit_renderer.render_many(data['qasm_codes'], decompose=decompose, timeout=timeout)
+            return jsonify({'circuit_image': {key: data_url(png) for key, png in pngs.items()}})
+        return jsonify({'circuit_image': data_url(circuit_renderer.render(data['qasm'], decompose=decompose,
+                                                                          timeout=timeout))})
+    except TimeoutError:
+        return jsonify({'error': 'Rendering timed out'}), 503, {'Retry-After': '5'}
+    except Exception as e:
+        return jsonify({'error': f'{type(e).__name__}: {e}'}), 400
+
+
+@app.route('/render_circuit/<qasm_hash>.png', methods=['GET'])
+def rendered_circuit(qasm_hash):
+    """A diagram already rendered, by the `qasm_hash` returned along with its QASM code."""
+    png = circuit_renderer.cached(qasm_hash)
+    if png is None:
+        return jsonify({'error': 'Circuit not rendered yet, POST its qasm to /render_circuit'}), 404
+    return Response(png, mimetype='image/png')
+
+
+def submit_job(kind, func, *args):
+    try:
+        job_id = get_job_queue().submit(kind, func, *args)
+    except JobQueueFullError as e:
+        return jsonify({'error': e.message}), 429, {'Retry-After': '5'}
+    return jsonify({'job_id': job_id, 'status_url': url_for('job_status', job_id=job_id)}), 202
+
+
+@app.route('/jobs/<job_id>', methods=['GET'])
+def job_status(job_id):
+    try:
+        return jsonify(get_job_queue().status(job_id))
+    except JobNotFoundError as e:
+        return jsonify({'error': e.message}), 404
+
+
+@app.route('/jobs/<job_id>', methods=['DELETE'])
+def cancel_job(job_id):
+    try:
+        cancelled = get_job_queue().cancel(job_id)
+    except JobNotFoundError as e:
+        return jsonify({'error': e.message}), 404
+    return jsonify({'job_id': job_id, 'cancelled': cancelled})
 
 
 if __name__ == '__main__':
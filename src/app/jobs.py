@@ -0,0 +1,236 @@
+import logging
+import multiprocessing
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, CancelledError
+
+from src.classiq_exceptions import JobQueueFullError, JobNotFoundError
+
+QUEUED = 'queued'
+RUNNING = 'running'
+DONE = 'done'
+FAILED = 'failed'
+CANCELLED = 'cancelled'
+
+logger = logging.getLogger(__name__)
+
+# ids of the jobs starting on this worker process are put there, see LocalJobQueue
+_started_jobs = None
+
+
+def _init_worker(started_jobs):
+    global _started_jobs
+    _started_jobs = started_jobs
+
+
+def _run_job(job_id, notify, func, *args):
+    """Run `func(*args)` on a worker, first reporting that the job started."""
+    if notify is not None:
+        notify(job_id)
+    elif _started_jobs is not None:
+        _started_jobs.put(job_id)
+    return func(*args)
+
+
+class Job:
+    def __init__(self, job_id, kind):
+        self.job_id = job_id
+        self.kind = kind
+        self.status = QUEUED
+        self.result = None
+        self.error = None
+        self.submitted_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.future = None
+
+    def is_finished(self):
+        return self.status in (DONE, FAILED, CANCELLED)
+
+    def to_dict(self):
+        info = {'job_id': self.job_id,
+                'kind': self.kind,
+                'status': self.status,
+                'submitted_at': self.submitted_at}
+        end = self.finished_at or time.time()
+        if self.started_at is not None:
+            info['running_for'] = end - self.started_at
+        if self.status == DONE:
+            info['result'] = self.result
+        elif self.status == FAILED:
+            info['error'] = self.error
+        return info
+
+
+class JobQueue:
+    """
+    Interface of the job queues used by the web app. Jobs are functions run away from the
+    request handler; clients poll `status` until the job is done.
+    """
+
+    def submit(self, kind, func, *args):
+        """Schedule `func(*args)` and return the new job id."""
+        raise NotImplementedError("Subclasses should implement this method")
+
+    def status(self, job_id):
+        """Return a dict describing the job, with its result once done."""
+        raise NotImplementedError("Subclasses should implement this method")
+
+    def cancel(self, job_id):
+        """Cancel the job, return True if it will not produce a result."""
+        raise NotImplementedError("Subclasses should implement this method")
+
+    def shutdown(self):
+        pass
+
+
+class LocalJobQueue(JobQueue):
+    """
+    Runs jobs on a bounded local worker pool.
+
+    Parameters
+    ----------
+    max_workers: size of the worker pool
+    max_pending: jobs queued or running beyond which `submit` raises JobQueueFullError
+    max_finished: finished jobs whose results are kept for polling, oldest are dropped first
+    executor: thread pool to run the jobs on, a process pool of `max_workers` by default
+    """
+
+    def __init__(self, max_workers=2, max_pending=16, max_finished=256, executor=None):
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.max_finished = max_finished
+        self._jobs = OrderedDict()
+        self._lock = threading.RLock()
+        self._started_jobs = None
+        if executor is None:
+            # the workers report the jobs they start on a queue drained by a listener thread
+            context = multiprocessing.get_context()
+            self._started_jobs = context.SimpleQueue()
+            executor = ProcessPoolExecutor(max_workers=max_workers, mp_context=context, initializer=_init_worker,
+                                           initargs=(self._started_jobs,))
+            threading.Thread(target=self._listen, daemon=True).start()
+            self._notify = None
+        else:
+            # threads mark their jobs running themselves
+            self._notify = self._mark_running
+        self._executor = executor
+
+    def _pending_count(self):
+        return sum(1 for job in self._jobs.values() if not job.is_finished())
+
+    def submit(self, kind, func, *args):
+        with self._lock:
+            if self._pending_count() >= self.max_pending:
+                raise JobQueueFullError(self.max_pending)
+            job = Job(uuid.uuid4().hex, kind)
+            self._jobs[job.job_id] = job
+            self._trim()
+        try:
+            job.future = self._executor.submit(_run_job, job.job_id, self._notify, func, *args)
+        except Exception:
+            with self._lock:
+                del self._jobs[job.job_id]
+            raise
+        job.future.add_done_callback(lambda future: self._on_done(job, future))
+        return job.job_id
+
+    def _listen(self):
+        while True:
+            job_id = self._started_jobs.get()
+            if job_id is None:
+                return
+            self._mark_running(job_id)
+
+    def _mark_running(self, job_id):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            # the job may already be done when the worker's message comes in
+            if job is not None and job.status == QUEUED:
+                job.status = RUNNING
+                job.started_at = time.time()
+
+    def _on_done(self, job, future):
+        with self._lock:
+            if job.status == CANCELLED:
+                return
+            job.finished_at = time.time()
+            try:
+                job.result = future.result()
+                job.status = DONE
+            except CancelledError:
+                job.status = CANCELLED
+            except Exception as e:
+                job.error = f'{type(e).__name__}: {e}'
+                job.status = FAILED
+
+    def _trim(self):
+        finished = [job_id for job_id, job in self._jobs.items() if job.is_finished()]
+        for job_id in finished[:max(0, len(finished) - self.max_finished)]:
+            del self._jobs[job_id]
+
+    def _get(self, job_id):
+        job = self._jobs.get(job_id)
+        if job is None:
+            raise JobNotFoundError(job_id)
+        return job
+
+    def status(self, job_id):
+        with self._lock:
+            job = self._get(job_id)
+            info = job.to_dict()
+            if job.status == QUEUED:
+                queued = [j for j in self._jobs.values() if j.status == QUEUED]
+                info['queue_position'] = queued.index(job)
+            return info
+
+    def cancel(self, job_id):
+        with self._lock:
+            job = self._get(job_id)
+            if job.is_finished():
+                return job.status == CANCELLED
+            # a job already handed to a worker cannot be interrupted, it keeps its slot until it is done
+            if job.future is not None and not job.future.cancel():
+                return False
+            job.status = CANCELLED
+            job.finished_at = time.time()
+            return True
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        if self._started_jobs is not None:
+            self._started_jobs.put(None)
+
+
+class InlineJobQueue(JobQueue):
+    """Runs every job synchronously inside `submit`, a stand-in for LocalJobQueue in tests."""
+
+    def __init__(self):
+        self._jobs = {}
+
+    def submit(self, kind, func, *args):
+        job = Job(uuid.uuid4().hex, kind)
+        job.started_at = time.time()
+        try:
+            job.result = func(*args)
+            job.status = DONE
+        except Exception as e:
+            job.error = f'{type(e).__name__}: {e}'
+            job.status = FAILED
+            logger.exception('Job %s (%s) failed', job.job_id, kind)
+        job.finished_at = time.time()
+        self._jobs[job.job_id] = job
+        return job.job_id
+
+    def status(self, job_id):
+        job = self._jobs.get(job_id)
+        if job is None:
+            raise JobNotFoundError(job_id)
+        return job.to_dict()
+
+    def cancel(self, job_id):
+        if job_id not in self._jobs:
+            raise JobNotFoundError(job_id)
+        return False
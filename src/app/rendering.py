@@ -0,0 +1,173 @@
+import base64
+import hashlib
+import re
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from Framework.artifact import CircuitArtifact
+from Framework.cache import MemoryBackend, DiskBackend
+
+
+_QASM_HASH = re.compile(r'[0-9a-f]{64}')
+
+
+def qasm_hash(qasm, decompose=False):
+    """Key of the diagram of a QASM string, surrounding whitespace does not matter."""
+    payload = qasm.strip() + ('\n//decompose' if decompose else '')
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def render_qasm(qasm, decompose=False):
+    """
+    Draw the circuit of a QASM 2.0 string with matplotlib.
+
+    Parameters
+    ----------
+    qasm: QASM string, or the QuantumCircuit itself, which is then not parsed again
+    decompose: draw the circuit one level of gate definitions down
+
+    Returns
+    -------
+    bytes of the PNG image
+    """
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    from io import BytesIO
+    from qiskit import qasm2
+    from qiskit.visualization import circuit_drawer
+    if isinstance(qasm, str):
+        circuit = qasm2.loads(qasm, custom_instructions=qasm2.LEGACY_CUSTOM_INSTRUCTIONS)
+    else:
+        circuit = qasm
+    if decompose:
+        circuit = circuit.decompose()
+    figure = circuit_drawer(circuit, output='mpl')
+    buf = BytesIO()
+    figure.savefig(buf, format='png')
+    plt.close(figure)
+    return buf.getvalue()
+
+
+def data_url(png):
+    return f"data:image/png;base64,{base64.b64encode(png).decode('utf-8')}"
+
+
+class _PngDiskBackend(DiskBackend):
+    suffix = '.png'
+
+
+class CircuitRenderer:
+    """
+    Renders circuit diagrams on a dedicated worker process, away from the solvers, and caches
+    the PNGs by QASM hash. Concurrent requests for the same diagram share one rendering.
+
+    Parameters
+    ----------
+    directory: where to persist the PNGs, None keeps them in memory only
+    max_entries / max_bytes: bounds of the memory cache
+    executor: executor to render on, a single worker process by default, created on first use
+    """
+
+    def __init__(self, directory=None, max_entries=256, max_bytes=64 * 1024 * 1024, executor=None):
+        self._memory = MemoryBackend(max_entries=max_entries, max_bytes=max_bytes)
+        self._disk = _PngDiskBackend(directory) if directory is not None else None
+        self._executor = executor
+        self._owns_executor = executor is None
+        self._pending = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def cached(self, key):
+        """
+        PNG bytes stored under `key`, None if that diagram was never rendered. Diagrams on disk
+        are found by file name, whichever process rendered them (e.g. a job worker).
+        """
+        if not _QASM_HASH.fullmatch(key):
+            return None
+        with self._lock:
+            png = self._memory.get(key)
+            if png is None and self._disk is not None:
+                png = self._disk.get(key)
+                if png is not None:
+                    self._memory.put(key, png)
+            return png
+
+    def _store(self, key, png):
+        with self._lock:
+            self._memory.put(key, png)
+            if self._disk is not None:
+                self._disk.put(key, png)
+
+    def _submit(self, payload, decompose):
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=1)
+        try:
+            return self._executor.submit(render_qasm, payload, decompose)
+        except BrokenProcessPool:
+            # the render worker died, e.g. on a huge diagram, start a fresh one
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = ProcessPoolExecutor(max_workers=1)
+            return self._executor.submit(render_qasm, payload, decompose)
+
+    def submit(self, qasm, decompose=False):
+        """
+        Request the diagram of `qasm`, a QASM string or a CircuitArtifact. The circuit of an
+        artifact is shipped to the worker as is when it is in memory, instead of its QASM.
+
+        Returns
+        -------
+        (key, future) where the future resolves to the PNG bytes, it is already done on a cache hit
+        """
+        payload = qasm
+        if isinstance(qasm, CircuitArtifact):
+            payload = qasm.circuit if qasm.has_circuit else qasm.qasm
+            qasm = qasm.qasm
+        key = qasm_hash(qasm, decompose)
+        png = self.cached(key)
+        with self._lock:
+            if png is not None:
+                self.hits += 1
+                future = Future()
+                future.set_result(png)
+                return key, future
+            future = self._pending.get(key)
+            if future is not None:
+                return key, future
+            self.misses += 1
+            future = self._submit(payload, decompose)
+            self._pending[key] = future
+
+        def on_done(done):
+            with self._lock:
+                self._pending.pop(key, None)
+            if not done.cancelled() and done.exception() is None:
+                self._store(key, done.result())
+
+        future.add_done_callback(on_done)
+        return key, future
+
+    def render(self, qasm, decompose=False, timeout=None):
+        """PNG bytes of the diagram of `qasm`, rendered or served from the cache."""
+        return self.submit(qasm, decompose)[1].result(timeout=timeout)
+
+    def render_many(self, qasm_codes, decompose=False, timeout=None):
+        """
+        Diagrams of a dict of QASM strings or CircuitArtifact, rendered concurrently.
+        Returns a dict of PNG bytes.
+        """
+        futures = {name: self.submit(qasm, decompose)[1] for name, qasm in qasm_codes.items()}
+        return {name: future.result(timeout=timeout) for name, future in futures.items()}
+
+    def stats(self):
+        return {'hits': self.hits,
+                'misses': self.misses,
+                'pending': len(self._pending),
+                'memory_entries': len(self._memory),
+                'disk_entries': len(self._disk) if self._disk is not None else 0}
+
+    def shutdown(self):
+        if self._executor is not None and self._owns_executor:
+            self._executor.shutdown(wait=False, cancel_futures=True)
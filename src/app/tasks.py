@@ -0,0 +1,61 @@
+import os
+
+from Framework.artifact import CircuitArtifact
+from Framework.generator import QASMGenerator
+from Framework.cache import ResultCache
+from Framework.sandbox import SandboxPool
+from src.app.rendering import CircuitRenderer, data_url, qasm_hash
+from src.utils import *
+
+# results of already solved problems are reused across requests and restarts
+result_cache = ResultCache(directory=os.environ.get('CLASSIQ_CACHE_DIR', os.path.join('cache', 'results')))
+# circuit diagrams are drawn on their own worker process and cached by QASM hash
+circuit_renderer = CircuitRenderer(directory=os.environ.get('CLASSIQ_RENDER_CACHE_DIR',
+                                                            os.path.join('cache', 'circuits')))
+# files the submitted code may load (np.load, nx.read_edgelist, read_gset_file...), none outside of it
+data_dir = os.environ.get('CLASSIQ_DATA_DIR', 'data')
+# machine learning scripts run on warm worker processes, under CPU time and memory limits
+ml_sandbox = SandboxPool(workers=int(os.environ.get('CLASSIQ_ML_WORKERS', 2)),
+                         max_jobs=int(os.environ.get('CLASSIQ_ML_MAX_JOBS', 50)),
+                         cpu_seconds=float(os.environ.get('CLASSIQ_ML_CPU_SECONDS', 30)),
+                         memory_bytes=int(os.environ.get('CLASSIQ_ML_MEMORY_MB', 4096)) * 1024 * 1024,
+                         timeout=float(os.environ.get('CLASSIQ_ML_TIMEOUT', 60)))
+
+
+def generate_circuit_result(classical_code, images=True):
+    """
+    Payload of /generate_circuit: qasm codes and their hashes, plus the circuit diagrams and
+    solution plots unless `images` is False. Diagrams can then be requested from /render_circuit.
+    """
+    generator = QASMGenerator(cache=result_cache, render_images=images, data_dir=data_dir,
+                              sandbox=ml_sandbox)
+    artifacts, img_ios = generator.generate(classical_code, verbose=False)
+    qasm_codes = {key: artifact.qasm for key, artifact in artifacts.items()}
+    result = {
+        'qasm_code': {key: qasm_code.strip() for key, qasm_code in qasm_codes.items()},
+        'qasm_hash': {key: qasm_hash(qasm_code) for key, qasm_code in qasm_codes.items()},
+        'img_ios': {key: f"data:image/png;base64,{img_io}" for key, img_io in img_ios.items()}
+    }
+    if images:
+        result['circuit_image'] = {key: data_url(png)
+                                   for key, png in circuit_renderer.render_many(artifacts).items()}
+    return result
+
+
+def graph_problem_result(file_path, graph_problem_type, images=True):
+    """Payload of /graph_problem: QAOA circuit, plus its diagram and the solution plot unless `images` is False."""
+    from applications.graph.Ising import Ising
+    problem_instance = Ising(input_data=file_path,
+                             class_name=graph_problem_type)
+    problem_instance.run(verbose=True)
+    circuit, qasm_code = problem_instance.generate_qasm()
+    result = {
+        'qasm_code': qasm_code.strip(),
+        'qasm_hash': qasm_hash(qasm_code, decompose=True)
+    }
+    if images:
+        result['circuit_image'] = data_url(circuit_renderer.render(CircuitArtifact(circuit, qasm=qasm_code),
+                                                                   decompose=True))
+        problem_instance.plot_graph_solution()
+        result['graph_image'] = f"data:image/png;base64,{plot_gen_img_io()}"
+    return result
@@ -47,3 +47,20 @@ def quantum_factor_mul_oracle(n):
     circuit = circuit.compose(multiplier_circuit.inverse())
     return circuit, prep_state, obj_bits
 
+
+def count_factor_pairs(n):
+    """
+    Number of solutions of the search run on `quantum_factor_mul_oracle(n)`: pairs (a, b) of
+    num_state_qubits-bit integers whose product, truncated to the bits of n, equals n.
+
+    Returns
+    -------
+    num_solutions, search_space_size
+    """
+    num_result_qubits = n.bit_length()
+    num_state_qubits = math.ceil(num_result_qubits / 2)
+    size = 2 ** num_state_qubits
+    modulus = 2 ** num_result_qubits
+    num_solutions = sum(1 for a in range(size) for b in range(size) if (a * b) % modulus == n)
+    return num_solutions, size * size
+
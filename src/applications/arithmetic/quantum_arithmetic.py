@@ -3,17 +3,19 @@ from qiskit.circuit.library import CDKMRippleCarryAdder, RGQFTMultiplier
 from qiskit.circuit import QuantumCircuit
 from qiskit.primitives import Sampler
 from qiskit.circuit.library import VBERippleCarryAdder
-import pennylane as qml
-import matplotlib.pyplot as plt
 from src.utils import *
 
 
 def add_k_fourier(k, wires):
+    import pennylane as qml
     for j in range(len(wires)):
         qml.RZ(k * np.pi / 2 ** j, wires=wires[j])
 
 
 def quantum_mul_pennylane(m, k, verbose=False):
+    # pennylane and matplotlib take seconds to import, only load them for this variant
+    import pennylane as qml
+    import matplotlib.pyplot as plt
     wires_m = list(range(minimum_bits_required(m)))
     wires_k = list(range(len(wires_m), minimum_bits_required(k) + len(wires_m)))
     # m and k codification
@@ -38,6 +40,7 @@ def quantum_mul_pennylane(m, k, verbose=False):
 
 
 def multiplication_pennylane(wires_m, wires_k, wires_solution):
+    import pennylane as qml
     # prepare sol-qubits to counting
     qml.QFT(wires=wires_solution)
 
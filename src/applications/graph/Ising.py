@@ -13,6 +13,12 @@ from qiskit import IBMQ
 from src.utils import adjacency_matrix_from_adj_dict
 from src.applications.graph.ising_auxiliary import *
 from src.Framework.interpreter import Interpreter
+from src.Framework.profiling import NULL_PROFILER
+from src.algorithms.numpy_qaoa import NumpyQAOA
+from src.applications.quadratic_program import SparseIsing
+
+# exact statevector QAOA with analytic gradients, see src.algorithms.numpy_qaoa
+NUMPY_DEVICE = 'numpy.statevector'
 
 
 class_mapping = {
@@ -37,9 +43,23 @@ class_mapping = {
 
 
 class Ising(GraphProblem):
-    def __init__(self, input_data, class_name, as_real=False):
+    def __init__(self, input_data, class_name, as_real=False, device='qiskit.shot_simulator', p=3,
+                 parameter_store=None):
+        """
+        Parameters
+        ----------
+        device: name of the local openqaoa device running the QAOA, or NUMPY_DEVICE for the
+            native NumPy statevector engine, exact and much faster up to about 20 qubits
+        p: number of QAOA layers
+        parameter_store: optional src.algorithms.qaoa_parameters.ParameterStore, the QAOA then
+            starts from the angles of similar solved instances and its optimized angles are stored
+        """
         self.is_executed = None
         self.qaoa = None
+        self.device = device
+        self.p = p
+        self.parameter_store = parameter_store
+        self.warm_start = None
         self.opt_result = None
         self.classical_solution = None
         self.class_name = class_name
@@ -64,11 +84,16 @@ class Ising(GraphProblem):
             self.problem = class_mapping[class_name](G=self.graph())
 
         self.qubo = self.problem.qubo
+        self.ising = None
+        if device == NUMPY_DEVICE:
+            # the engine is built from the sparse model in run
+            self.ising = SparseIsing.from_openqaoa(self.qubo)
+            return
 
         qaoa = QAOA()
-        qaoa.set_circuit_properties(p=3, init_type='ramp')
+        qaoa.set_circuit_properties(p=p, init_type='ramp')
         # device
-        qiskit_device = create_device(location='local', name='qiskit.shot_simulator')
+        qiskit_device = create_device(location='local', name=device)
         qaoa.set_device(qiskit_device)
         #
         # # circuit properties
@@ -113,23 +138,68 @@ class Ising(GraphProblem):
                                node_color="tab:blue")
         nx.draw_networkx_edges(g, pos)
 
-    def run(self, verbose=False):
-        self.qaoa.compile(self.qubo)
-        self.qaoa.optimize()
-
+    def run(self, verbose=False, profiler=None):
+        profiler = profiler or NULL_PROFILER
+        initial = None
+        if self.parameter_store is not None:
+            with profiler.span('qaoa.warm_start') as span:
+                initial, self.warm_start = self.parameter_store.initial_angles(self.class_name, self.p,
+                                                                               self.graph()) or (None, None)
+                span.set(source=self.warm_start)
+        if self.device == NUMPY_DEVICE:
+            with profiler.span('qaoa.compile', engine='numpy'):
+                self.qaoa = NumpyQAOA.from_ising(self.ising, p=self.p)
+            self.qaoa.optimize(initial=None if initial is None else initial['gammas'] + initial['betas'],
+                               starts=8 if initial is None else 1, profiler=profiler)
+        else:
+            if initial is not None:
+                self.qaoa.set_circuit_properties(p=self.p, init_type='custom', variational_params_dict=initial)
+            self._run_openqaoa(profiler)
         self.is_executed = True
         self.opt_result = self.qaoa.result
+        if self.parameter_store is not None:
+            gammas, betas = self.optimized_angles()
+            evals = getattr(self.opt_result, 'evals', None) or {}
+            self.parameter_store.record(self.class_name, self.p, self.graph(), gammas, betas,
+                                        evaluations=evals.get('number_of_evals'), warm=initial is not None)
         if verbose:
             print(self.opt_result.optimized)
         return self.opt_result
 
-    def generate_qasm(self):
+    def _run_openqaoa(self, profiler):
+        with profiler.span('qaoa.compile'):
+            self.qaoa.compile(self.qubo)
+        with profiler.span('qaoa.optimize') as span:
+            self.qaoa.optimize()
+            evals = getattr(self.qaoa.result, 'evals', None) or {}
+            span.count('evaluations', evals.get('number_of_evals', 0))
+            span.count('gradient_evaluations', evals.get('jac_evals', 0))
+            span.set(qubits=self.qubo.n, p=self.qaoa.circuit_properties.p)
+
+    def optimized_angles(self):
+        """The optimized (gammas, betas) of the QAOA layers."""
         if not self.is_executed:
             raise NotExecutedError
+        if self.device == NUMPY_DEVICE:
+            angles = self.qaoa.result.optimized['angles']
+            return angles[:self.p], angles[self.p:]
+        variational_params = self.qaoa.optimizer.variational_params
+        variational_params.update_from_raw(self.qaoa.result.optimized['angles'])
+        return list(variational_params.gammas), list(variational_params.betas)
+
+    def export_circuit(self):
+        """The QAOA circuit at the optimized angles."""
+        if not self.is_executed:
+            raise NotExecutedError
+        if self.device == NUMPY_DEVICE:
+            return self.qaoa.circuit()
         variational_params = self.qaoa.optimizer.variational_params
         optimized_angles = self.qaoa.result.optimized['angles']
         variational_params.update_from_raw(optimized_angles)
-        optimized_circuit = self.qaoa.backend.qaoa_circuit(variational_params)
+        return self.qaoa.backend.qaoa_circuit(variational_params)
+
+    def generate_qasm(self):
+        optimized_circuit = self.export_circuit()
         return optimized_circuit, qiskit.qasm2.dumps(optimized_circuit)
 
 
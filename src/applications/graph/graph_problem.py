@@ -17,15 +17,17 @@ class GraphProblem(ABC):
                 raise FileNotFoundError(input_data)
             self.file_path = input_data
             try:
-                self.elist, self.num_nodes, self.num_edges = read_gset_file(input_data)
+                self.edge_list = load_gset(input_data)
             except Exception as e:
                 raise FileLoadingError(input_data, message=str(e))
-            self._graph = create_graph_from_edges(self.elist)
+            self.num_nodes, self.num_edges = self.edge_list.num_nodes, self.edge_list.metadata['num_edges']
+            # built on first use, see graph()
+            self._graph = None
         elif isinstance(input_data, networkx.classes.graph.Graph):
+            self.edge_list = None
             self._graph = input_data
             self.num_nodes = self._graph.number_of_nodes()
             self.num_edges = self._graph.number_of_edges()
-            self.elist = self._graph.edges
         else:
             raise InvalidInputError(type(input_data))
             # Ensure the graph is weighted
@@ -63,7 +65,28 @@ class GraphProblem(ABC):
         """
         raise NotImplementedError("not implemented yet")
 
+    @property
+    def elist(self):
+        return self.edge_list.tuples() if self.edge_list is not None else self._graph.edges
+
+    def adjacency(self):
+        """
+        Sparse CSR weight matrix, rows in node index order: the file numbering from 0 for a
+        Gset file, the order of graph().nodes for a networkx graph.
+        """
+        if self.edge_list is not None:
+            return self.edge_list.csr()
+        return nx.to_scipy_sparse_array(self._graph, weight='weight', format='csr')
+
+    def weight_matrix(self):
+        """Dense weight matrix, in the node order of `adjacency`."""
+        if self.edge_list is not None:
+            return self.edge_list.weight_matrix()
+        return nx.to_numpy_array(self._graph, weight='weight')
+
     def graph(self) -> nx.Graph:
+        if self._graph is None:
+            self._graph = self.edge_list.to_networkx()
         return self._graph
 
 
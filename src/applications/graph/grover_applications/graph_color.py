@@ -202,16 +202,19 @@ class GraphColor(GraphProblem):
         # DEFINE THE AmplificationProblem
         def check_disagreement(state): return check_disagree_list_general(state, disagree_list)
 
-        self.iteration = 1
+        # iterations picked from the number of valid colorings; the predicate mirrors the
+        # disagreement checks of the oracle, the statevector engine never simulates the ancillas
         self.grover_wrapper = GroverWrapper(oracle=oracle,
-                                            iterations=self.iteration,
                                             state_preparation=prep,
                                             is_good_state=check_disagreement,
-                                            objective_qubits=variable_qubits
+                                            objective_qubits=variable_qubits,
+                                            engine='statevector'
                                             )
+        self.iteration = self.grover_wrapper.power
 
-    def run(self, verbose=False):
-        result = self.grover_wrapper.run()
+    def run(self, verbose=False, profiler=None):
+        result = self.grover_wrapper.run(profiler=profiler)
+        self.iteration = self.grover_wrapper.power
         self.circuit = self.grover_wrapper.grover.construct_circuit(self.grover_wrapper.problem,
                                                                     self.iteration)
         if verbose:
@@ -1,3 +1,4 @@
+import math
 from itertools import combinations
 
 import networkx as nx
@@ -10,7 +11,7 @@ import numpy as np
 from qiskit import QuantumCircuit, Aer, execute
 import matplotlib.pyplot as plt
 # Example CNF Formula using PySAT
-from qiskit.circuit.library import OR
+from qiskit.circuit.library import OR, MCXVChain, MCXRecursive
 
 
 def cnf_to_quantum_circuit_optimized(cnf_formula):
@@ -208,6 +209,294 @@ def cnf_to_quantum_oracle_optimized(cnf_formula):
     return qc_tmp
 
 
+class _Term:
+    """
+    One ancilla worth of the formula: OR(literals) for a plain clause, or
+    OR(pivot, AND(literals)) for 2-clauses (pivot OR x1) ... (pivot OR xk) sharing the pivot.
+    """
+
+    def __init__(self, literals, pivot=None):
+        self.literals = literals
+        self.pivot = pivot
+
+
+def _qubit(literal):
+    return abs(literal) - 1
+
+
+def _factor_shared_literals(clauses):
+    """Group 2-clauses on their most frequent shared literal, largest groups first."""
+    pairs = [clause for clause in clauses if len(clause) == 2]
+    terms = [_Term(clause) for clause in clauses if len(clause) != 2]
+    while pairs:
+        counts = {}
+        for clause in pairs:
+            for literal in clause:
+                counts[literal] = counts.get(literal, 0) + 1
+        pivot = max(counts, key=lambda literal: (counts[literal], -abs(literal), literal))
+        if counts[pivot] < 2:
+            terms.extend(_Term(clause) for clause in pairs)
+            break
+        others = [clause[1] if clause[0] == pivot else clause[0] for clause in pairs if pivot in clause]
+        if any(-literal in others for literal in others):
+            # (p OR a) AND (p OR NOT a) is p
+            terms.append(_Term([pivot]))
+        else:
+            terms.append(_Term(others, pivot=pivot))
+        pairs = [clause for clause in pairs if pivot not in clause]
+    return terms
+
+
+def _propagate_units(clauses):
+    """
+    Unit propagation. The phase is only flipped when every unit literal holds, so the other
+    clauses can be simplified assuming they do.
+
+    Returns
+    -------
+    units, clauses: the unit literals and the remaining clauses, units is None if the
+    formula is unsatisfiable
+    """
+    units = []
+    while True:
+        new_units = {clause[0] for clause in clauses if len(clause) == 1}
+        if any(-literal in new_units for literal in new_units):
+            return None, []
+        if not new_units:
+            return units, clauses
+        units += sorted(new_units, key=lambda literal: (abs(literal), literal))
+        simplified = []
+        for clause in clauses:
+            if any(literal in new_units for literal in clause):
+                continue
+            clause = [literal for literal in clause if -literal not in new_units]
+            if not clause:
+                return None, []
+            if clause not in simplified:
+                simplified.append(clause)
+        clauses = simplified
+
+
+def _term_ops(term, target, scratch):
+    """Self-inverse gate sequence writing the value of `term` into the `target` ancilla."""
+    ops = []
+    if term.pivot is None:
+        # OR(l) = NOT AND(NOT l)
+        flips = [_qubit(literal) for literal in term.literals if literal > 0]
+        ops += [('x', [q]) for q in flips]
+        ops.append(('mcx', [_qubit(literal) for literal in term.literals] + [target]))
+        ops += [('x', [q]) for q in flips]
+        ops.append(('x', [target]))
+        return ops
+    # scratch = AND(literals), then target = OR(pivot, scratch) = NOT (NOT pivot AND NOT scratch)
+    and_flips = [_qubit(literal) for literal in term.literals if literal < 0]
+    compute_and = [('x', [q]) for q in and_flips]
+    compute_and.append(('mcx', [_qubit(literal) for literal in term.literals] + [scratch]))
+    compute_and += [('x', [q]) for q in and_flips]
+    pivot_flip = [('x', [_qubit(term.pivot)])] if term.pivot > 0 else []
+    ops += compute_and
+    ops += pivot_flip + [('x', [scratch]), ('mcx', [_qubit(term.pivot), scratch, target]), ('x', [scratch])]
+    ops += pivot_flip + [('x', [target])]
+    ops += compute_and
+    return ops
+
+
+def _mcx(qc, controls, target):
+    """
+    Multi-controlled X borrowing idle qubits of the circuit as dirty ancillas: the default
+    decomposition of wide MCX gates needs a number of CX gates exponential in the controls,
+    with k - 2 borrowed qubits it is linear.
+    """
+    if len(controls) <= 4:
+        qc.mcx(controls, target)
+        return
+    busy = set(controls) | {target}
+    idle = [q for q in range(qc.num_qubits) if q not in busy]
+    # inlined, simulators would otherwise build the matrix of the whole gate, borrowed qubits included
+    if len(idle) >= len(controls) - 2:
+        gate = MCXVChain(len(controls), dirty_ancillas=True)
+        qc.compose(gate.definition, controls + [target] + idle[:len(controls) - 2], inplace=True)
+    elif idle:
+        qc.compose(MCXRecursive(len(controls)).definition, controls + [target] + idle[:1], inplace=True)
+    else:
+        qc.mcx(controls, target)
+
+
+def _apply_ops(qc, ops):
+    for name, qubits in ops:
+        if name == 'x':
+            qc.x(qubits[0])
+        else:
+            _mcx(qc, qubits[:-1], qubits[-1])
+
+
+def _phase_flip(qc, controls):
+    """Multi-controlled Z: flip the phase when every control is |1>."""
+    if len(controls) == 1:
+        qc.z(controls[0])
+    else:
+        qc.h(controls[-1])
+        _mcx(qc, controls[:-1], controls[-1])
+        qc.h(controls[-1])
+
+
+def _block_width(num_terms, block_size):
+    """Ancillas used by `num_terms` terms computed in blocks of `block_size`."""
+    num_blocks = math.ceil(num_terms / block_size)
+    return min(block_size, num_terms) + (num_blocks if num_blocks > 1 else 0)
+
+
+def compile_cnf_oracle(cnf_formula, strategy='depth', block_size=None, factor=True, num_vars=None):
+    """
+    Compile a CNF formula into a phase oracle using few ancillas.
+
+    Unit clauses control the final phase flip directly, 2-clauses sharing a literal are
+    factored into a single ancilla, and the remaining clause ancillas are grouped in blocks:
+    each block is computed, folded into one block ancilla and uncomputed, so that its
+    ancillas are reused by the next block. No output qubit in the |-> state is needed, the
+    phase is flipped by a multi-controlled Z over the block results.
+
+    Parameters
+    ----------
+    cnf_formula: pysat CNF formula, or a list of clauses
+    strategy: 'depth' computes every clause at once (one ancilla per term, no recomputation),
+        'width' picks the block size using the fewest ancillas, about sqrt(#terms), trading
+        recomputation for width
+    block_size: number of clause ancillas per block, overrides `strategy`
+    factor: factor 2-clauses sharing a literal
+    num_vars: number of variable qubits, the largest variable of the formula by default
+
+    Returns
+    -------
+    QuantumCircuit: variables on the first `num_vars` qubits, in the same order as
+    `cnf_to_quantum_oracle`, followed by the ancillas, which are returned to |0>.
+    """
+    raw_clauses = cnf_formula.clauses if isinstance(cnf_formula, CNF) else cnf_formula
+    clauses = []
+    seen = set()
+    for clause in raw_clauses:
+        literals = tuple(sorted(set(clause), key=lambda literal: (abs(literal), literal)))
+        if any(-literal in literals for literal in literals) or literals in seen:
+            continue  # tautologies and duplicates
+        seen.add(literals)
+        clauses.append(list(literals))
+    if num_vars is None:
+        num_vars = max((abs(literal) for clause in clauses for literal in clause), default=0)
+
+    units, others = _propagate_units(clauses)
+    if units is None:
+        # unsatisfiable, no phase is ever flipped
+        return QuantumCircuit(num_vars)
+    terms = _factor_shared_literals(others) if factor else [_Term(clause) for clause in others]
+
+    if block_size is None:
+        if strategy == 'depth':
+            block_size = max(len(terms), 1)
+        elif strategy == 'width':
+            block_size = min(range(1, max(len(terms), 1) + 1), key=lambda size: (_block_width(len(terms), size), -size))
+        else:
+            raise ValueError(f"Unknown oracle strategy: {strategy}")
+    blocks = [terms[i:i + block_size] for i in range(0, len(terms), block_size)]
+    num_clause_ancillas = max((len(block) for block in blocks), default=0)
+    num_block_ancillas = len(blocks) if len(blocks) > 1 else 0
+    has_scratch = any(term.pivot is not None for term in terms)
+
+    qc = QuantumCircuit(num_vars + num_clause_ancillas + num_block_ancillas + has_scratch)
+    clause_ancillas = list(range(num_vars, num_vars + num_clause_ancillas))
+    block_ancillas = list(range(num_vars + num_clause_ancillas, num_vars + num_clause_ancillas + num_block_ancillas))
+    scratch = qc.num_qubits - 1 if has_scratch else None
+
+    block_ops = []
+    for block in blocks:
+        ops = []
+        for term, ancilla in zip(block, clause_ancillas):
+            ops += _term_ops(term, ancilla, scratch)
+        block_ops.append(ops)
+
+    def fold(j):
+        block_controls = clause_ancillas[:len(blocks[j])]
+        _apply_ops(qc, block_ops[j])
+        _mcx(qc, block_controls, block_ancillas[j])
+        _apply_ops(qc, reversed(block_ops[j]))
+
+    if num_block_ancillas:
+        for j in range(len(blocks)):
+            fold(j)
+        controls = list(block_ancillas)
+    elif blocks:
+        _apply_ops(qc, block_ops[0])
+        controls = clause_ancillas[:len(blocks[0])]
+    else:
+        controls = []
+
+    unit_flips = [_qubit(literal) for literal in units if literal < 0]
+    controls = [_qubit(literal) for literal in units] + controls
+    if unit_flips:
+        qc.x(unit_flips)
+    if controls:
+        _phase_flip(qc, controls)
+    else:
+        # every assignment satisfies an empty formula
+        qc.global_phase += math.pi
+    if unit_flips:
+        qc.x(unit_flips)
+
+    if num_block_ancillas:
+        for j in reversed(range(len(blocks))):
+            fold(j)
+    elif blocks:
+        _apply_ops(qc, reversed(block_ops[0]))
+    return qc
+
+
+def oracle_stats(oracle):
+    """
+    Cost of an oracle once decomposed into CX and single-qubit gates.
+
+    Returns
+    -------
+    dict with the number of `qubits`, `two_qubit_gates` and the `depth`
+    """
+    from qiskit import transpile
+    decomposed = transpile(oracle, basis_gates=['cx', 'u'], optimization_level=0)
+    ops = decomposed.count_ops()
+    return {'qubits': oracle.num_qubits,
+            'two_qubit_gates': ops.get('cx', 0),
+            'depth': decomposed.depth()}
+
+
+def cheapest_cnf_oracle(cnf_formula, max_qubits=None, metric='two_qubit_gates', num_vars=None):
+    """
+    Compile the formula with every strategy and keep the cheapest oracle.
+
+    Parameters
+    ----------
+    cnf_formula: pysat CNF formula, or a list of clauses
+    max_qubits: simulator budget, oracles wider than this are discarded
+    metric: 'two_qubit_gates', 'depth' or 'qubits'
+    num_vars: number of variable qubits, see `compile_cnf_oracle`
+
+    Returns
+    -------
+    oracle, report: the chosen circuit and a dict of the stats of every candidate, the
+    chosen one under the 'chosen' key
+    """
+    report = {}
+    circuits = {}
+    for strategy in ('depth', 'width'):
+        for factor in (True, False):
+            name = f"{strategy}{'' if factor else '-unfactored'}"
+            circuits[name] = compile_cnf_oracle(cnf_formula, strategy=strategy, factor=factor, num_vars=num_vars)
+            report[name] = oracle_stats(circuits[name])
+    candidates = [name for name in report if max_qubits is None or report[name]['qubits'] <= max_qubits]
+    if not candidates:
+        raise ValueError(f"No oracle fits in {max_qubits} qubits, the narrowest needs "
+                         f"{min(stats['qubits'] for stats in report.values())}")
+    chosen = min(candidates, key=lambda name: (report[name][metric], report[name]['qubits']))
+    report['chosen'] = chosen
+    return circuits[chosen], report
+
+
 def graph_coloring_to_sat(graph: nx.Graph, num_colors: int) -> CNF:
     """
     Converts a graph coloring problem into a 3-SAT problem.
@@ -1,6 +1,5 @@
 import math
 
-from matplotlib import pyplot as plt
 from qiskit_algorithms import *
 from typing import List, Dict
 import networkx as nx
@@ -77,6 +76,7 @@ def plot_multiple_independent_sets(G, measurements, num_per_row=3):
     num_measurements = len(measurements)
     num_rows = (num_measurements + num_per_row - 1) // num_per_row  # Calculate the number of rows needed
 
+    from matplotlib import pyplot as plt
     fig, axs = plt.subplots(num_rows, num_per_row, figsize=(5 * num_per_row, 5 * num_rows))
     axs = axs.flatten()  # Flatten the axes array for easy indexing
 
@@ -153,6 +153,7 @@ def plot_multiple_graph_colorings(G, bitstring_results, num_per_row=3):
     num_colorings = len(bitstring_results)
     num_rows = (num_colorings + num_per_row - 1) // num_per_row  # Calculate the number of rows needed
 
+    from matplotlib import pyplot as plt
     fig, axs = plt.subplots(num_rows, num_per_row, figsize=(15, 5 * num_rows))  # Adjust figsize as needed
     axs = axs.flatten()  # Flatten the axis array for easy indexing
 
@@ -175,6 +176,7 @@ def plot_triangle_finding(G, bitstring_results, num_per_row=3):
     num_plots = len(bitstring_results)
     num_rows = math.ceil(num_plots / num_per_row)
 
+    from matplotlib import pyplot as plt
     # Create subplots
     fig, axes = plt.subplots(num_rows, num_per_row, figsize=(5 * num_per_row, 5 * num_rows))
     axes = axes.flatten()  # Flatten in case of a single row or column
@@ -0,0 +1,68 @@
+import itertools
+import unittest
+
+import networkx
+import numpy as np
+from qiskit.quantum_info import Statevector
+
+from src.applications.graph.grover_applications.graph_oracle import compile_cnf_oracle, cheapest_cnf_oracle, \
+    oracle_stats, independent_set_to_sat, graph_coloring_to_sat, cnf_to_quantum_oracle
+
+
+def satisfies(clauses, assignment):
+    return all(any(assignment[abs(literal) - 1] == (literal > 0) for literal in clause) for clause in clauses)
+
+
+def oracle_phases(oracle, num_vars):
+    """Phase picked up by every assignment of the variables, ancillas starting in |0>."""
+    phases = []
+    for index in range(2 ** num_vars):
+        state = Statevector.from_int(index, 2 ** oracle.num_qubits)
+        phases.append(np.vdot(state.data, state.evolve(oracle).data))
+    return phases
+
+
+class MyTestCase(unittest.TestCase):
+    def test_phase_oracle(self):
+        formulas = [
+            [[1, -2], [-1, 3], [2]],
+            [[1, 2], [2, 3]],
+            [[1, 2, -3], [-1, 2, -4], [1, -2, 3, 4]],
+            [[-1, -2], [-1, -3], [-1, -4], [-2, -3], [3, 4, 1, 2]],
+            [[1], [-1]],
+        ]
+        for clauses in formulas:
+            num_vars = max((abs(literal) for clause in clauses for literal in clause), default=2)
+            expected = [-1 if satisfies(clauses, [(index >> i) & 1 == 1 for i in range(num_vars)]) else 1
+                        for index in range(2 ** num_vars)]
+            for options in ({'strategy': 'depth'}, {'strategy': 'width'}, {'factor': False}, {'block_size': 1}):
+                oracle = compile_cnf_oracle(clauses, num_vars=num_vars, **options)
+                np.testing.assert_allclose(oracle_phases(oracle, num_vars), expected, atol=1e-8,
+                                           err_msg=f'{clauses} {options}')
+
+    def test_narrower_than_one_ancilla_per_clause(self):
+        graph = networkx.cycle_graph(6)
+        cnf = independent_set_to_sat(graph)
+        legacy = cnf_to_quantum_oracle(cnf)
+        compiled = compile_cnf_oracle(cnf)
+        self.assertEqual(legacy.num_qubits, 6 + len(cnf.clauses) + 1)
+        self.assertLess(compiled.num_qubits, legacy.num_qubits)
+        width = compile_cnf_oracle(cnf, strategy='width')
+        self.assertLessEqual(width.num_qubits, compiled.num_qubits)
+
+    def test_cheapest_oracle_budget(self):
+        cnf = graph_coloring_to_sat(networkx.path_graph(3), 2)
+        oracle, report = cheapest_cnf_oracle(cnf)
+        chosen = report['chosen']
+        self.assertEqual(oracle_stats(oracle), report[chosen])
+        self.assertTrue(all(report[chosen]['two_qubit_gates'] <= stats['two_qubit_gates']
+                            for name, stats in report.items() if name != 'chosen'))
+        narrowest = min(stats['qubits'] for name, stats in report.items() if name != 'chosen')
+        _, report = cheapest_cnf_oracle(cnf, max_qubits=narrowest)
+        self.assertEqual(report[report['chosen']]['qubits'], narrowest)
+        with self.assertRaises(ValueError):
+            cheapest_cnf_oracle(cnf, max_qubits=narrowest - 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -15,6 +15,7 @@ from qiskit import qasm3
 from qiskit import qasm2
 from qiskit.primitives import Sampler
 from src.algorithms.grover import GroverWrapper
+from src.algorithms.grover_iterations import MAX_COUNTING_QUBITS, count_solutions, optimal_iterations
 
 
 # We used the W state implementation from W state in reference 6
@@ -223,8 +224,8 @@ class TriangleFinding(GraphProblem):
         # define oracle and prep circuits
         n_nodes = self.num_nodes
         N = 2**n_nodes
-        # a rough estimation that only 1 solution exists...
-        self.iterations = math.floor(math.pi / 4 * math.sqrt(N))
+        # every triangle of the graph is a solution
+        self.num_triangles = sum(networkx.triangles(networkx.Graph(self.edges)).values()) // 3
         nodes_qubits = QuantumRegister(n_nodes, name='nodes')
         edge_anc = QuantumRegister(2, name='edge_anc')
         ancilla = QuantumRegister(n_nodes - 2, name='cccx_diff_anc')
@@ -238,33 +239,28 @@ class TriangleFinding(GraphProblem):
         #prep.x(sub_qbits)
         self.prep = prep
 
-        def check_valid_triangle(state):
-            nodes = []
-            for i, value in enumerate(state):
-                if value == '1':
-                    nodes.append(self.num_nodes - 1 - i)
-            if len(nodes) != 3:
-                return False
-            a, b, c = nodes
-            edge_set = set()
-            for edge in self.edges:
-                edge_set.add(tuple(sorted(edge)))
-
-            # Check if all three edges of the triangle are present
-            return (
-                    tuple(sorted([a, b])) in edge_set and
-                    tuple(sorted([b, c])) in edge_set and
-                    tuple(sorted([c, a])) in edge_set
-            )
+        def check_edge_count(state):
+            # what the oracle marks: its 2-bit edge counter reads 3, i.e. the selected nodes
+            # span 3 edges modulo 4, a triangle when 3 nodes are selected
+            nodes = {self.num_nodes - 1 - i for i, value in enumerate(state) if value == '1'}
+            return sum(u in nodes and v in nodes for u, v in self.edges) % 4 == 3
+
+        # states the oracle marks, triangles among them, counted when the search space is small
+        self.num_marked = count_solutions(check_edge_count, n_nodes) if n_nodes <= MAX_COUNTING_QUBITS \
+            else self.num_triangles
+        self.iterations = optimal_iterations(self.num_marked, N)
+        # the predicate mirrors the oracle, the statevector engine never simulates the ancillas
         self.grover_wrapper = GroverWrapper(oracle=self.oracle,
                                             iterations=self.iterations,
                                             state_preparation=self.prep,
-                                            is_good_state=check_valid_triangle,
-                                            objective_qubits=list(range(self.num_nodes))
+                                            is_good_state=check_edge_count,
+                                            objective_qubits=list(range(self.num_nodes)),
+                                            num_solutions=self.num_marked,
+                                            engine='statevector'
                                             )
 
-    def run(self, verbose: bool = False):
-        result = self.grover_wrapper.run()
+    def run(self, verbose: bool = False, profiler=None):
+        result = self.grover_wrapper.run(profiler=profiler)
         self.circuit = self.grover_wrapper.grover.construct_circuit(self.grover_wrapper.problem,
                                                                     1)
         print(f"---doing {self.iterations} iterations---")
@@ -1,4 +1,5 @@
 import base64
+import re
 from io import BytesIO
 
 import networkx as nx
@@ -14,16 +15,157 @@ def create_graph_from_edges(edges):
     return G
 
 
+class EdgeList:
+    """
+    Weighted edges held as NumPy arrays, 0-based int32 node indices and float32 weights.
+    Adjacency and weight matrices are built from the arrays directly, a networkx graph
+    only when asked for.
+
+    Parameters
+    ----------
+    sources / targets / weights: arrays of the same length, one entry per edge
+    num_nodes: number of nodes n, indices run over 0..n-1
+    offset: added to the indices to get the node labels of the file (1 for Gset)
+    metadata: header fields of the file
+    coordinates: optional (n, 2) array of node coordinates
+    """
+
+    def __init__(self, sources, targets, weights, num_nodes, offset=0, metadata=None, coordinates=None):
+        self.sources = np.asarray(sources, dtype=np.int32)
+        self.targets = np.asarray(targets, dtype=np.int32)
+        self.weights = np.asarray(weights, dtype=np.float32)
+        self.num_nodes = int(num_nodes)
+        self.offset = offset
+        self.metadata = metadata or {}
+        self.coordinates = coordinates
+
+    @property
+    def num_edges(self):
+        return int(self.sources.size)
+
+    def tuples(self):
+        """Edges as (u, v, weight) tuples with the node labels of the file."""
+        return list(zip((self.sources + self.offset).tolist(), (self.targets + self.offset).tolist(),
+                        self.weights.astype(float).tolist()))
+
+    def csr(self):
+        """Symmetric n x n scipy.sparse CSR adjacency matrix holding the weights."""
+        from scipy.sparse import csr_matrix
+        rows = np.concatenate((self.sources, self.targets))
+        columns = np.concatenate((self.targets, self.sources))
+        # a self loop appears once, not twice
+        data = np.concatenate((self.weights, np.where(self.sources == self.targets, 0, self.weights)))
+        return csr_matrix((data, (rows, columns)), shape=(self.num_nodes, self.num_nodes))
+
+    def weight_matrix(self):
+        """Dense symmetric n x n weight matrix, the weight of the last duplicate edge wins."""
+        matrix = np.zeros((self.num_nodes, self.num_nodes), dtype=np.float32)
+        matrix[self.sources, self.targets] = self.weights
+        matrix[self.targets, self.sources] = self.weights
+        return matrix
+
+    def to_networkx(self):
+        """networkx graph of the edges, nodes labelled as in the file."""
+        return create_graph_from_edges(self.tuples())
+
+
+def load_gset(filepath):
+    """
+    Read a Gset file, a "n m" header line then one "u v weight" line per edge, in one bulk parse.
+
+    Returns
+    -------
+    EdgeList, with offset 1 when the nodes are numbered from 1 as in the original Gset
+    files, 0 when a node 0 appears
+    """
+    with open(filepath) as file:
+        header = file.readline().split()
+        edges = np.loadtxt(file, dtype=np.float64, ndmin=2)
+    if len(header) != 2 or edges.size and edges.shape[1] != 3:
+        raise ValueError(f"{filepath} is not a Gset file: expected a 'n m' header and 'u v weight' lines")
+    num_nodes, num_edges = int(header[0]), int(header[1])
+    edges = edges.reshape(-1, 3)
+    labels = edges[:, :2].astype(np.int32)
+    offset = 0 if labels.size == 0 or labels.min() == 0 else 1
+    indices = labels - offset
+    num_nodes = max(num_nodes, int(indices.max()) + 1 if indices.size else 0)
+    return EdgeList(indices[:, 0], indices[:, 1], edges[:, 2], num_nodes, offset=offset,
+                    metadata={'num_edges': num_edges})
+
+
+_TSPLIB_KEYWORD = re.compile(r'^([A-Z][A-Z0-9_]*)\s*(:?)(.*)$')
+# TSPLIB explicit matrix formats, whether the entries are row by row of the upper triangle and
+# whether the diagonal is included
+_TSPLIB_TRIANGLES = {'UPPER_ROW': (True, False), 'UPPER_DIAG_ROW': (True, True),
+                     'LOWER_ROW': (False, False), 'LOWER_DIAG_ROW': (False, True)}
+
+
+def load_tsplib(filepath):
+    """
+    Read a TSPLIB file with node coordinates (EUC_2D, CEIL_2D, ATT, GEO approximated as
+    EUC_2D) or an explicit weight matrix (FULL_MATRIX and the row triangle formats).
+
+    Returns
+    -------
+    EdgeList of the complete graph with the distances as weights, 0-based, with the header
+    fields as metadata and the coordinates when the file has them
+    """
+    metadata = {}
+    sections = {}
+    section = None
+    with open(filepath) as file:
+        for line in file:
+            stripped = line.strip()
+            if not stripped or stripped == 'EOF':
+                continue
+            keyword = _TSPLIB_KEYWORD.match(stripped)
+            if keyword and keyword.group(1).endswith('_SECTION'):
+                section = keyword.group(1)
+                sections[section] = []
+            elif keyword and keyword.group(2):
+                metadata[keyword.group(1)] = keyword.group(3).strip()
+                section = None
+            elif section is not None:
+                sections[section].append(stripped)
+    num_nodes = int(metadata['DIMENSION'])
+    coordinates = None
+    if 'NODE_COORD_SECTION' in sections:
+        rows = np.array(' '.join(sections['NODE_COORD_SECTION']).split(), dtype=float)
+        width = rows.size // num_nodes
+        coordinates = rows.reshape(num_nodes, width)[:, 1:3]
+        differences = coordinates[:, None, :] - coordinates[None, :, :]
+        distances = np.sqrt((differences ** 2).sum(axis=2))
+        if metadata.get('EDGE_WEIGHT_TYPE') == 'CEIL_2D':
+            distances = np.ceil(distances)
+        elif metadata.get('EDGE_WEIGHT_TYPE') == 'ATT':
+            distances = np.ceil(distances / np.sqrt(10.0))
+        else:
+            # TSPLIB rounds Euclidean distances to the nearest integer
+            distances = np.floor(distances + 0.5)
+    elif 'EDGE_WEIGHT_SECTION' in sections:
+        entries = np.array(' '.join(sections['EDGE_WEIGHT_SECTION']).split(), dtype=float)
+        matrix_format = metadata.get('EDGE_WEIGHT_FORMAT', 'FULL_MATRIX')
+        if matrix_format == 'FULL_MATRIX':
+            distances = entries[:num_nodes * num_nodes].reshape(num_nodes, num_nodes)
+        elif matrix_format in _TSPLIB_TRIANGLES:
+            upper, diagonal = _TSPLIB_TRIANGLES[matrix_format]
+            rows, columns = np.triu_indices(num_nodes, 0 if diagonal else 1) if upper \
+                else np.tril_indices(num_nodes, 0 if diagonal else -1)
+            distances = np.zeros((num_nodes, num_nodes))
+            distances[rows, columns] = entries[:rows.size]
+            distances = np.maximum(distances, distances.T)
+        else:
+            raise ValueError(f"Unsupported TSPLIB EDGE_WEIGHT_FORMAT: {matrix_format}")
+    else:
+        raise ValueError(f"{filepath} has neither NODE_COORD_SECTION nor EDGE_WEIGHT_SECTION")
+    sources, targets = np.triu_indices(num_nodes, 1)
+    return EdgeList(sources, targets, distances[sources, targets], num_nodes, metadata=metadata,
+                    coordinates=coordinates)
+
+
 def read_gset_file(filepath):
-    with open(filepath, 'r') as file:
-        lines = file.readlines()
-    num_nodes, num_edges = map(int, lines[0].split())
-    elist = []
-    for line in lines[1:]:
-        if line.strip():
-            u, v, weight = map(int, line.split())
-            elist.append((u, v, float(weight)))  # Convert to 0-based index and float weight
-    return elist, num_nodes, num_edges
+    edges = load_gset(filepath)
+    return edges.tuples(), edges.num_nodes, edges.metadata['num_edges']
 
 
 def draw_graph(G, colors=None, pos=None, special_nodes=None):
@@ -60,9 +202,10 @@ def draw_graph(G, colors=None, pos=None, special_nodes=None):
 
 def get_weight_matrix(G, n):
     w = np.zeros([n, n])
-    for i in range(n):
-        for j in range(n):
-            temp = G.get_edge_data(i, j, default=0)
-            if temp != 0:
-                w[i, j] = temp["weight"]
+    # one pass over the edges instead of n^2 edge lookups
+    for i, j, weight in G.edges(data='weight', default=0):
+        if i in range(n) and j in range(n):
+            w[i, j] = weight
+            if not G.is_directed():
+                w[j, i] = weight
     return w
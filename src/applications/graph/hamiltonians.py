@@ -0,0 +1,122 @@
+"""
+Ising Hamiltonians of graph problems built straight from edge arrays.
+
+Each builder returns a `SparseIsing`, so terms are summed and scaled as COO arrays and the
+qiskit operator is made once, from the symplectic matrices of all its terms::
+
+    operator, offset = maxcut_hamiltonian(load_gset(path)).to_ising()
+    hamiltonian = partition_hamiltonian(edges) + 2.0 * penalty_hamiltonian(n, target=1, nodes=[0, 1, 2])
+
+Edges are given as a `gset.EdgeList`, a networkx graph (nodes are numbered in the order of
+`graph.nodes`) or a sequence of (u, v) or (u, v, weight) rows with nodes 0..n-1. Node i is
+qubit i, and a node is on side x_i = (1 - z_i) / 2 of a cut or in a set when x_i = 1.
+"""
+import networkx as nx
+import numpy as np
+
+from src.applications.quadratic_program import SparseIsing
+
+
+def edge_arrays(edges, num_nodes=None):
+    """
+    Edges as NumPy arrays.
+
+    Returns
+    -------
+    (sources, targets, weights, num_nodes) with int64 node indices and float64 weights,
+    num_nodes defaulting to the largest index + 1
+    """
+    if hasattr(edges, 'sources'):
+        sources, targets, weights = edges.sources, edges.targets, edges.weights
+        num_nodes = edges.num_nodes if num_nodes is None else num_nodes
+    elif isinstance(edges, nx.Graph):
+        index = {node: i for i, node in enumerate(edges.nodes)}
+        rows = np.array([(index[u], index[v], weight) for u, v, weight in edges.edges(data='weight', default=1.0)],
+                        dtype=float).reshape(-1, 3)
+        sources, targets, weights = rows[:, 0], rows[:, 1], rows[:, 2]
+        num_nodes = edges.number_of_nodes() if num_nodes is None else num_nodes
+    else:
+        rows = np.asarray(edges, dtype=float)
+        rows = rows.reshape(-1, rows.shape[-1] if rows.ndim == 2 else 2)
+        if rows.shape[1] not in (2, 3):
+            raise ValueError(f"Edges are (u, v) or (u, v, weight) rows, got rows of {rows.shape[1]} values")
+        sources, targets = rows[:, 0], rows[:, 1]
+        weights = rows[:, 2] if rows.shape[1] == 3 else np.ones(len(rows))
+    sources = np.asarray(sources, dtype=np.int64)
+    targets = np.asarray(targets, dtype=np.int64)
+    if num_nodes is None:
+        num_nodes = int(max(sources.max(initial=-1), targets.max(initial=-1))) + 1
+    return sources, targets, np.asarray(weights, dtype=float), int(num_nodes)
+
+
+def zz_hamiltonian(edges, num_nodes=None):
+    """sum_ij w_ij Z_i Z_j over the edges."""
+    sources, targets, weights, num_nodes = edge_arrays(edges, num_nodes)
+    return SparseIsing(num_nodes, rows=sources, cols=targets, quadratic_weights=weights)
+
+
+def maxcut_hamiltonian(edges, num_nodes=None):
+    """Minus the weight of the cut, sum_ij w_ij / 2 (Z_i Z_j - 1)."""
+    sources, targets, weights, num_nodes = edge_arrays(edges, num_nodes)
+    return SparseIsing.from_maxcut(sources, targets, weights, num_nodes)
+
+
+def penalty_hamiltonian(num_nodes, target=0.0, nodes=None):
+    """
+    (sum_{i in nodes} Z_i - target)^2, zero when the spins of `nodes` sum to `target`.
+    A set of k nodes gives k (k - 1) / 2 couplings.
+
+    Parameters
+    ----------
+    num_nodes: number of qubits n
+    target: wanted spin sum, k - 2m for m of the k nodes on side x = 1
+    nodes: indices of the constrained nodes, all of them by default
+    """
+    nodes = np.arange(num_nodes) if nodes is None else np.unique(np.asarray(nodes, dtype=np.int64))
+    pairs_i, pairs_j = np.triu_indices(nodes.size, 1)
+    # Z_i^2 = 1, and each pair i < j appears twice in the square
+    return SparseIsing(num_nodes, nodes, -2.0 * target, nodes[pairs_i], nodes[pairs_j], 2.0,
+                       nodes.size + target * target)
+
+
+def partition_hamiltonian(edges, num_nodes=None, penalty=None):
+    """
+    Graph partitioning (Lucas, 2014): two halves of equal size cutting the least weight,
+    penalty * (sum_i Z_i)^2 + sum_ij w_ij (1 - Z_i Z_j) / 2.
+
+    Parameters
+    ----------
+    penalty: weight of the balance term, by default min(2 max weighted degree, n) / 8,
+        the bound of Lucas above which no unbalanced partition is cheaper
+    """
+    sources, targets, weights, num_nodes = edge_arrays(edges, num_nodes)
+    if penalty is None:
+        degrees = np.bincount(sources, np.abs(weights), num_nodes) + np.bincount(targets, np.abs(weights), num_nodes)
+        penalty = max(min(2 * degrees.max(initial=0), num_nodes) / 8, 1.0)
+    cut = SparseIsing(num_nodes, rows=sources, cols=targets, quadratic_weights=-weights / 2, offset=weights.sum() / 2)
+    return penalty * penalty_hamiltonian(num_nodes) + cut
+
+
+def clique_hamiltonian(edges, size, num_nodes=None, penalty=None):
+    """
+    Clique of a given size (Lucas, 2014), zero exactly on the cliques of `size` nodes:
+    penalty * (size - sum_v x_v)^2 + size (size - 1) / 2 - sum_uv x_u x_v over the edges.
+    Edge weights are ignored.
+
+    Parameters
+    ----------
+    size: number of nodes K of the clique
+    penalty: weight of the size term, by default K + 1, above the bound K of Lucas
+    """
+    sources, targets, _, num_nodes = edge_arrays(edges, num_nodes)
+    keep = sources != targets
+    sources, targets = sources[keep], targets[keep]
+    # count each undirected edge once
+    pairs = np.unique(np.stack((np.minimum(sources, targets), np.maximum(sources, targets)), axis=1), axis=0)
+    penalty = size + 1.0 if penalty is None else float(penalty)
+    pairs_i, pairs_j = np.triu_indices(num_nodes, 1)
+    # (K - sum x)^2 = K^2 + (1 - 2K) sum x + 2 sum_{i<j} x_i x_j with x^2 = x
+    return SparseIsing.from_qubo(num_nodes, np.arange(num_nodes), penalty * (1 - 2 * size),
+                                 np.concatenate((pairs_i, pairs[:, 0])), np.concatenate((pairs_j, pairs[:, 1])),
+                                 np.concatenate((np.full(pairs_i.size, 2 * penalty), -np.ones(len(pairs)))),
+                                 penalty * size * size + size * (size - 1) / 2)
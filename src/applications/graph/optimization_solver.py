@@ -11,10 +11,14 @@ from qiskit.primitives import Sampler, Estimator
 from qiskit_optimization.algorithms import (CobylaOptimizer,
                                             MinimumEigenOptimizer, GroverOptimizer)
 from qiskit_optimization.algorithms.admm_optimizer import ADMMParameters, ADMMOptimizer
+from qiskit_optimization.converters import QuadraticProgramToQubo
+from qiskit_optimization.problems import Variable
 from qiskit_optimization.translators import from_docplex_mp
 from qiskit_aer import Aer
 from qiskit_algorithms.gradients import FiniteDiffEstimatorGradient, ParamShiftSamplerGradient
 
+from src.applications.quadratic_program import SparseIsing
+
 
 class OptSolver:
     """
@@ -54,6 +58,25 @@ class OptSolver:
         return SamplingVQE(sampler=Sampler(), optimizer=SPSA(maxiter=200),
                            ansatz=two_local)
 
+    @staticmethod
+    def getOperator(problem):
+        """
+        Ising operator and offset of a problem, through the shared SparseIsing model.
+
+        Parameters
+        ----------
+        problem: SparseIsing, docplex Model or QuadraticProgram; constrained or non-binary
+            programs are converted with QuadraticProgramToQubo first
+        """
+        if isinstance(problem, Model):
+            problem = from_docplex_mp(problem)
+        if not isinstance(problem, SparseIsing):
+            if problem.linear_constraints or problem.quadratic_constraints or \
+                    any(variable.vartype != Variable.Type.BINARY for variable in problem.variables):
+                problem = QuadraticProgramToQubo().convert(problem)
+            problem = SparseIsing.from_quadratic_program(problem)
+        return problem.to_ising()
+
     @staticmethod
     def getGroverOptimizer(self, num_qubits, num_iterations=10):
         return GroverOptimizer(num_value_qubits=num_qubits,
@@ -0,0 +1,200 @@
+"""
+Classical presolve of graph problems before their quantum encoding.
+
+`reduce_graph` removes the nodes whose value simple rules decide, splits what is left into
+connected components relabelled 0..n-1, and keeps what is needed to map the solutions of the
+components back to the original graph::
+
+    reduction = reduce_graph(graph, 'MIS')
+    solutions = [solve(component) for component in reduction.subproblems]
+    independent_set = reduction.lift(solutions)
+
+`is_solution` tells the valid solutions of a component apart and `ising_assignment` decodes
+the bitstrings of the QAOA encodings of the problems.
+
+Rules:
+    MIS / MinimumVertexCover: a node of degree 0 is in the independent set, a node of degree
+        1 is too and its neighbour is not (in the cover, for vertex cover)
+    MaximumCut: a node of degree 0 or 1 is put on the side cutting its edge when its weight
+        is positive, and on the side of its neighbour otherwise
+    KColor: a node with fewer than k neighbours is colored after the rest with a color its
+        neighbours do not use
+"""
+from collections import deque
+
+import networkx as nx
+
+REDUCIBLE_PROBLEMS = ('MIS', 'MinimumVertexCover', 'MaximumCut', 'KColor')
+
+
+class GraphReduction:
+    """
+    A graph problem split into smaller subproblems, see `reduce_graph`.
+
+    Attributes
+    ----------
+    subproblems: graphs left to solve, one per connected component, nodes relabelled 0..n-1
+    mappings: for each subproblem, the original id of each of its nodes
+    fixed: original nodes whose value the rules decided regardless of the subproblems
+    """
+
+    def __init__(self, graph, problem, colors):
+        self.graph = graph
+        self.problem = problem
+        self.colors = colors
+        self.fixed = {}
+        self.subproblems = []
+        self.mappings = []
+        # (node, neighbour, weight) decided once the value of the neighbour is known, in removal order
+        self._deferred = []
+
+    @property
+    def removed(self):
+        """Number of nodes the rules took out of the subproblems."""
+        return self.graph.number_of_nodes() - sum(len(mapping) for mapping in self.mappings)
+
+    def lift(self, solutions):
+        """
+        Solution of the original problem from solutions of the subproblems.
+
+        Parameters
+        ----------
+        solutions: one per subproblem, a dict node -> value, or a sequence or bitstring
+            indexed by node. Values are 0/1 membership (independent set, cover, cut side)
+            or colors for KColor
+
+        Returns
+        -------
+        dict original node -> value
+        """
+        if len(solutions) != len(self.subproblems):
+            raise ValueError(f"Expected {len(self.subproblems)} subproblem solutions, got {len(solutions)}")
+        values = {}
+        for mapping, solution in zip(self.mappings, solutions):
+            if not isinstance(solution, dict):
+                solution = dict(enumerate(int(value) for value in solution))
+            for node, original in enumerate(mapping):
+                value = int(solution[node])
+                # covers are lifted as the independent sets they are the complement of
+                values[original] = 1 - value if self.problem == 'MinimumVertexCover' else value
+        values.update(self.fixed)
+        for node, neighbour, weight in reversed(self._deferred):
+            if self.problem == 'KColor':
+                used = {values[other] for other in self.graph[node] if other in values}
+                values[node] = min(color for color in range(len(used) + 1) if color not in used)
+            elif neighbour is None:
+                values[node] = 0
+            else:
+                values[node] = 1 - values[neighbour] if weight >= 0 else values[neighbour]
+        if self.problem == 'MinimumVertexCover':
+            values = {node: 1 - value for node, value in values.items()}
+        return values
+
+    def __repr__(self):
+        return (f'GraphReduction({self.problem}, nodes={self.graph.number_of_nodes()}, removed={self.removed}, '
+                f'subproblems={[len(mapping) for mapping in self.mappings]})')
+
+
+def reduce_graph(graph, problem, colors=4):
+    """
+    Presolve a graph problem.
+
+    Parameters
+    ----------
+    graph: networkx graph of the problem
+    problem: one of REDUCIBLE_PROBLEMS, the graphs of other problems come back whole as a
+        single subproblem
+    colors: number of colors k of KColor
+
+    Returns
+    -------
+    GraphReduction
+    """
+    reduction = GraphReduction(graph, problem, colors)
+    kernel = nx.Graph(graph)
+    kernel.remove_edges_from(list(nx.selfloop_edges(kernel)))
+    if problem not in REDUCIBLE_PROBLEMS:
+        reduction.subproblems.append(nx.convert_node_labels_to_integers(graph))
+        reduction.mappings.append(list(graph.nodes))
+        return reduction
+    threshold = colors - 1 if problem == 'KColor' else 1
+    queue = deque(node for node in kernel if kernel.degree(node) <= threshold)
+    while queue:
+        node = queue.popleft()
+        if node not in kernel or kernel.degree(node) > threshold:
+            continue
+        neighbours = list(kernel[node])
+        if problem in ('MIS', 'MinimumVertexCover'):
+            # the node is in some maximum independent set, its neighbour then is not
+            reduction.fixed[node] = 1
+            kernel.remove_node(node)
+            for neighbour in neighbours:
+                reduction.fixed[neighbour] = 0
+                affected = list(kernel[neighbour])
+                kernel.remove_node(neighbour)
+                queue.extend(affected)
+            continue
+        if problem == 'MaximumCut' and neighbours:
+            neighbour = neighbours[0]
+            reduction._deferred.append((node, neighbour, kernel[node][neighbour].get('weight', 1)))
+        else:
+            reduction._deferred.append((node, None, None))
+        kernel.remove_node(node)
+        queue.extend(neighbours)
+    order = {node: index for index, node in enumerate(graph.nodes)}
+    for component in nx.connected_components(kernel):
+        mapping = sorted(component, key=order.get)
+        reduction.mappings.append(mapping)
+        reduction.subproblems.append(nx.relabel_nodes(kernel.subgraph(mapping),
+                                                      {node: index for index, node in enumerate(mapping)}))
+    return reduction
+
+
+def is_solution(graph, problem, values):
+    """
+    Whether `values` (dict node -> value) is a feasible solution of `problem` on `graph`:
+    an independent set for MIS, a cover for MinimumVertexCover, a proper coloring for KColor
+    and any 0/1 assignment for MaximumCut. Always False for the other problems.
+    """
+    if problem not in REDUCIBLE_PROBLEMS or any(node not in values for node in graph):
+        return False
+    edges = [(u, v) for u, v in graph.edges if u != v]
+    if problem == 'MIS':
+        return all(values[u] in (0, 1) for u in graph) and not any(values[u] and values[v] for u, v in edges)
+    if problem == 'MinimumVertexCover':
+        return all(values[u] in (0, 1) for u in graph) and all(values[u] or values[v] for u, v in edges)
+    if problem == 'KColor':
+        return all(values[u] != values[v] for u, v in edges)
+    return all(values[u] in (0, 1) for u in graph)
+
+
+def ising_assignment(bitstring, num_nodes, problem, colors=4):
+    """
+    dict node -> value of a QAOA solution bitstring, whose bit i is node i, or for KColor
+    bit node * colors + c the one-hot color c of node. None when the bitstring does not
+    decode to one value per node.
+    """
+    if problem == 'KColor':
+        if len(bitstring) != num_nodes * colors:
+            return None
+        blocks = [bitstring[node * colors:(node + 1) * colors] for node in range(num_nodes)]
+        if any(block.count('1') != 1 for block in blocks):
+            return None
+        return {node: block.index('1') for node, block in enumerate(blocks)}
+    if len(bitstring) != num_nodes:
+        return None
+    return {node: int(bit) for node, bit in enumerate(bitstring)}
+
+
+def plot_lifted_solution(reduction, values):
+    """Plot the original graph of `reduction` with the nodes colored by their lifted `values`."""
+    import matplotlib.pyplot as plt
+    graph = reduction.graph
+    if reduction.problem == 'KColor':
+        palette = plt.get_cmap('tab10')
+        node_colors = [palette(values[node] % 10) for node in graph.nodes]
+    else:
+        node_colors = ['tab:red' if values[node] else 'tab:blue' for node in graph.nodes]
+    plt.figure()
+    nx.draw(graph, nx.spring_layout(graph, seed=0), node_color=node_colors, with_labels=True)
+    plt.title(f'{reduction.problem}: {reduction.removed} of {graph.number_of_nodes()} nodes presolved')
@@ -0,0 +1,292 @@
+"""
+Sparse Ising model shared by the QUBO paths (Ising/openqaoa, OptSolver/qiskit_optimization,
+docplex models and the numpy QAOA engine).
+
+`SparseIsing` keeps the cost
+
+    E(z) = offset + sum_i h_i z_i + sum_{i<j} J_ij z_i z_j,    z_i in {-1, 1}
+
+as COO arrays, built once from whichever representation a problem starts in and converted
+to the others without going through dense matrices or Python lists of terms::
+
+    ising = SparseIsing.from_quadratic_program(qubo)
+    operator = ising.to_sparse_pauli_op()
+
+Binary variables map to spins as x_i = (1 - z_i) / 2, the convention of
+`QuadraticProgram.to_ising`: variable i is qubit i, and z_i is the eigenvalue of Z_i.
+"""
+import numpy as np
+
+
+def _coalesce(num_variables, rows, cols, weights):
+    """Upper triangular COO arrays with duplicate entries summed and zeros dropped."""
+    rows, cols = np.minimum(rows, cols), np.maximum(rows, cols)
+    keys, inverse = np.unique(rows.astype(np.int64) * num_variables + cols, return_inverse=True)
+    summed = np.bincount(inverse.ravel(), weights=weights, minlength=keys.size)
+    keep = summed != 0
+    keys = keys[keep]
+    return ((keys // num_variables).astype(np.int32), (keys % num_variables).astype(np.int32),
+            summed[keep])
+
+
+class SparseIsing:
+    """
+    Ising cost with linear and quadratic terms in COO form, see the module docstring.
+
+    Parameters
+    ----------
+    num_variables: number of spins n
+    linear_indices / linear_weights: the fields h_i, repeated indices are summed
+    rows / cols / quadratic_weights: the couplings J_ij, repeated or (j, i) entries are summed
+        and diagonal entries (z_i z_i = 1) go to the offset
+    offset: constant term
+
+    Attributes
+    ----------
+    linear_indices, linear_weights: sorted int32 indices and float64 weights of nonzero fields
+    rows, cols, quadratic_weights: int32 indices with rows < cols and float64 weights of
+        nonzero couplings, sorted by (row, col)
+    """
+
+    def __init__(self, num_variables, linear_indices=(), linear_weights=(), rows=(), cols=(),
+                 quadratic_weights=(), offset=0.0):
+        self.num_variables = int(num_variables)
+        linear_indices = np.asarray(linear_indices, dtype=np.int64).ravel()
+        linear_weights = np.broadcast_to(np.asarray(linear_weights, dtype=float), linear_indices.shape)
+        rows = np.asarray(rows, dtype=np.int64).ravel()
+        cols = np.asarray(cols, dtype=np.int64).ravel()
+        quadratic_weights = np.broadcast_to(np.asarray(quadratic_weights, dtype=float), rows.shape)
+        if rows.shape != cols.shape:
+            raise ValueError(f"Got {rows.size} rows and {cols.size} columns of quadratic terms")
+        for name, indices in (('linear', linear_indices), ('quadratic', rows), ('quadratic', cols)):
+            if indices.size and (indices.min() < 0 or indices.max() >= self.num_variables):
+                raise ValueError(f"A {name} term refers to a variable outside 0..{self.num_variables - 1}")
+
+        diagonal = rows == cols
+        self.offset = float(offset) + float(quadratic_weights[diagonal].sum())
+        self.rows, self.cols, self.quadratic_weights = _coalesce(self.num_variables, rows[~diagonal],
+                                                                 cols[~diagonal], quadratic_weights[~diagonal])
+        fields = np.bincount(linear_indices, weights=linear_weights, minlength=self.num_variables)
+        self.linear_indices = np.flatnonzero(fields).astype(np.int32)
+        self.linear_weights = fields[self.linear_indices]
+
+    # constructors
+
+    @classmethod
+    def from_qubo(cls, num_variables, linear_indices=(), linear_weights=(), rows=(), cols=(),
+                  quadratic_weights=(), offset=0.0):
+        """
+        Ising model of the binary cost offset + sum_i c_i x_i + sum_ij Q_ij x_i x_j, given
+        in the same COO form as the constructor, with x_i = (1 - z_i) / 2.
+        """
+        linear_indices = np.asarray(linear_indices, dtype=np.int64).ravel()
+        linear_weights = np.broadcast_to(np.asarray(linear_weights, dtype=float), linear_indices.shape)
+        rows = np.asarray(rows, dtype=np.int64).ravel()
+        cols = np.asarray(cols, dtype=np.int64).ravel()
+        quadratic_weights = np.broadcast_to(np.asarray(quadratic_weights, dtype=float), rows.shape)
+
+        # x_i x_i = x_i
+        diagonal = rows == cols
+        linear_indices = np.concatenate((linear_indices, rows[diagonal]))
+        linear_weights = np.concatenate((linear_weights, quadratic_weights[diagonal]))
+        rows, cols, quadratic_weights = rows[~diagonal], cols[~diagonal], quadratic_weights[~diagonal]
+
+        # c x_i = c/2 - c/2 z_i,  Q x_i x_j = Q/4 (1 - z_i - z_j + z_i z_j)
+        quarter = quadratic_weights / 4
+        return cls(num_variables,
+                   np.concatenate((linear_indices, rows, cols)),
+                   np.concatenate((-linear_weights / 2, -quarter, -quarter)),
+                   rows, cols, quarter,
+                   float(offset) + linear_weights.sum() / 2 + quarter.sum())
+
+    @classmethod
+    def from_quadratic_program(cls, program):
+        """
+        Ising model of a qiskit_optimization QuadraticProgram with binary variables and no
+        constraints, e.g. the output of QuadraticProgramToQubo. Maximized objectives are negated.
+        """
+        from qiskit_optimization.problems import QuadraticObjective, Variable
+
+        if program.linear_constraints or program.quadratic_constraints:
+            raise ValueError("Constrained programs have no Ising form, convert them with QuadraticProgramToQubo")
+        if any(variable.vartype != Variable.Type.BINARY for variable in program.variables):
+            raise ValueError("Only programs with binary variables have an Ising form")
+        objective = program.objective
+        sign = -1.0 if objective.sense == QuadraticObjective.Sense.MAXIMIZE else 1.0
+        linear = objective.linear.coefficients.tocoo()
+        quadratic = objective.quadratic.coefficients.tocoo()
+        return cls.from_qubo(program.get_num_vars(), linear.col, sign * linear.data,
+                             quadratic.row, quadratic.col, sign * quadratic.data, sign * objective.constant)
+
+    @classmethod
+    def from_openqaoa(cls, qubo):
+        """Ising model of an openqaoa QUBO, whose terms and weights are already in Ising form."""
+        terms = [list(term) for term in qubo.terms]
+        weights = np.asarray(qubo.weights, dtype=float)
+        if any(len(term) > 2 for term in terms):
+            raise ValueError("SparseIsing holds terms of at most two spins")
+        sizes = np.array([len(term) for term in terms], dtype=np.int64)
+        linear = sizes == 1
+        quadratic = np.array([term for term in terms if len(term) == 2], dtype=np.int64).reshape(-1, 2)
+        return cls(qubo.n, [term[0] for term in terms if len(term) == 1], weights[linear],
+                   quadratic[:, 0], quadratic[:, 1], weights[sizes == 2],
+                   getattr(qubo, 'constant', 0.0) + weights[sizes == 0].sum())
+
+    @classmethod
+    def from_maxcut(cls, sources, targets, weights=1.0, num_nodes=None):
+        """
+        Ising model minimized by the maximum cuts of a weighted edge list, e.g. the arrays of a
+        `gset.EdgeList` with node ids from 0: -cut = sum_ij w_ij / 2 (z_i z_j - 1).
+        """
+        sources = np.asarray(sources, dtype=np.int64)
+        targets = np.asarray(targets, dtype=np.int64)
+        weights = np.broadcast_to(np.asarray(weights, dtype=float), sources.shape)
+        if num_nodes is None:
+            num_nodes = int(max(sources.max(initial=-1), targets.max(initial=-1))) + 1
+        return cls(num_nodes, rows=sources, cols=targets, quadratic_weights=weights / 2,
+                   offset=-weights.sum() / 2)
+
+    # properties
+
+    @property
+    def num_terms(self):
+        return int(self.linear_indices.size + self.rows.size)
+
+    def terms(self):
+        """Terms and weights as lists of variable lists and floats, in the form of openqaoa and NumpyQAOA."""
+        terms = [[int(i)] for i in self.linear_indices] + \
+                [[int(i), int(j)] for i, j in zip(self.rows, self.cols)]
+        weights = self.linear_weights.tolist() + self.quadratic_weights.tolist()
+        return terms, weights
+
+    def energy(self, spins):
+        """
+        Cost of spin assignments.
+
+        Parameters
+        ----------
+        spins: array (..., n) of -1/1 values
+
+        Returns
+        -------
+        float, or array of the leading shape of `spins`
+        """
+        spins = np.asarray(spins, dtype=float)
+        energy = self.offset + spins[..., self.linear_indices] @ self.linear_weights
+        return energy + (spins[..., self.rows] * spins[..., self.cols]) @ self.quadratic_weights
+
+    def diagonal(self):
+        """Cost of every basis state, bit i of the index being variable i (qubit i)."""
+        indices = np.arange(2 ** self.num_variables, dtype=np.int64)
+        spins = 1 - 2 * ((indices[:, None] >> np.arange(self.num_variables)) & 1)
+        return self.energy(spins)
+
+    # converters
+
+    def symplectic(self):
+        """
+        Boolean (z, x) matrices of shape (num_terms, n) of the Pauli terms, fields first, then
+        couplings, in the order of `coefficients`. Only Z appears, x is all False.
+        """
+        num_linear = self.linear_indices.size
+        z = np.zeros((self.num_terms, self.num_variables), dtype=bool)
+        z[np.arange(num_linear), self.linear_indices] = True
+        quadratic = np.arange(num_linear, self.num_terms)
+        z[quadratic, self.rows] = True
+        z[quadratic, self.cols] = True
+        return z, np.zeros_like(z)
+
+    @property
+    def coefficients(self):
+        return np.concatenate((self.linear_weights, self.quadratic_weights))
+
+    def to_sparse_pauli_op(self):
+        """
+        Cost as a qiskit SparsePauliOp over n qubits, without the offset, like the operator of
+        `QuadraticProgram.to_ising`. The operator is built from `symplectic` in one call.
+        """
+        from qiskit.quantum_info import PauliList, SparsePauliOp
+
+        if self.num_terms == 0:
+            return SparsePauliOp('I' * self.num_variables, coeffs=[0.0])
+        return SparsePauliOp(PauliList.from_symplectic(*self.symplectic()), self.coefficients)
+
+    def to_ising(self):
+        """(SparsePauliOp, offset), the return value of `QuadraticProgram.to_ising`."""
+        return self.to_sparse_pauli_op(), self.offset
+
+    def to_openqaoa(self):
+        """openqaoa QUBO of the same cost."""
+        from openqaoa.problems import QUBO
+
+        terms, weights = self.terms()
+        if self.offset:
+            terms.append([])
+            weights.append(self.offset)
+        return QUBO(self.num_variables, terms, weights)
+
+    def to_binary(self):
+        """
+        Binary form of the cost, with z_i = 1 - 2 x_i.
+
+        Returns
+        -------
+        (linear, rows, cols, quadratic_weights, offset): dense linear coefficients, the
+        off-diagonal COO coefficients (rows < cols) and the constant
+        """
+        # h z_i = h - 2h x_i,  J z_i z_j = J (1 - 2 x_i - 2 x_j + 4 x_i x_j)
+        linear = np.bincount(self.linear_indices, weights=-2 * self.linear_weights, minlength=self.num_variables)
+        linear -= np.bincount(self.rows, weights=2 * self.quadratic_weights, minlength=self.num_variables)
+        linear -= np.bincount(self.cols, weights=2 * self.quadratic_weights, minlength=self.num_variables)
+        offset = self.offset + self.linear_weights.sum() + self.quadratic_weights.sum()
+        return linear, self.rows, self.cols, 4 * self.quadratic_weights, offset
+
+    def to_docplex(self, name='ising'):
+        """docplex Model minimizing the cost over binary variables x_0..x_{n-1}."""
+        from docplex.mp.model import Model
+
+        linear, rows, cols, weights, offset = self.to_binary()
+        model = Model(name=name)
+        variables = model.binary_var_list(self.num_variables, name='x')
+        objective = model.scal_prod(variables, linear) + offset
+        if weights.size:
+            objective += model.sum(float(weight) * variables[i] * variables[j]
+                                   for i, j, weight in zip(rows, cols, weights))
+        model.minimize(objective)
+        return model
+
+    def to_quadratic_program(self, name='ising'):
+        """qiskit_optimization QuadraticProgram minimizing the cost over binary variables."""
+        from qiskit_optimization import QuadraticProgram
+        from scipy.sparse import coo_matrix
+
+        linear, rows, cols, weights, offset = self.to_binary()
+        program = QuadraticProgram(name)
+        program.binary_var_list(self.num_variables, name='x')
+        quadratic = coo_matrix((weights, (rows, cols)), shape=(self.num_variables,) * 2)
+        program.minimize(constant=offset, linear=linear, quadratic=quadratic.todok())
+        return program
+
+    def __add__(self, other):
+        if not isinstance(other, SparseIsing):
+            return NotImplemented
+        if other.num_variables != self.num_variables:
+            raise ValueError(f"Cannot add models of {self.num_variables} and {other.num_variables} variables")
+        return SparseIsing(self.num_variables,
+                           np.concatenate((self.linear_indices, other.linear_indices)),
+                           np.concatenate((self.linear_weights, other.linear_weights)),
+                           np.concatenate((self.rows, other.rows)), np.concatenate((self.cols, other.cols)),
+                           np.concatenate((self.quadratic_weights, other.quadratic_weights)),
+                           self.offset + other.offset)
+
+    def __mul__(self, factor):
+        if not isinstance(factor, (int, float, np.number)):
+            return NotImplemented
+        return SparseIsing(self.num_variables, self.linear_indices, factor * self.linear_weights,
+                           self.rows, self.cols, factor * self.quadratic_weights, factor * self.offset)
+
+    __rmul__ = __mul__
+
+    def __repr__(self):
+        return (f'SparseIsing(num_variables={self.num_variables}, linear={self.linear_indices.size}, '
+                f'quadratic={self.rows.size}, offset={self.offset:g})')
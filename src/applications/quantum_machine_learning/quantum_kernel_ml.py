@@ -1,3 +1,5 @@
+from concurrent.futures import ProcessPoolExecutor
+
 from qiskit_machine_learning.kernels import FidelityQuantumKernel
 from qiskit.primitives import Sampler
 from qiskit.quantum_info import Statevector, state_fidelity
@@ -9,29 +11,62 @@ from sklearn.svm import SVC
 import matplotlib.pyplot as plt
 from qiskit import qasm3, qasm2
 
+from src.Framework.profiling import NULL_PROFILER
+
+
+def _simulate_states(feature_map, data):
+    return np.array([Statevector(feature_map.assign_parameters(x)).data for x in data])
 
-def calculate_kernel(feature_map, x_data, y_data=None):
-    if y_data is None:
-        y_data = x_data
 
-    x_circuits = [feature_map.assign_parameters(x) for x in x_data]
-    y_circuits = [feature_map.assign_parameters(y) for y in y_data]
+def feature_map_states(feature_map, data, n_jobs=None, chunk_size=64):
+    """
+    Simulate the feature map once per data point.
 
-    kernel = np.zeros((y_data.shape[0], x_data.shape[0]))
+    Parameters
+    ----------
+    feature_map: parameterized circuit encoding one data point
+    data: array of shape (N, num_features)
+    n_jobs: number of worker processes, None or 1 simulates in-process
+    chunk_size: number of data points simulated per task when running in parallel
 
-    for i, x_c in enumerate(x_circuits):
-        for j, y_c in enumerate(y_circuits):
-            sv_x = Statevector.from_instruction(x_c)
-            sv_y = Statevector.from_instruction(y_c)
-            fidelity = state_fidelity(sv_x, sv_y)
+    Returns
+    -------
+    numpy array of shape (N, 2**num_qubits) holding the statevectors
+    """
+    data = np.asarray(data)
+    if n_jobs is None or n_jobs <= 1 or len(data) <= chunk_size:
+        return _simulate_states(feature_map, data)
+    chunks = [data[i:i + chunk_size] for i in range(0, len(data), chunk_size)]
+    with ProcessPoolExecutor(max_workers=n_jobs) as executor:
+        states = list(executor.map(_simulate_states, [feature_map] * len(chunks), chunks))
+    return np.concatenate(states)
 
-            kernel[j, i] = np.abs(fidelity)
 
-    return kernel
+def calculate_kernel(feature_map, x_data, y_data=None, n_jobs=None, chunk_size=64):
+    """
+    Fidelity kernel K[j, i] = |<phi(y_j)|phi(x_i)>|^2.
+
+    Every feature-map state is simulated once and the Gram matrix is a single matrix product
+    of the stacked statevectors. Without `y_data` the kernel is symmetric and only the states
+    of `x_data` are simulated.
+
+    Returns
+    -------
+    numpy array of shape (len(y_data), len(x_data))
+    """
+    x_states = feature_map_states(feature_map, x_data, n_jobs=n_jobs, chunk_size=chunk_size)
+    if y_data is None:
+        kernel = np.abs(x_states.conj() @ x_states.T) ** 2
+        np.fill_diagonal(kernel, 1.0)
+        return kernel
+    y_states = feature_map_states(feature_map, y_data, n_jobs=n_jobs, chunk_size=chunk_size)
+    return np.abs(y_states.conj() @ x_states.T) ** 2
 
 
 class QMLKernel:
-    def __init__(self, train_data=None, train_labels=None, test_data=None, test_labels=None, model='svc'):
+    def __init__(self, train_data=None, train_labels=None, test_data=None, test_labels=None, model='svc',
+                 n_jobs=None):
+        self._n_jobs = n_jobs
         self._model = None
         self._is_fitted = None
         self._test_kernel = None
@@ -54,15 +89,23 @@ class QMLKernel:
                                                                        test_size=test_size, n=n, gap=0.3)
         self.__init__(train_data, train_labels, test_data, test_labels)
 
-    def run(self):
+    def run(self, profiler=None):
+        profiler = profiler or NULL_PROFILER
         kernel = FidelityQuantumKernel(feature_map=self._feature_map)
 
-        self._train_kernel = calculate_kernel(self._feature_map, self._train_data)
-        self._test_kernel = calculate_kernel(self._feature_map, self._train_data, self._test_data)
+        with profiler.span('kernel.evaluate') as span:
+            self._train_kernel = calculate_kernel(self._feature_map, self._train_data, n_jobs=self._n_jobs)
+            self._test_kernel = calculate_kernel(self._feature_map, self._train_data, self._test_data,
+                                                 n_jobs=self._n_jobs)
+            span.count('states', len(self._train_data) + len(self._test_data))
+            span.count('kernel_entries', self._train_kernel.size + self._test_kernel.size)
+            if profiler.enabled:
+                span.record_circuit('feature_map', self._feature_map.decompose())
 
         #self._train_kernel = kernel.evaluate(x_vec=self._train_data)
         #self._test_kernel = kernel.evaluate(x_vec=self._test_data, y_vec=self._train_data)
-        self._model.fit(self._train_kernel, self._train_labels)
+        with profiler.span('kernel.fit'):
+            self._model.fit(self._train_kernel, self._train_labels)
         self._is_fitted = True
 
     def show_result(self):
@@ -71,8 +114,12 @@ class QMLKernel:
         score = self._model.score(self._test_kernel, self._test_labels)
         print(f"kernel test score: {score}")
 
+    def export_circuit(self):
+        """The feature map bound to the first training sample."""
+        return self._feature_map.decompose().assign_parameters(self._train_data[0])
+
     def generate_qasm(self):
-        return qasm2.dumps(self._feature_map.decompose().assign_parameters(self._train_data[0]))
+        return qasm2.dumps(self.export_circuit())
 
     def plot_data(self):
         unique_labels = np.unique(np.concatenate((self._train_labels, self._test_labels)))
@@ -0,0 +1,405 @@
+"""
+End-to-end benchmark of QASMGenerator.qasm_generate: every problem type of ProblemType and every
+entry of `algorithms_mapping` the parser can reach, over graphs of growing size from `cases/Gset`.
+
+Each case runs in a fresh interpreter, so that its peak RSS and its import time are its own. A
+result records the wall time of every generator stage (parse, import, model, optimize, plot,
+export), the peak RSS and the qubit count and depth of every generated circuit.
+
+Usage (from the `src` directory)::
+
+    python -m benchmarks.bench_generator --graphs G4,G0,G3 --json bench.json
+    python -m benchmarks.bench_generator --json new.json --compare bench.json
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+SRC_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+GSET_DIR = os.path.join(SRC_DIR, 'cases', 'Gset')
+DEFAULT_GRAPHS = ['G4', 'G0', 'G3', 'G2']
+
+# classical codes the parser maps to each graph entry of `algorithms_mapping`, {edges} is the edge list
+GRAPH_TEMPLATES = {
+    'MaximumCut': """
+import networkx as nx
+
+def maxcut_bruteforce(G):
+    return max(sum(1 for u, v in G.edges() if (mask >> u & 1) != (mask >> v & 1))
+               for mask in range(2 ** G.number_of_nodes()))
+
+edges = {edges}
+G = nx.Graph()
+G.add_edges_from(edges)
+max_cut = maxcut_bruteforce(G)
+""",
+    'MIS': """
+import itertools
+import networkx as nx
+
+def find_max_independent_set(G):
+    for size in range(G.number_of_nodes(), 0, -1):
+        for subset in itertools.combinations(G.nodes, size):
+            if not any(G.has_edge(u, v) for u, v in itertools.combinations(subset, 2)):
+                return subset
+
+edges = {edges}
+G = nx.Graph()
+G.add_edges_from(edges)
+max_independent_set = find_max_independent_set(G)
+""",
+    'TSP': """
+import itertools
+import networkx as nx
+
+def tsp_brute_force(G):
+    nodes = list(G.nodes)
+    return min(itertools.permutations(nodes[1:]),
+               key=lambda route: sum(G[u][v]['weight'] for u, v in zip((nodes[0],) + route, route + (nodes[0],))))
+
+edges = {edges}
+G = nx.Graph()
+G.add_weighted_edges_from(edges)
+route = tsp_brute_force(G)
+""",
+    'KColor': """
+import networkx as nx
+
+def greedy_graph_coloring(G):
+    color_assignment = {{}}
+    for node in G.nodes():
+        used = {{color_assignment[neighbor] for neighbor in G.neighbors(node) if neighbor in color_assignment}}
+        color_assignment[node] = min(set(range(G.number_of_nodes())) - used)
+    return color_assignment
+
+edges = {edges}
+G = nx.Graph()
+G.add_edges_from(edges)
+color_assignment = greedy_graph_coloring(G)
+""",
+    'Triangle': """
+import itertools
+import networkx as nx
+
+def find_triangles(G):
+    return [(u, v, w) for u, v, w in itertools.combinations(G.nodes, 3)
+            if G.has_edge(u, v) and G.has_edge(v, w) and G.has_edge(w, u)]
+
+edges = {edges}
+G = nx.Graph()
+G.add_edges_from(edges)
+triangles = find_triangles(G)
+""",
+    'VRP': """
+import networkx as nx
+
+def solve_vrp(G, depot):
+    return nx.floyd_warshall_numpy(G, weight='weight')
+
+edges = {edges}
+G = nx.Graph()
+G.add_weighted_edges_from(edges)
+routes = solve_vrp(G, 0)
+""",
+}
+
+CNF_TEMPLATE = """
+import itertools
+
+def solve_cnf(cnf_formula, num_vars):
+    for assignment in itertools.product([False, True], repeat=num_vars):
+        if all(any(assignment[abs(literal) - 1] == (literal > 0) for literal in clause) for clause in cnf_formula):
+            return assignment
+
+cnf_formula = {clauses}
+num_vars = {num_vars}
+result = solve_cnf(cnf_formula, num_vars)
+"""
+
+EIGENVALUE_TEMPLATE = """
+import numpy as np
+
+def minimum_eigenvalue(matrix):
+    eigenvalues = np.linalg.eigvals(matrix)
+    return np.min(eigenvalues)
+
+matrix = np.array({matrix})
+min_eigval = minimum_eigenvalue(matrix)
+"""
+
+ARITHMETIC_TEMPLATE = """
+def {operation}(left, right):
+    return left {operator} right
+
+left = {left}
+right = {right}
+result = {operation}(left, right)
+"""
+
+FACTOR_TEMPLATE = """
+def factorize(n):
+    factors = []
+    divisor = 2
+    while n > 1:
+        while n % divisor == 0:
+            factors.append(divisor)
+            n //= divisor
+        divisor += 1
+    return factors
+
+n = {number}
+factors = factorize(n)
+"""
+
+MACHINE_LEARNING_TEMPLATE = """
+from sklearn.datasets import make_classification
+from sklearn.model_selection import train_test_split
+from sklearn.svm import SVC
+
+X, y = make_classification(n_samples={samples}, n_features=2, n_redundant=0, random_state=0)
+X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.3, random_state=0)
+svm = SVC(kernel='rbf')
+svm.fit(X_train, y_train)
+"""
+
+
+def gset_edges(name):
+    """Weighted edges of a Gset instance, relabelled to 0..n-1 whatever the indexing of the file."""
+    from src.applications.graph.gset import read_gset_file
+    elist, _, _ = read_gset_file(os.path.join(GSET_DIR, name))
+    labels = {node: index for index, node in enumerate(sorted({node for u, v, _ in elist for node in (u, v)}))}
+    return [(labels[u], labels[v], int(weight)) for u, v, weight in elist]
+
+
+def graph_cases(graphs):
+    cases = []
+    for graph in graphs:
+        edges = gset_edges(graph)
+        size = {'graph': graph, 'nodes': len({node for u, v, _ in edges for node in (u, v)}), 'edges': len(edges)}
+        for algorithm, template in GRAPH_TEMPLATES.items():
+            case_edges = edges if algorithm in ('TSP', 'VRP') else [(u, v) for u, v, _ in edges]
+            cases.append({'name': f'{algorithm}/{graph}', 'problem_type': 'GRAPH', 'algorithm': algorithm,
+                          'size': size, 'classical_code': template.format(edges=case_edges)})
+        # independent set formula of the graph: the two endpoints of an edge are never both true
+        clauses = [[-(u + 1), -(v + 1)] for u, v, _ in edges]
+        cases.append({'name': f'CNF/{graph}', 'problem_type': 'CNF', 'algorithm': None, 'size': size,
+                      'classical_code': CNF_TEMPLATE.format(clauses=clauses, num_vars=size['nodes'])})
+    return cases
+
+
+def other_cases():
+    cases = []
+    rng = np.random.default_rng(0)
+    for qubits in (1, 2, 3):
+        matrix = rng.integers(-5, 6, size=(2 ** qubits, 2 ** qubits))
+        matrix = matrix + matrix.T
+        cases.append({'name': f'EIGENVALUE/{qubits}q', 'problem_type': 'EIGENVALUE', 'algorithm': None,
+                      'size': {'qubits': qubits},
+                      'classical_code': EIGENVALUE_TEMPLATE.format(matrix=matrix.tolist())})
+    for operation, operator in (('addition', '+'), ('subtraction', '-'), ('multiplication', '*')):
+        for left, right in ((3, 2), (12, 5)):
+            cases.append({'name': f'ARITHMETICS/{operation}/{left},{right}', 'problem_type': 'ARITHMETICS',
+                          'algorithm': operation.capitalize(), 'size': {'left': left, 'right': right},
+                          'classical_code': ARITHMETIC_TEMPLATE.format(operation=operation, operator=operator,
+                                                                       left=left, right=right)})
+    for number in (15, 21, 35):
+        cases.append({'name': f'FACTOR/{number}', 'problem_type': 'FACTOR', 'algorithm': None,
+                      'size': {'number': number}, 'classical_code': FACTOR_TEMPLATE.format(number=number)})
+    for samples in (20, 40):
+        cases.append({'name': f'MACHINELEARNING/{samples}', 'problem_type': 'MACHINELEARNING', 'algorithm': None,
+                      'size': {'samples': samples},
+                      'classical_code': MACHINE_LEARNING_TEMPLATE.format(samples=samples)})
+    return cases
+
+
+def unreachable_algorithms():
+    """Entries of `algorithms_mapping` no classical code template maps to, reported as skipped."""
+    from Framework.generator import algorithms_mapping
+    return sorted(set(algorithms_mapping) - set(GRAPH_TEMPLATES))
+
+
+def circuit_stats(qasm):
+    """Qubit count and depth of a generated QASM string, None when it does not load."""
+    from qiskit import qasm2
+    try:
+        circuit = qasm2.loads(qasm, custom_instructions=qasm2.LEGACY_CUSTOM_INSTRUCTIONS)
+    except Exception:
+        return None
+    return {'qubits': circuit.num_qubits, 'depth': circuit.depth()}
+
+
+def run_case(case):
+    """Run one case in this process, see `benchmark_case` for a fresh interpreter."""
+    import resource
+    from Framework.generator import QASMGenerator
+    record = {key: case[key] for key in ('name', 'problem_type', 'algorithm', 'size')}
+    record['error'] = None
+    generator = QASMGenerator()
+    start = time.perf_counter()
+    qasm_codes = {}
+    try:
+        qasm_codes, _ = generator.qasm_generate(case['classical_code'], verbose=False)
+        detected = (generator.parser.specific_graph_problem or generator.parser.specific_arithmetic_operation
+                    if case['algorithm'] else None)
+        if generator.problem_type.name != case['problem_type'] or detected != case['algorithm']:
+            record['error'] = f'parsed as {generator.problem_type.name} {detected}'
+    except Exception as e:
+        record['error'] = f'{type(e).__name__}: {e}'
+    record['timings'] = dict(generator.timings, total=time.perf_counter() - start)
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    record['peak_rss_mb'] = peak / (2 ** 20 if sys.platform == 'darwin' else 2 ** 10)
+    record['circuits'] = {name: circuit_stats(qasm) for name, qasm in qasm_codes.items()}
+    return record
+
+
+def benchmark_case(case, timeout=None):
+    """Run `run_case` in a fresh interpreter, killed after `timeout` seconds."""
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join([os.path.dirname(SRC_DIR), SRC_DIR, env.get('PYTHONPATH', '')])
+    env.setdefault('MPLBACKEND', 'Agg')
+    with tempfile.TemporaryDirectory() as directory:
+        case_path = os.path.join(directory, 'case.json')
+        record_path = os.path.join(directory, 'record.json')
+        with open(case_path, 'w') as f:
+            json.dump(case, f)
+        try:
+            completed = subprocess.run([sys.executable, '-m', 'benchmarks.bench_generator', '--worker',
+                                        case_path, record_path],
+                                       cwd=SRC_DIR, env=env, capture_output=True, text=True, timeout=timeout)
+        except subprocess.TimeoutExpired:
+            completed = None
+        if completed is not None and os.path.exists(record_path):
+            with open(record_path) as f:
+                return json.load(f)
+    record = {key: case[key] for key in ('name', 'problem_type', 'algorithm', 'size')}
+    record.update(timings={}, peak_rss_mb=None, circuits={})
+    if completed is None:
+        record['error'] = f'timed out after {timeout}s'
+    else:
+        record['error'] = f'worker exited with {completed.returncode}: {completed.stderr.strip()[-500:]}'
+    return record
+
+
+def _git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=SRC_DIR, capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(graphs=None, only=None, timeout=600):
+    """
+    Benchmark every case.
+
+    Parameters
+    ----------
+    graphs: Gset instances of the graph and CNF cases, DEFAULT_GRAPHS by default
+    only: keep the cases whose name contains one of these substrings
+    timeout: seconds after which a case is killed
+
+    Returns
+    -------
+    dict with the run metadata and one record per case
+    """
+    cases = graph_cases(graphs or DEFAULT_GRAPHS) + other_cases()
+    if only:
+        cases = [case for case in cases if any(pattern in case['name'] for pattern in only)]
+    results = []
+    for case in cases:
+        record = benchmark_case(case, timeout=timeout)
+        print(_format_record(record), file=sys.stderr, flush=True)
+        results.append(record)
+    return {'commit': _git_commit(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'started_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'skipped_algorithms': unreachable_algorithms(),
+            'results': results}
+
+
+def compare(baseline, current, threshold=0.2):
+    """
+    Cases of `current` slower, heavier or wider than in `baseline`.
+
+    Returns
+    -------
+    list of (case name, metric, baseline value, current value) for every total time or peak RSS
+    more than `threshold` above its baseline, every circuit that grew in qubits or depth and
+    every case that stopped working
+    """
+    before = {record['name']: record for record in baseline['results']}
+    regressions = []
+    for record in current['results']:
+        old = before.get(record['name'])
+        if old is None:
+            continue
+        if record['error'] and not old['error']:
+            regressions.append((record['name'], 'error', None, record['error']))
+            continue
+        metrics = [('total', old['timings'].get('total'), record['timings'].get('total')),
+                   ('peak_rss_mb', old['peak_rss_mb'], record['peak_rss_mb'])]
+        for metric, old_value, value in metrics:
+            if old_value and value and value > old_value * (1 + threshold):
+                regressions.append((record['name'], metric, old_value, value))
+        for circuit, stats in record['circuits'].items():
+            old_stats = old['circuits'].get(circuit)
+            if stats and old_stats:
+                for metric in ('qubits', 'depth'):
+                    if stats[metric] > old_stats[metric]:
+                        regressions.append((record['name'], f'{circuit}.{metric}', old_stats[metric], stats[metric]))
+    return regressions
+
+
+def _format_record(record):
+    if record['error']:
+        return f"{record['name']:<32} error: {record['error'].splitlines()[0][:100]}"
+    stages = ' '.join(f'{stage}={seconds:.2f}' for stage, seconds in record['timings'].items())
+    circuits = ' '.join(f"{name}={stats['qubits']}q/d{stats['depth']}"
+                        for name, stats in record['circuits'].items() if stats)
+    return f"{record['name']:<32} {record['peak_rss_mb']:>7.0f}MB {circuits} {stages}"
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description="End-to-end benchmark of the QASM generator.")
+    arg_parser.add_argument('--graphs', default=','.join(DEFAULT_GRAPHS),
+                            help="comma separated Gset instances of the graph and CNF cases")
+    arg_parser.add_argument('--only', default=None, help="comma separated substrings of the case names to run")
+    arg_parser.add_argument('--timeout', type=float, default=600, help="seconds after which a case is killed")
+    arg_parser.add_argument('--json', default=None, help="write the results to this file")
+    arg_parser.add_argument('--compare', default=None, help="baseline results to report regressions against")
+    arg_parser.add_argument('--threshold', type=float, default=0.2, help="relative slow down reported by --compare")
+    arg_parser.add_argument('--worker', nargs=2, metavar=('CASE', 'RECORD'), help=argparse.SUPPRESS)
+    args = arg_parser.parse_args(argv)
+
+    if args.worker:
+        case_path, record_path = args.worker
+        with open(case_path) as f:
+            record = run_case(json.load(f))
+        with open(record_path, 'w') as f:
+            json.dump(record, f)
+        return 0
+
+    results = run(args.graphs.split(','), args.only.split(',') if args.only else None, args.timeout)
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(json.load(f), results, args.threshold)
+        for name, metric, old_value, value in regressions:
+            print(f'{name:<32} {metric:<16} {old_value} -> {value}')
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,117 @@
+"""
+Cold start benchmark of Framework.generator: for every problem type, the time a fresh
+interpreter needs before it can solve that problem, with the backends loaded up front as the
+generator used to do ("eager") and with the deferred imports the generator does now ("lazy").
+
+Usage (from the `src` directory)::
+
+    python -m benchmarks.import_time --repeat 3 --json import_time.json
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+# modules the generator used to import at load time, whatever the problem
+EAGER_MODULES = [
+    'matplotlib.pyplot',
+    'qiskit_algorithms',
+    'qiskit_optimization.converters',
+    'qiskit_aer',
+    'openqaoa.problems',
+    'pennylane',
+    'src.applications.arithmetic.factorization',
+    'src.applications.graph.grover_applications.graph_oracle',
+    'src.applications.graph.grover_applications.grover_auxiliary',
+    'src.applications.graph.ising_auxiliary',
+    'src.applications.graph.grover_applications.graph_color',
+    'src.applications.graph.grover_applications.triangle_finding',
+    'src.applications.graph.Ising',
+    'src.applications.quantum_machine_learning.quantum_kernel_ml',
+    'src.algorithms.vqe_algorithm',
+    'src.algorithms.grover',
+    'src.Framework.interpreter',
+]
+
+# modules QASMGenerator loads when it dispatches each problem type
+BACKEND_MODULES = {
+    'ARITHMETICS': ['qiskit.qasm2', 'src.applications.arithmetic.quantum_arithmetic'],
+    'FACTOR': ['src.algorithms.grover', 'src.applications.arithmetic.factorization',
+               'src.applications.graph.grover_applications.grover_auxiliary'],
+    'CNF': ['qiskit.circuit.library.phase_oracle', 'src.algorithms.grover'],
+    'EIGENVALUE': ['src.algorithms.vqe_algorithm'],
+    'MACHINELEARNING': ['src.applications.quantum_machine_learning.quantum_kernel_ml'],
+    'GRAPH': ['matplotlib.pyplot', 'src.applications.graph.Ising',
+              'src.applications.graph.grover_applications.graph_oracle',
+              'src.applications.graph.grover_applications.grover_auxiliary'],
+}
+
+_SCRIPT = """
+import importlib, json, sys, time
+missing = []
+start = time.perf_counter()
+for name in sys.argv[1].split(','):
+    try:
+        importlib.import_module(name)
+    except ModuleNotFoundError as e:
+        missing.append(e.name)
+print(json.dumps({'seconds': time.perf_counter() - start, 'modules': len(sys.modules),
+                  'missing': sorted(set(missing))}))
+"""
+
+
+def time_imports(modules):
+    """
+    Import `modules` in a fresh interpreter.
+
+    Returns
+    -------
+    dict with the import wall time in `seconds`, the number of loaded `modules` and the
+    dependencies that are not installed (`missing`), which make the timing a lower bound
+    """
+    src_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join([os.path.dirname(src_dir), src_dir, env.get('PYTHONPATH', '')])
+    completed = subprocess.run([sys.executable, '-c', _SCRIPT, ','.join(modules)],
+                               capture_output=True, text=True, env=env, check=True)
+    return json.loads(completed.stdout)
+
+
+def run(repeat=3):
+    """Best of `repeat` cold starts per problem type, eager and lazy."""
+    results = {}
+    for problem_type, backend in BACKEND_MODULES.items():
+        row = {}
+        for mode, modules in (('eager', ['Framework.generator'] + EAGER_MODULES + backend),
+                              ('lazy', ['Framework.generator'] + backend)):
+            runs = [time_imports(modules) for _ in range(repeat)]
+            row[mode] = min(runs, key=lambda r: r['seconds'])
+        results[problem_type] = row
+    return results
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description="Cold start time of the generator per problem type.")
+    arg_parser.add_argument('--repeat', type=int, default=3, help="cold starts per measurement, the best is kept")
+    arg_parser.add_argument('--json', default=None, help="also write the results to this file")
+    args = arg_parser.parse_args(argv)
+
+    results = run(args.repeat)
+    print(f"{'problem type':<16}{'eager (s)':>12}{'lazy (s)':>12}{'speedup':>10}{'modules':>16}")
+    missing = set()
+    for problem_type, row in results.items():
+        eager, lazy = row['eager'], row['lazy']
+        modules = f"{eager['modules']} -> {lazy['modules']}"
+        print(f"{problem_type:<16}{eager['seconds']:>12.2f}{lazy['seconds']:>12.2f}"
+              f"{eager['seconds'] / lazy['seconds']:>9.1f}x{modules:>16}")
+        missing.update(eager['missing'] + lazy['missing'])
+    if missing:
+        print(f"not installed, timings are lower bounds: {', '.join(sorted(missing))}", file=sys.stderr)
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
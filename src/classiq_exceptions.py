@@ -54,3 +54,39 @@ class NotSupportedParserAstError(Exception):
                  message="The parser is not supported for this kind of grammar."):
         self.message = message
         super().__init__(self.message)
+
+
+class JobQueueFullError(Exception):
+    """Exception raised when a job is submitted while the job queue is at capacity."""
+
+    def __init__(self, max_pending, message="The job queue is full, retry later."):
+        self.max_pending = max_pending
+        self.message = f"{message} Pending jobs limit: {max_pending}"
+        super().__init__(self.message)
+
+
+class JobNotFoundError(Exception):
+    """Exception raised when a job id is unknown to the job queue."""
+
+    def __init__(self, job_id, message="Unknown job."):
+        self.job_id = job_id
+        self.message = f"{message} Job id: {job_id}"
+        super().__init__(self.message)
+
+
+class DataReferenceError(Exception):
+    """Exception raised when a data file referenced by the parsed code cannot be loaded."""
+
+    def __init__(self, file_path, message="Cannot load the referenced data file."):
+        self.file_path = file_path
+        self.message = f"{message} File: {file_path}"
+        super().__init__(self.message)
+
+
+class SandboxError(Exception):
+    """Exception raised when code run on a sandbox worker fails, times out or exceeds its limits."""
+
+    def __init__(self, reason, message="The sandboxed code failed."):
+        self.reason = reason
+        self.message = f"{message} Reason: {reason}"
+        super().__init__(self.message)
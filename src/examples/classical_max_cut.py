@@ -51,7 +51,7 @@ for i in range(max):
 
 print(f"Objective value computed by the brute-force method is {sol}")
 
-from qiskit.quantum_info import Pauli, SparsePauliOp
+from applications.quadratic_program import SparseIsing
 
 
 #from qiskit.aqua.operators import WeightedPauliOperator
@@ -75,51 +75,20 @@ def get_clique_operator(weight_matrix, K):
         A constant shift for the obj function.
     """
     num_nodes = len(weight_matrix)
-    pauli_list = []
-    coeffs = []
-    shift = 0
-
     A = 1000
     offset = K - 0.5 * num_nodes
-    shift += A * offset * offset
-    for i in range(num_nodes):
-        x_p = np.zeros(num_nodes, dtype=bool)
-        z_p = np.zeros(num_nodes, dtype=bool)
-        z_p[i] = True
-        pauli_list.append(Pauli((z_p, x_p)))
-        coeffs.append(-offset * 0.5)
-    for i in range(num_nodes):
-        for j in range(num_nodes):
-            if i != j:
-                x_p = np.zeros(num_nodes, dtype=bool)
-                z_p = np.zeros(num_nodes, dtype=bool)
-                z_p[i] = True
-                z_p[j] = True
-                pauli_list.append(Pauli((z_p, x_p)))
-                coeffs.append(0.25)
-    shift += (K * K - K) / 2
-    for i in range(num_nodes):
-        for j in range(i):
-            if weight_matrix[i, j] != 0:
-                x_p = np.zeros(num_nodes, dtype=bool)
-                z_p = np.zeros(num_nodes, dtype=bool)
-                z_p[i] = True
-                z_p[j] = True
-                pauli_list.append(Pauli((z_p, x_p)))
-                coeffs.append(0.25)
-
-                z_p2 = np.zeros(num_nodes, dtype=bool)
-                z_p2[i] = True
-                pauli_list.append(Pauli((z_p2, x_p)))
-                coeffs.append(0.25)
-
-                z_p3 = np.zeros(num_nodes, dtype=bool)
-                z_p3[j] = True
-                pauli_list.append(Pauli((z_p3, x_p)))
-                coeffs.append(0.25)
-                shift += 0.25
-
-    return SparsePauliOp(pauli_list, coeffs=coeffs), shift
+    # i != j counts each pair twice, 0.25 each
+    pairs_i, pairs_j = np.triu_indices(num_nodes, 1)
+    edges_i, edges_j = np.nonzero(np.tril(weight_matrix, -1))
+    ising = SparseIsing(num_nodes,
+                        linear_indices=np.concatenate((np.arange(num_nodes), edges_i, edges_j)),
+                        linear_weights=np.concatenate((np.full(num_nodes, -offset * 0.5),
+                                                       np.full(2 * len(edges_i), 0.25))),
+                        rows=np.concatenate((pairs_i, edges_i)),
+                        cols=np.concatenate((pairs_j, edges_j)),
+                        quadratic_weights=np.concatenate((np.full(len(pairs_i), 0.5), np.full(len(edges_i), 0.25))),
+                        offset=A * offset * offset + (K * K - K) / 2 + 0.25 * len(edges_i))
+    return ising.to_ising()
 
 
 def get_operator(weight_matrix):
@@ -144,34 +113,14 @@ def get_operator(weight_matrix):
         A constant shift for the obj function.
     """
     num_nodes = len(weight_matrix)
-    pauli_list = []
-    coeffs = []
-    shift = 0
-
-    for i in range(num_nodes):
-        for j in range(i):
-            if weight_matrix[i, j] != 0:
-                x_p = np.zeros(num_nodes, dtype=bool)
-                z_p = np.zeros(num_nodes, dtype=bool)
-                z_p[i] = True
-                z_p[j] = True
-                pauli_list.append(Pauli((z_p, x_p)))
-                coeffs.append(-0.5)
-                shift += 0.5
-
-    for i in range(num_nodes):
-        for j in range(num_nodes):
-            if i != j:
-                x_p = np.zeros(num_nodes, dtype=bool)
-                z_p = np.zeros(num_nodes, dtype=bool)
-                z_p[i] = True
-                z_p[j] = True
-                pauli_list.append(Pauli((z_p, x_p)))
-                coeffs.append(1.0)
-            else:
-                shift += 1
-
-    return SparsePauliOp(pauli_list, coeffs=coeffs), shift
+    pairs_i, pairs_j = np.triu_indices(num_nodes, 1)
+    edges_i, edges_j = np.nonzero(np.tril(weight_matrix, -1))
+    ising = SparseIsing(num_nodes,
+                        rows=np.concatenate((edges_i, pairs_i)),
+                        cols=np.concatenate((edges_j, pairs_j)),
+                        quadratic_weights=np.concatenate((np.full(len(edges_i), -0.5), np.full(len(pairs_i), 2.0))),
+                        offset=0.5 * len(edges_i) + num_nodes)
+    return ising.to_ising()
 
 
 qubit_op, offset = get_clique_operator(w, 3)
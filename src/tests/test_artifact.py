@@ -0,0 +1,78 @@
+import unittest
+
+from qiskit import QuantumCircuit, qasm2
+
+from Framework.artifact import CircuitArtifact
+from Framework.cache import ResultCache
+from Framework.generator import QASMGenerator
+
+addition_code = """
+def addition(left, right):
+    return left + right
+
+left = 3
+right = 5
+result = addition(left, right)
+"""
+
+
+def bell():
+    circuit = QuantumCircuit(2)
+    circuit.h(0)
+    circuit.cx(0, 1)
+    return circuit
+
+
+class MyTestCase(unittest.TestCase):
+    def test_lazy_qasm_and_circuit(self):
+        circuit = bell()
+        artifact = CircuitArtifact(circuit)
+        self.assertTrue(artifact.has_circuit)
+        self.assertIs(artifact.circuit, circuit)
+        self.assertEqual(artifact.qasm, qasm2.dumps(circuit))
+
+        parsed = CircuitArtifact(qasm=artifact.qasm)
+        self.assertFalse(parsed.has_circuit)
+        self.assertTrue(parsed.matches(artifact.qasm + '\n'))
+        self.assertEqual(parsed.num_qubits, 2)
+        self.assertEqual(qasm2.dumps(parsed.circuit), artifact.qasm)
+
+        with self.assertRaises(ValueError):
+            CircuitArtifact()
+
+    def test_transpiled_once(self):
+        artifact = CircuitArtifact(bell())
+        compiled = artifact.transpiled(optimization_level=1)
+        self.assertIs(artifact.transpiled(optimization_level=1), compiled)
+        measured = artifact.transpiled(optimization_level=1, measure=True)
+        self.assertIsNot(measured, compiled)
+        self.assertEqual(measured.count_ops().get('measure'), 2)
+        self.assertNotIn('measure', artifact.circuit.count_ops())
+
+    def test_generator_artifacts(self):
+        generator = QASMGenerator()
+        artifacts, _ = generator.generate(addition_code)
+        self.assertIs(generator.artifacts, artifacts)
+        artifact = artifacts['QFT']
+        self.assertTrue(artifact.has_circuit)
+
+        qasm_codes, _ = QASMGenerator().qasm_generate(addition_code)
+        self.assertEqual(qasm_codes['QFT'], artifact.qasm)
+
+        # the simulator reuses the in-memory circuit behind the QASM of the last call
+        generator.run_qasm_simulator(artifact.qasm)
+        self.assertEqual(len(artifact._transpiled), 1)
+        generator.run_qasm_simulator(artifact.qasm)
+        self.assertEqual(len(artifact._transpiled), 1)
+
+    def test_cached_artifacts(self):
+        cache = ResultCache()
+        QASMGenerator(cache=cache).qasm_generate(addition_code)
+        generator = QASMGenerator(cache=cache)
+        artifacts, _ = generator.generate(addition_code)
+        self.assertFalse(artifacts['QFT'].has_circuit)
+        self.assertGreater(artifacts['QFT'].num_qubits, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
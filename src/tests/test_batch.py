@@ -0,0 +1,47 @@
+import unittest
+
+from Framework.batch import qasm_generate_batch
+
+addition_code = """
+def add(a, b):
+    return a + b
+a = 3
+b = 4
+result = add(a, b)
+"""
+triangle_code = """
+import networkx as nx
+edges = [(0, 1), (1, 2), (2, 0), (2, 3)]
+G = nx.Graph()
+G.add_edges_from(edges)
+triangles = find_triangles(G)
+"""
+
+
+class MyTestCase(unittest.TestCase):
+    def test_every_item_reported(self):
+        codes = [('ok', addition_code), ('broken', 'def (:'), ('ok2', addition_code)]
+        seen = []
+        records = list(qasm_generate_batch(codes, workers=2, callback=seen.append))
+        self.assertEqual(sorted(record['id'] for record in records), ['broken', 'ok', 'ok2'])
+        self.assertEqual(len(seen), 3)
+        broken = next(record for record in records if record['id'] == 'broken')
+        self.assertIsNotNone(broken['error'])
+        self.assertIn('total', broken['timings'])
+
+    def test_accepts_plain_strings_and_dicts(self):
+        codes = [addition_code, {'id': 'named', 'classical_code': addition_code}]
+        records = list(qasm_generate_batch(iter(codes), workers=1, max_pending=1))
+        self.assertEqual(sorted(str(record['id']) for record in records), ['0', 'named'])
+
+    def test_no_images(self):
+        # the workers skip the plots rather than dropping them afterwards
+        for render_images in (True, False):
+            record, = qasm_generate_batch([triangle_code], workers=1, render_images=render_images)
+            self.assertIsNone(record['error'])
+            self.assertEqual('plot' in record['timings'], render_images)
+            self.assertEqual(bool(record['img_ios']), render_images)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,38 @@
+import unittest
+
+from benchmarks.bench_generator import compare, graph_cases, other_cases
+from Framework.parser import ProblemParser
+
+
+def _record(name, total, rss, depth, error=None):
+    return {'name': name, 'error': error, 'timings': {'total': total}, 'peak_rss_mb': rss,
+            'circuits': {'grover': {'qubits': 5, 'depth': depth}}}
+
+
+class MyTestCase(unittest.TestCase):
+    def test_cases_parse_as_intended(self):
+        for case in graph_cases(['G4', 'G5']) + other_cases():
+            parser = ProblemParser()
+            parser.parse_code(case['classical_code'])
+            self.assertEqual(parser.problem_type.name, case['problem_type'], case['name'])
+            if case['algorithm'] is not None:
+                detected = parser.specific_graph_problem or parser.specific_arithmetic_operation
+                self.assertEqual(detected, case['algorithm'], case['name'])
+
+    def test_gset_relabelled_from_zero(self):
+        # G5 is indexed from 1
+        case = next(case for case in graph_cases(['G5']) if case['name'] == 'MaximumCut/G5')
+        parser = ProblemParser()
+        parser.parse_code(case['classical_code'])
+        self.assertEqual(sorted(parser.data.nodes), list(range(15)))
+
+    def test_compare(self):
+        baseline = {'results': [_record('a', 1.0, 100, 10), _record('b', 1.0, 100, 10), _record('c', 1.0, 100, 10)]}
+        current = {'results': [_record('a', 1.1, 100, 10), _record('b', 2.0, 100, 12),
+                               _record('c', 0.1, None, 10, error='boom')]}
+        self.assertEqual(compare(baseline, current),
+                         [('b', 'total', 1.0, 2.0), ('b', 'grover.depth', 10, 12), ('c', 'error', None, 'boom')])
+
+
+if __name__ == '__main__':
+    unittest.main()
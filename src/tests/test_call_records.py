@@ -0,0 +1,41 @@
+import unittest
+
+from Framework.parser import CallRecord, ProblemParser
+
+ARITHMETIC = """
+def addition(left, right):
+    return left + right
+
+left = 3
+right = 5
+result = addition(left, right)
+"""
+
+
+class MyTestCase(unittest.TestCase):
+    def test_record(self):
+        parser = ProblemParser()
+        parser.parse_code("print(f(a.x), 3, -b, *c, 'text')\n")
+        call = parser.visitor.calls[0]
+        self.assertEqual(call.func_name, 'print')
+        self.assertEqual(call.kinds, ('call', 'constant', 'unaryop', 'starred', 'constant'))
+        self.assertEqual(call.names, ('f', None, 'b', 'c', None))
+        self.assertEqual(call.values, (None, 3, None, None, 'text'))
+        self.assertFalse(hasattr(call, '__dict__'))
+
+    def test_operands(self):
+        parser = ProblemParser()
+        parser.parse_code(ARITHMETIC)
+        self.assertEqual(parser.arithmetic_arguments, ['left', 'right'])
+        self.assertEqual(parser.data, {'left': 3, 'right': 5})
+        self.assertIsInstance(parser.visitor.calls[0], CallRecord)
+
+    def test_report_dumps(self):
+        parser = ProblemParser()
+        parser.parse_code(ARITHMETIC)
+        report = parser.evaluation()
+        self.assertIn(" - addition(Name(id='left', ctx=Load()), Name(id='right', ctx=Load()))", report)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,104 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from Framework.data_references import DataReference
+from Framework.parser import ProblemParser, ProblemType
+from src.classiq_exceptions import DataReferenceError
+
+GSET = "4 3\n1 2 1\n2 3 2\n3 4 -1\n"
+TSPLIB = """NAME : square
+TYPE : TSP
+DIMENSION : 4
+EDGE_WEIGHT_TYPE : EUC_2D
+NODE_COORD_SECTION
+1 0 0
+2 3 0
+3 3 4
+4 0 4
+EOF
+"""
+
+
+class MyTestCase(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.data_dir = os.path.join(self.directory.name, 'data')
+        os.makedirs(os.path.join(self.data_dir, 'graphs'))
+        self.matrix = np.diag([1.0, -1.0, 2.0, 0.5])
+        np.save(os.path.join(self.data_dir, 'h.npy'), self.matrix)
+        np.savetxt(os.path.join(self.data_dir, 'graphs', 'edges.txt'), [[0, 1, 2.5], [1, 2, 1.0], [2, 0, 3.0]])
+        with open(os.path.join(self.data_dir, 'graphs', 'labels.txt'), 'w') as file:
+            file.write("a b\nb c\n")
+        with open(os.path.join(self.data_dir, 'G1'), 'w') as file:
+            file.write(GSET)
+        with open(os.path.join(self.data_dir, 'square.tsp'), 'w') as file:
+            file.write(TSPLIB)
+        with open(os.path.join(self.directory.name, 'secret.txt'), 'w') as file:
+            file.write("0 1\n")
+        self.parser = ProblemParser(data_dir=self.data_dir)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_memory_mapped_matrix(self):
+        self.parser.parse_code("import numpy as np\nmatrix = np.load('h.npy')\neigenvalues = np.linalg.eigvals(matrix)\n")
+        self.assertEqual(self.parser.problem_type, ProblemType.EIGENVALUE)
+        self.assertIsInstance(self.parser.data, np.memmap)
+        self.assertEqual(self.parser.data.mode, 'r')
+        np.testing.assert_array_equal(self.parser.data, self.matrix)
+        self.assertEqual(self.parser.diagnostics['data_files'], 1)
+
+    def test_edge_lists(self):
+        self.parser.parse_code("import networkx as nx\nG = nx.read_weighted_edgelist('graphs/edges.txt')\n")
+        self.assertEqual(self.parser.problem_type, ProblemType.GRAPH)
+        self.assertEqual(sorted(self.parser.data.edges(data='weight')), [(0, 1, 2.5), (0, 2, 3.0), (1, 2, 1.0)])
+
+        # the third column is not a weight for read_edgelist, numeric labels are ints either way
+        self.parser.parse_code("import networkx as nx\nG = nx.read_edgelist('graphs/edges.txt')\n")
+        self.assertEqual(sorted(self.parser.data.edges(data='weight')), [(0, 1, 1.0), (0, 2, 1.0), (1, 2, 1.0)])
+
+        self.parser.parse_code("import networkx as nx\nedges = np.loadtxt('graphs/edges.txt')\n")
+        self.assertEqual(self.parser.data[2][0]['weight'], 3.0)
+
+        # labels that are not numbers go through the networkx reader
+        self.parser.parse_code("import networkx as nx\nG = nx.read_edgelist('graphs/labels.txt')\n")
+        self.assertEqual(sorted(self.parser.data.nodes), ['a', 'b', 'c'])
+
+    def test_gset_and_tsplib(self):
+        self.parser.parse_code("import networkx as nx\nelist, num_nodes, num_edges = read_gset_file('G1')\n"
+                               "G = nx.Graph()\nmax_cut(G)\n")
+        self.assertEqual(self.parser.data[3][4]['weight'], -1.0)
+        self.assertEqual(len(self.parser.data_files), 1)
+
+        self.parser.parse_code("import networkx as nx\nimport tsplib95\nproblem = tsplib95.load('square.tsp')\n"
+                               "tsp(problem)\n")
+        self.assertEqual(self.parser.specific_graph_problem, 'TSP')
+        self.assertEqual(self.parser.data[0][2]['weight'], 5.0)
+
+    def test_sandbox(self):
+        for path in ('../secret.txt', os.path.join(self.directory.name, 'secret.txt'), 'missing.txt'):
+            with self.assertRaises(DataReferenceError):
+                self.parser.parse_code(f"import networkx as nx\nG = nx.read_edgelist({path!r})\n")
+        os.symlink(os.path.join(self.directory.name, 'secret.txt'), os.path.join(self.data_dir, 'link.txt'))
+        with self.assertRaisesRegex(DataReferenceError, 'outside of the data directory'):
+            self.parser.parse_code("import networkx as nx\nG = nx.read_edgelist('link.txt')\n")
+        with self.assertRaisesRegex(DataReferenceError, 'No data directory'):
+            ProblemParser().parse_code("import numpy as np\nmatrix = np.load('h.npy')\nobservable = 1\n")
+
+    def test_no_pickles(self):
+        np.save(os.path.join(self.data_dir, 'objects.npy'), np.array([{'a': 1}], dtype=object))
+        with self.assertRaisesRegex(DataReferenceError, 'Python objects'):
+            self.parser.parse_code("import numpy as np\nmatrix = np.load('objects.npy')\nobservable = 1\n")
+
+    def test_references_are_lazy(self):
+        # a reference the problem does not need is never loaded
+        self.parser.parse_code("import networkx as nx\nunused = np.load('missing.npy')\nedges = [(0, 1)]\n")
+        self.assertEqual(self.parser.data.number_of_edges(), 1)
+        self.assertIsInstance(self.parser.visitor.variables['unused'], DataReference)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,43 @@
+import unittest
+
+import numpy as np
+from qiskit.circuit.library import ZZFeatureMap
+from qiskit.quantum_info import Statevector, state_fidelity
+
+from src.applications.quantum_machine_learning.quantum_kernel_ml import calculate_kernel
+
+
+def reference_kernel(feature_map, x_data, y_data):
+    kernel = np.zeros((len(y_data), len(x_data)))
+    for i, x in enumerate(x_data):
+        for j, y in enumerate(y_data):
+            kernel[j, i] = state_fidelity(Statevector(feature_map.assign_parameters(x)),
+                                          Statevector(feature_map.assign_parameters(y)))
+    return kernel
+
+
+class MyTestCase(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(3)
+        self.feature_map = ZZFeatureMap(feature_dimension=2, reps=2)
+        self.x_data = rng.uniform(0, 2 * np.pi, size=(6, 2))
+        self.y_data = rng.uniform(0, 2 * np.pi, size=(4, 2))
+
+    def test_train_kernel(self):
+        kernel = calculate_kernel(self.feature_map, self.x_data)
+        self.assertEqual(kernel.shape, (6, 6))
+        assert np.allclose(kernel, kernel.T)
+        assert np.allclose(kernel, reference_kernel(self.feature_map, self.x_data, self.x_data))
+
+    def test_test_kernel(self):
+        kernel = calculate_kernel(self.feature_map, self.x_data, self.y_data)
+        self.assertEqual(kernel.shape, (4, 6))
+        assert np.allclose(kernel, reference_kernel(self.feature_map, self.x_data, self.y_data))
+
+    def test_parallel_kernel(self):
+        kernel = calculate_kernel(self.feature_map, self.x_data, self.y_data, n_jobs=2, chunk_size=2)
+        assert np.allclose(kernel, calculate_kernel(self.feature_map, self.x_data, self.y_data))
+
+
+if __name__ == '__main__':
+    unittest.main()
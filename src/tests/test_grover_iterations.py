@@ -0,0 +1,62 @@
+import itertools
+import math
+import unittest
+
+from qiskit import QuantumCircuit
+
+from src.algorithms.grover import GroverWrapper
+from src.algorithms.grover_iterations import optimal_iterations, success_probability, success_table, \
+    count_cnf_models, count_cnf_solutions, bbht_schedule
+
+
+class MyTestCase(unittest.TestCase):
+    def test_optimal_iterations(self):
+        # one marked state out of four is found with certainty after one iteration
+        self.assertEqual(optimal_iterations(1, 4), 1)
+        self.assertAlmostEqual(success_probability(1, 1, 4), 1.0)
+        self.assertEqual(optimal_iterations(1, 2 ** 10), 25)
+        self.assertEqual(optimal_iterations(0, 16), 0)
+        self.assertEqual(optimal_iterations(12, 16), 0)
+        table = success_table(3, 2 ** 8)
+        best = max(table, key=table.get)
+        self.assertEqual(best, optimal_iterations(3, 2 ** 8))
+
+    def test_count_cnf_models(self):
+        clauses = [[1, -2], [2, 3], [-1, -3]]
+        expected = sum(1 for bits in itertools.product([False, True], repeat=3)
+                       if all(any(bits[abs(l) - 1] == (l > 0) for l in clause) for clause in clauses))
+        self.assertEqual(count_cnf_models(clauses), expected)
+        # a fourth variable in no clause doubles the count
+        self.assertEqual(count_cnf_models(clauses, num_vars=4), 2 * expected)
+        self.assertIsNone(count_cnf_models([[1, 2, 3]], limit=3))
+
+    def test_count_many_solutions(self):
+        # a perfect matching of n nodes has 3^(n/2) independent sets
+        def matching(n):
+            return [[-(2 * i + 1), -(2 * i + 2)] for i in range(n // 2)]
+        self.assertIsNone(count_cnf_models(matching(16), num_vars=16, limit=4096))
+        # past the SAT limit, small formulas are counted over every assignment
+        self.assertEqual(count_cnf_solutions(matching(16), num_vars=16), 3 ** 8)
+        self.assertEqual(count_cnf_solutions(matching(16), num_vars=17), 2 * 3 ** 8)
+        self.assertEqual(count_cnf_solutions(matching(10), num_vars=10), 3 ** 5)
+        self.assertIsNone(count_cnf_solutions(matching(24), num_vars=24))
+
+    def test_bbht_schedule(self):
+        schedule = bbht_schedule(2 ** 10, seed=7)
+        self.assertTrue(all(0 <= k <= math.sqrt(2 ** 10) for k in schedule))
+        self.assertGreaterEqual(sum(max(k, 1) for k in schedule), 9 / 4 * math.sqrt(2 ** 10))
+
+    def test_wrapper_counts_solutions(self):
+        marked = {'0110', '1011'}
+        # the empty oracle stands in for one marking `marked`, evaluated through the predicate
+        grover = GroverWrapper(QuantumCircuit(4), is_good_state=lambda bitstring: bitstring in marked,
+                               engine='statevector')
+        self.assertEqual(grover.num_solutions, 2)
+        self.assertEqual(grover.iterations, optimal_iterations(2, 16))
+        result = grover.run()
+        self.assertIn(result.top_measurement, marked)
+        self.assertAlmostEqual(result.max_probability * 2, grover.expected_success_probability)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,94 @@
+import unittest
+
+import networkx as nx
+import numpy as np
+from qiskit import QuantumCircuit
+
+from src.algorithms.grover import GroverWrapper
+from src.algorithms.grover_simulator import oracle_agrees, phase_mask
+
+
+def marking_oracle(marked, num_qubits):
+    """Flip the phase of the `marked` bitstrings using a kickback ancilla, the last qubit."""
+    oracle = QuantumCircuit(num_qubits + 1)
+    oracle.x(num_qubits)
+    oracle.h(num_qubits)
+    for bitstring in marked:
+        zeros = [num_qubits - 1 - i for i, bit in enumerate(bitstring) if bit == '0']
+        if zeros:
+            oracle.x(zeros)
+        oracle.mcx(list(range(num_qubits)), num_qubits)
+        if zeros:
+            oracle.x(zeros)
+    oracle.h(num_qubits)
+    oracle.x(num_qubits)
+    return oracle
+
+
+class MyTestCase(unittest.TestCase):
+    def test_matches_sampler(self):
+        # exact amplification, then over-rotation past the good states
+        for marked, iterations in ((['101', '011'], 1), (['101', '011', '000'], 2)):
+            oracle = marking_oracle(marked, 3)
+            results = {}
+            for engine in ('sampler', 'statevector'):
+                grover = GroverWrapper(oracle, iterations=iterations, is_good_state=marked,
+                                       objective_qubits=[0, 1, 2], engine=engine)
+                self.assertEqual(grover.engine, engine)
+                results[engine] = grover.run()
+            expected, actual = results['sampler'], results['statevector']
+            self.assertEqual(expected.iterations, actual.iterations)
+            self.assertEqual(expected.top_measurement, actual.top_measurement)
+            self.assertEqual(expected.oracle_evaluation, actual.oracle_evaluation)
+            self.assertAlmostEqual(expected.max_probability, actual.max_probability)
+            for bitstring, probability in expected.circuit_results[0].items():
+                self.assertAlmostEqual(probability, actual.circuit_results[0].get(bitstring, 0.0))
+
+    def test_auto_engine(self):
+        oracle = marking_oracle(['11'], 2)
+        self.assertEqual(GroverWrapper(oracle, 1, is_good_state=['11'], objective_qubits=[0, 1]).engine,
+                         'statevector')
+        # the oracle also flips 00, which the predicate does not accept
+        self.assertEqual(GroverWrapper(marking_oracle(['11', '00'], 2), 1, is_good_state=['11'],
+                                       objective_qubits=[0, 1]).engine, 'sampler')
+        # without a predicate the oracle cannot be evaluated classically
+        self.assertEqual(GroverWrapper(oracle, 1, objective_qubits=[0, 1]).engine, 'sampler')
+        # preparation touching the ancilla leaves the objective subspace
+        prep = QuantumCircuit(3)
+        prep.h([0, 1, 2])
+        self.assertEqual(GroverWrapper(oracle, 1, is_good_state=['11'], state_preparation=prep,
+                                       objective_qubits=[0, 1]).engine, 'sampler')
+        with self.assertRaises(ValueError):
+            GroverWrapper(oracle, 1, is_good_state=['11'], state_preparation=prep,
+                          objective_qubits=[0, 1], engine='statevector')
+
+    def test_wide_objective(self):
+        num_qubits = 16
+        marked = np.binary_repr(12345, num_qubits)
+        iterations = int(np.pi / 4 * np.sqrt(2 ** num_qubits))
+        grover = GroverWrapper(QuantumCircuit(num_qubits), iterations,
+                               is_good_state=lambda bitstring: bitstring == marked, engine='statevector')
+        result = grover.run()
+        self.assertEqual(result.top_measurement, marked)
+        self.assertGreater(result.max_probability, 0.99)
+        self.assertTrue(result.oracle_evaluation)
+
+    def test_graph_applications(self):
+        from src.applications.graph.grover_applications.graph_color import GraphColor
+        from src.applications.graph.grover_applications.triangle_finding import TriangleFinding
+        coloring = GraphColor(nx.cycle_graph(4))
+        self.assertEqual(coloring.grover_wrapper.engine, 'statevector')
+        self.assertTrue(coloring.run().oracle_evaluation)
+
+        triangle = TriangleFinding(nx.Graph([(0, 1), (1, 2), (2, 0), (2, 3)]))
+        wrapper = triangle.grover_wrapper
+        self.assertEqual(wrapper.engine, 'statevector')
+        # the predicate marks what the oracle marks, 11111-like states with 3 edges modulo 4 included
+        good = phase_mask(wrapper.problem.is_good_state, 4)
+        self.assertTrue(oracle_agrees(triangle.oracle, good, list(range(4))))
+        self.assertEqual(triangle.num_marked, int(good.sum()))
+        self.assertEqual(triangle.run().top_measurement, '0111')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,73 @@
+import os
+import tempfile
+import unittest
+
+import networkx as nx
+import numpy as np
+
+from applications.graph.graph_problem import GraphProblem
+from applications.graph.gset import get_weight_matrix, load_gset, load_tsplib, read_gset_file
+
+CASES = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'cases')
+
+
+class Problem(GraphProblem):
+    pass
+
+
+class MyTestCase(unittest.TestCase):
+    def test_gset_one_based(self):
+        edges = load_gset(os.path.join(CASES, 'Gset', 'G1'))
+        self.assertEqual((edges.offset, edges.num_nodes, edges.num_edges), (1, 5, 8))
+        self.assertEqual(edges.sources.dtype, np.int32)
+        self.assertEqual(edges.weights.dtype, np.float32)
+        elist, num_nodes, num_edges = read_gset_file(os.path.join(CASES, 'Gset', 'G1'))
+        self.assertEqual(elist[0], (1, 2, 1.0))
+        self.assertEqual((num_nodes, num_edges), (5, 8))
+
+    def test_matrices(self):
+        edges = load_gset(os.path.join(CASES, 'Gset', 'G12'))
+        self.assertEqual(edges.offset, 0)
+        graph = edges.to_networkx()
+        expected = get_weight_matrix(graph, edges.num_nodes)
+        np.testing.assert_array_equal(edges.weight_matrix(), expected)
+        np.testing.assert_array_equal(edges.csr().toarray(), expected)
+        np.testing.assert_array_equal(nx.to_numpy_array(graph, nodelist=range(edges.num_nodes)), expected)
+
+    def test_lazy_graph(self):
+        problem = Problem(os.path.join(CASES, 'Gset', 'G5'))
+        self.assertIsNone(problem._graph)
+        self.assertEqual(problem.adjacency().shape, (15, 15))
+        self.assertIsNone(problem._graph)
+        self.assertEqual(problem.graph().number_of_edges(), 20)
+        self.assertEqual(min(problem.graph().nodes), 1)
+
+    def test_subclass_attributes(self):
+        # subclasses keep their own `edges`, the loaded file is `edge_list`
+        from applications.graph.grover_applications.triangle_finding import TriangleFinding
+        problem = TriangleFinding(nx.Graph([(0, 1), (1, 2), (2, 0), (2, 3)]))
+        self.assertEqual(problem.edges, [(0, 1), (0, 2), (1, 2), (2, 3)])
+        self.assertEqual(problem.num_triangles, 1)
+        problem = TriangleFinding(os.path.join(CASES, 'Gset', 'G1'))
+        self.assertEqual(len(problem.edges), problem.edge_list.num_edges)
+
+    def test_tsplib(self):
+        explicit = load_tsplib(os.path.join(CASES, 'TSPLIB', 'sample.tsp'))
+        self.assertEqual(explicit.num_edges, 10)
+        self.assertEqual(explicit.weight_matrix()[1, 4], 1)
+        coordinates = load_tsplib(os.path.join(CASES, 'TSPLIB', 'G1'))
+        self.assertEqual(coordinates.metadata['EDGE_WEIGHT_TYPE'], 'EUC_2D')
+        self.assertEqual(coordinates.weight_matrix()[0, 2], 66)
+
+    def test_tsplib_triangle(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'upper.tsp')
+            with open(path, 'w') as f:
+                f.write('NAME: upper\nTYPE: TSP\nDIMENSION: 3\nEDGE_WEIGHT_TYPE: EXPLICIT\n'
+                        'EDGE_WEIGHT_FORMAT: UPPER_ROW\nEDGE_WEIGHT_SECTION\n5 7\n9\nEOF\n')
+            matrix = load_tsplib(path).weight_matrix()
+        np.testing.assert_array_equal(matrix, [[0, 5, 7], [5, 0, 9], [7, 9, 0]])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,68 @@
+import itertools
+import unittest
+
+import networkx as nx
+import numpy as np
+
+from applications.graph.gset import EdgeList
+from applications.graph.hamiltonians import clique_hamiltonian, edge_arrays, maxcut_hamiltonian, \
+    partition_hamiltonian, penalty_hamiltonian, zz_hamiltonian
+
+
+def assignments(n):
+    """Every 0/1 assignment of n nodes, row k being basis state k (bit i is node i)."""
+    return (np.arange(2 ** n)[:, None] >> np.arange(n)) & 1
+
+
+class MyTestCase(unittest.TestCase):
+    def test_edge_inputs(self):
+        graph = nx.Graph()
+        graph.add_weighted_edges_from([('a', 'b', 2.0), ('b', 'c', 3.0)])
+        sources, targets, weights, num_nodes = edge_arrays(graph)
+        np.testing.assert_array_equal(np.stack((sources, targets)), [[0, 1], [1, 2]])
+        np.testing.assert_array_equal(weights, [2.0, 3.0])
+        self.assertEqual(edge_arrays([(0, 3)])[3], 4)
+        edges = EdgeList([0, 1], [1, 2], [2.0, 3.0], 4)
+        self.assertEqual(zz_hamiltonian(edges).num_variables, 4)
+
+    def test_zz_labels(self):
+        operator = zz_hamiltonian([(0, 1, 1.0), (0, 4, 2.0)], num_nodes=5).to_sparse_pauli_op()
+        self.assertEqual(operator.to_list(), [('IIIZZ', 1.0), ('ZIIIZ', 2.0)])
+
+    def test_maxcut_and_partition(self):
+        graph = nx.gnm_random_graph(6, 9, seed=3)
+        cuts = np.array([sum(x[u] != x[v] for u, v in graph.edges) for x in assignments(6)])
+        np.testing.assert_allclose(maxcut_hamiltonian(graph).diagonal(), -cuts)
+
+        energy = partition_hamiltonian(graph).diagonal()
+        balanced = assignments(6).sum(axis=1) == 3
+        self.assertEqual(energy.min(), cuts[balanced].min())
+        self.assertTrue(balanced[np.argmin(energy)])
+
+    def test_penalty(self):
+        energy = penalty_hamiltonian(5, target=1, nodes=[0, 2, 4]).diagonal()
+        spins = 1 - 2 * assignments(5)
+        np.testing.assert_allclose(energy, (spins[:, [0, 2, 4]].sum(axis=1) - 1) ** 2)
+
+    def test_clique(self):
+        graph = nx.complete_graph(4)
+        graph.add_edges_from([(3, 4), (4, 5)])
+        energy = clique_hamiltonian(graph, 3).diagonal()
+        cliques = [x for x in assignments(6)
+                   if x.sum() == 3 and all(graph.has_edge(u, v)
+                                           for u, v in itertools.combinations(np.flatnonzero(x), 2))]
+        self.assertEqual(int(np.sum(np.isclose(energy, 0))), len(cliques))
+        self.assertGreater(np.delete(energy, np.flatnonzero(np.isclose(energy, 0))).min(), 0.5)
+
+    def test_large(self):
+        rng = np.random.default_rng(0)
+        edges = rng.integers(0, 400, (100_000, 2))
+        operator = zz_hamiltonian(edges, num_nodes=400).to_sparse_pauli_op()
+        self.assertEqual(operator.num_qubits, 400)
+        self.assertGreater(len(operator), 50_000)
+        # target 0 leaves only the couplings
+        self.assertEqual(len(penalty_hamiltonian(450).to_sparse_pauli_op()), 450 * 449 // 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,85 @@
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+from src.app.jobs import LocalJobQueue, InlineJobQueue
+from src.classiq_exceptions import JobQueueFullError, JobNotFoundError
+
+
+def wait_for(queue, job_id, timeout=10):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        info = queue.status(job_id)
+        if info['status'] in ('done', 'failed', 'cancelled'):
+            return info
+        time.sleep(0.01)
+    raise TimeoutError(job_id)
+
+
+def fail(message):
+    raise ValueError(message)
+
+
+class MyTestCase(unittest.TestCase):
+    def test_job_result(self):
+        queue = LocalJobQueue(max_workers=1)
+        job_id = queue.submit('pow', pow, 2, 10)
+        info = wait_for(queue, job_id)
+        self.assertEqual(info['status'], 'done')
+        self.assertEqual(info['result'], 1024)
+        queue.shutdown()
+
+    def test_job_failure(self):
+        queue = LocalJobQueue(max_workers=1)
+        info = wait_for(queue, queue.submit('fail', fail, 'boom'))
+        self.assertEqual(info['status'], 'failed')
+        self.assertIn('boom', info['error'])
+        queue.shutdown()
+
+    def test_backpressure_and_cancel(self):
+        queue = LocalJobQueue(max_workers=1, max_pending=2, executor=ThreadPoolExecutor(max_workers=1))
+        running = queue.submit('sleep', time.sleep, 0.3)
+        queued = queue.submit('sleep', time.sleep, 0.3)
+        with self.assertRaises(JobQueueFullError):
+            queue.submit('sleep', time.sleep, 0.3)
+        self.assertEqual(queue.status(queued)['status'], 'queued')
+        # the worker marks its job running, and a running job cannot be cancelled nor free its slot
+        self.assertEqual(queue.status(running)['status'], 'running')
+        self.assertFalse(queue.cancel(running))
+        self.assertEqual(queue.status(running)['status'], 'running')
+        with self.assertRaises(JobQueueFullError):
+            queue.submit('sleep', time.sleep, 0.3)
+        self.assertTrue(queue.cancel(queued))
+        self.assertEqual(queue.status(queued)['status'], 'cancelled')
+        # the cancelled job frees a slot right away
+        queue.submit('sleep', time.sleep, 0)
+        self.assertEqual(wait_for(queue, running)['status'], 'done')
+        queue.shutdown()
+
+    def test_process_workers_report_start(self):
+        queue = LocalJobQueue(max_workers=1)
+        job_id = queue.submit('sleep', time.sleep, 1)
+        deadline = time.time() + 10
+        while queue.status(job_id)['status'] == 'queued' and time.time() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(queue.status(job_id)['status'], 'running')
+        self.assertFalse(queue.cancel(job_id))
+        self.assertEqual(wait_for(queue, job_id)['status'], 'done')
+        queue.shutdown()
+
+    def test_unknown_job(self):
+        queue = InlineJobQueue()
+        with self.assertRaises(JobNotFoundError):
+            queue.status('missing')
+
+    def test_inline_queue(self):
+        queue = InlineJobQueue()
+        job_id = queue.submit('pow', pow, 3, 2)
+        self.assertEqual(queue.status(job_id)['result'], 9)
+        self.assertFalse(queue.cancel(job_id))
+        with self.assertLogs('src.app.jobs', level='ERROR'):
+            self.assertEqual(queue.status(queue.submit('fail', fail, 'boom'))['status'], 'failed')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,64 @@
+import unittest
+
+import networkx as nx
+import numpy as np
+from qiskit.quantum_info import Statevector
+
+from algorithms.numpy_qaoa import NumpyQAOA, cost_diagonal
+from Framework.profiling import Profiler
+
+
+def maxcut_engine(graph, p):
+    # minimizing sum_ij Z_i Z_j over the edges maximizes the cut
+    return NumpyQAOA(graph.number_of_nodes(), [list(edge) for edge in graph.edges],
+                     [1.0] * graph.number_of_edges(), p=p)
+
+
+class MyTestCase(unittest.TestCase):
+    def test_cost_diagonal(self):
+        cost = cost_diagonal(3, [[0, 1], [2], [0, 1, 2]], [1.0, 2.0, 0.5], constant=1.0)
+        for index in range(8):
+            z = [1 - 2 * ((index >> qubit) & 1) for qubit in range(3)]
+            expected = z[0] * z[1] + 2.0 * z[2] + 0.5 * z[0] * z[1] * z[2] + 1.0
+            self.assertAlmostEqual(cost[index], expected)
+
+    def test_matches_circuit(self):
+        rng = np.random.default_rng(3)
+        engine = NumpyQAOA(4, [[0, 1], [1, 2], [2, 3], [0], [0, 2, 3]], rng.normal(size=5), p=2)
+        params = rng.normal(size=(3, 4))
+        states = engine.states(params)
+        for row, angles in enumerate(params):
+            reference = Statevector(engine.circuit(angles)).data
+            self.assertAlmostEqual(abs(np.vdot(reference, states[row])), 1.0)
+
+    def test_gradient(self):
+        rng = np.random.default_rng(5)
+        engine = maxcut_engine(nx.cycle_graph(5), p=3)
+        params = rng.normal(size=(2, 6))
+        energies, gradients = engine.gradient(params)
+        np.testing.assert_allclose(energies, engine.expectation(params))
+        step = 1e-6
+        for j in range(6):
+            shift = np.zeros(6)
+            shift[j] = step
+            numeric = (engine.expectation(params + shift) - engine.expectation(params - shift)) / (2 * step)
+            np.testing.assert_allclose(gradients[:, j], numeric, atol=1e-6)
+
+    def test_optimize_maxcut(self):
+        graph = nx.cycle_graph(6)
+        engine = maxcut_engine(graph, p=2)
+        profiler = Profiler()
+        result = engine.optimize(seed=0, profiler=profiler)
+        self.assertLess(result.optimized['cost'], engine.expectation([0.0] * 4)[0])
+        self.assertEqual(result.most_probable_states['bitstring_energy'], engine.cost.min())
+        for solution in result.most_probable_states['solutions_bitstrings']:
+            self.assertEqual(nx.cut_size(graph, [node for node, bit in enumerate(solution) if bit == '1']), 6)
+        self.assertGreater(profiler.counters()['qaoa.optimize.gradient_evaluations'], 0)
+
+    def test_too_many_qubits(self):
+        with self.assertRaises(ValueError):
+            NumpyQAOA(40, [[0, 1]], [1.0])
+
+
+if __name__ == '__main__':
+    unittest.main()
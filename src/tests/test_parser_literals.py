@@ -0,0 +1,50 @@
+import unittest
+
+import numpy as np
+
+from Framework.parser import BULK_LITERAL_CHARS, ProblemParser, elide_literals
+
+EDGES = ", ".join(f"({i}, {i + 1}, {i * 0.5})" for i in range(300))
+
+
+class MyTestCase(unittest.TestCase):
+    def test_elided(self):
+        source, literals = elide_literals(f"G.add_edges_from([\n{EDGES}\n])\nx = [1, 2]\n")
+        self.assertEqual(list(literals), ['__classiq_literal_0__'])
+        # placeholders keep the line numbers of the script
+        self.assertEqual(source, "G.add_edges_from((__classiq_literal_0__\n\n))\nx = [1, 2]\n")
+        edges = literals['__classiq_literal_0__']
+        self.assertEqual(edges[3], [3, 4, 1.5])
+        self.assertIsInstance(edges[0][0], int)
+
+    def test_left_to_the_visitor(self):
+        short = "x = [1, 2, 3]\n"
+        expressions = "x = [" + ", ".join(f"({i}, {i} + 1)" for i in range(300)) + "]\n"
+        grouping = "x = [" + ", ".join(f"({i})" for i in range(400)) + "]\n"
+        subscript = "y = x[" + "+".join(['1'] * BULK_LITERAL_CHARS) + "]\n"
+        for source in (short, expressions, grouping, subscript):
+            self.assertEqual(elide_literals(source), (source, {}))
+
+    def test_parsed_values(self):
+        matrix = np.arange(-200, 200).reshape(20, 20)
+        parser = ProblemParser()
+        parser.parse_code(f"import numpy as np\nmatrix = np.array({matrix.tolist()})\nobservable = 1\n")
+        self.assertEqual(parser.problem_type.name, 'EIGENVALUE')
+        np.testing.assert_array_equal(parser.data, matrix)
+        self.assertEqual(parser.data.dtype, matrix.dtype)
+        self.assertEqual(parser.diagnostics['bulk_literals'], 1)
+        self.assertIn('extraction_seconds', parser.diagnostics)
+
+        parser.parse_code(f"import networkx as nx\nG = nx.Graph()\nG.add_edges_from([{EDGES}])\nmaxcut(G)\n")
+        self.assertEqual(parser.data.number_of_edges(), 300)
+        self.assertEqual(parser.data[3][4]['weight'], 1.5)
+
+    def test_placeholder_in_string(self):
+        parser = ProblemParser()
+        parser.parse_code(f"note = '[{EDGES}]'\nedges = [(0, 1)]\n")
+        self.assertEqual(parser.diagnostics['bulk_literals'], 0)
+        self.assertEqual(parser.visitor.variables['note'], f'[{EDGES}]')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,46 @@
+import unittest
+
+from Framework.parser import KeywordIndex, ProblemParser, ProblemType
+
+MAXCUT_AND_CLIQUE = """
+import networkx as nx
+
+def max_cut(G):
+    return find_clique(G)
+
+G = nx.Graph()
+G.add_edges_from([(0, 1), (1, 2)])
+max_cut(G)
+"""
+
+
+class MyTestCase(unittest.TestCase):
+    def test_index(self):
+        index = KeywordIndex({'graph': ['tsp', 'path'], 'tsp': ['tsp_brute_force'], 'sum': ['sum']})
+        # the longest keyword at a position carries the groups of its prefixes
+        self.assertEqual(index.contained('my_tsp_brute_force'), {'graph', 'tsp'})
+        self.assertEqual(index.contained('pathsum'), {'graph', 'sum'})
+        self.assertEqual(index.contained('nothing'), set())
+        self.assertEqual(index.exact('tsp'), {'graph'})
+        self.assertEqual(index.exact('my_tsp'), set())
+
+    def test_precedence_and_scores(self):
+        parser = ProblemParser()
+        parser.parse_code(MAXCUT_AND_CLIQUE)
+        self.assertEqual(parser.problem_type, ProblemType.GRAPH)
+        # clique keywords take precedence over max cut ones
+        self.assertEqual(parser.specific_graph_problem, 'Clique Problem')
+        scores = parser.signal_scores()
+        self.assertEqual(scores['graph_problems'], {'Clique Problem': 1, 'MaximumCut': 1})
+        self.assertEqual(scores['problem_types']['imports'], {'GRAPH': 1})
+        self.assertEqual(scores['problem_types']['variables'], {'GRAPH': 1})
+        # the tree is walked once
+        self.assertEqual([function['name'] for function in parser.visitor.functions], ['max_cut'])
+
+    def test_conflict(self):
+        with self.assertRaisesRegex(ValueError, 'GRAPH and MACHINELEARNING'):
+            ProblemParser().parse_code('import networkx\nimport sklearn\n')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,59 @@
+import json
+import logging
+import unittest
+
+from Framework.generator import QASMGenerator
+from Framework.profiling import Profiler, NULL_PROFILER
+
+factor_code = """
+def factorize(n):
+    return [d for d in range(2, n) if n % d == 0]
+
+n = 15
+factors = factorize(n)
+"""
+
+
+class MyTestCase(unittest.TestCase):
+    def test_nested_spans(self):
+        profiler = Profiler()
+        with profiler.span('solve'):
+            for _ in range(2):
+                with profiler.span('optimize') as span:
+                    span.count('evaluations', 3)
+        with self.assertRaises(ValueError):
+            with profiler.span('export'):
+                raise ValueError
+        report = profiler.report()
+        self.assertEqual([span['name'] for span in report], ['solve', 'export'])
+        self.assertEqual(len(report[0]['children']), 2)
+        self.assertEqual(report[1]['error'], 'ValueError')
+        self.assertEqual(profiler.counters(), {'optimize.evaluations': 6})
+        self.assertEqual(set(profiler.totals()), {'solve', 'optimize', 'export'})
+
+    def test_null_profiler(self):
+        with NULL_PROFILER.span('optimize', engine='sampler') as span:
+            span.count('evaluations')
+            span.set(qubits=3)
+        self.assertEqual(NULL_PROFILER.report(), [])
+
+    def test_generator_profile(self):
+        generator = QASMGenerator()
+        generator.qasm_generate(factor_code)
+        self.assertIn('optimize', generator.timings)
+        self.assertNotIn('grover.amplify', generator.timings)
+
+        with self.assertLogs('Framework.generator', level=logging.INFO) as logs:
+            generator = QASMGenerator(profile=True, log_spans=True)
+            generator.qasm_generate(factor_code)
+        report = generator.profile_report()
+        self.assertIn('grover.amplify.rounds', report['counters'])
+        solve = next(span for span in report['spans'] if span['name'] == 'solve')
+        optimize = next(span for span in solve['children'] if span['name'] == 'optimize')
+        self.assertEqual(optimize['children'][0]['attributes']['circuits']['grover']['qubits'], 9)
+        paths = [json.loads(record.getMessage())['span'] for record in logs.records]
+        self.assertIn('solve/optimize/grover.amplify', paths)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,56 @@
+import os
+import tempfile
+import unittest
+
+import networkx as nx
+
+from algorithms.numpy_qaoa import NumpyQAOA
+from algorithms.qaoa_parameters import ParameterStore, interpolate_angles
+
+
+class MyTestCase(unittest.TestCase):
+    def test_interpolate(self):
+        self.assertEqual(interpolate_angles([1.0]), [1.0, 1.0])
+        self.assertEqual(interpolate_angles([0.2, 0.6]), [0.2, 0.4, 0.6])
+
+    def test_nearest_and_interpolated(self):
+        store = ParameterStore()
+        self.assertIsNone(store.initial_angles('MaximumCut', 2, nx.cycle_graph(6)))
+        store.record('MaximumCut', 1, nx.cycle_graph(6), [0.3], [0.2])
+        angles, source = store.initial_angles('MaximumCut', 2, nx.cycle_graph(7))
+        self.assertEqual(source, 'interpolated')
+        self.assertEqual(angles, {'gammas': [0.3, 0.3], 'betas': [0.2, 0.2]})
+        store.record('MaximumCut', 2, nx.cycle_graph(6), [0.1, 0.2], [0.4, 0.3])
+        self.assertEqual(store.initial_angles('MaximumCut', 2, nx.cycle_graph(7))[1], 'nearest')
+        # too different a graph, or another problem class
+        self.assertIsNone(store.initial_angles('MaximumCut', 2, nx.complete_graph(12)))
+        self.assertIsNone(store.initial_angles('MIS', 2, nx.cycle_graph(6)))
+
+    def test_persisted(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'angles.json')
+            ParameterStore(path).record('MaximumCut', 1, nx.cycle_graph(6), [0.3], [0.2], evaluations=10)
+            store = ParameterStore(path)
+            self.assertEqual(len(store), 1)
+            self.assertEqual(store.report()['MaximumCut/1']['cold_runs'], 1)
+
+    def test_warm_start_saves_evaluations(self):
+        store = ParameterStore()
+        for seed in range(6):
+            graph = nx.random_regular_graph(3, 8, seed=seed)
+            engine = NumpyQAOA(8, [list(edge) for edge in graph.edges], [1.0] * graph.number_of_edges(), p=2)
+            warm = store.initial_angles('MaximumCut', 2, graph)
+            if warm is None:
+                result = engine.optimize(seed=0)
+            else:
+                result = engine.optimize(initial=warm[0]['gammas'] + warm[0]['betas'], starts=1, seed=0)
+            angles = result.optimized['angles']
+            store.record('MaximumCut', 2, graph, angles[:2], angles[2:],
+                         evaluations=result.evals['number_of_evals'], warm=warm is not None)
+        report = store.report()['MaximumCut/2']
+        self.assertEqual((report['cold_runs'], report['warm_runs']), (1, 5))
+        self.assertGreater(report['savings'], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
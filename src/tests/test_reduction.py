@@ -0,0 +1,123 @@
+import itertools
+import unittest
+from unittest import mock
+
+import networkx as nx
+
+from Framework.generator import QASMGenerator
+from applications.graph.reduction import reduce_graph, is_solution, ising_assignment
+
+
+def brute_force(graph, values, valid, score):
+    """Best assignment of `values` to the nodes of a small graph."""
+    candidates = (dict(enumerate(bits)) for bits in itertools.product(values, repeat=graph.number_of_nodes()))
+    return max((candidate for candidate in candidates if valid(graph, candidate)), key=lambda c: score(graph, c))
+
+
+def independent(graph, values):
+    return all(not (values[u] and values[v]) for u, v in graph.edges)
+
+
+def cut_weight(graph, values):
+    return sum(data.get('weight', 1) for u, v, data in graph.edges(data=True) if values[u] != values[v])
+
+
+class MyTestCase(unittest.TestCase):
+    def test_tree_solved_classically(self):
+        reduction = reduce_graph(nx.balanced_tree(2, 3), 'MIS')
+        self.assertEqual(reduction.subproblems, [])
+        independent_set = reduction.lift([])
+        self.assertTrue(independent(nx.balanced_tree(2, 3), independent_set))
+        self.assertEqual(sum(independent_set.values()), 10)
+
+    def test_components_relabelled(self):
+        graph = nx.relabel_nodes(nx.disjoint_union(nx.complete_graph(4), nx.cycle_graph(5)),
+                                 {node: node + 10 for node in range(9)})
+        # the pendant node 30 is in the independent set, 10 is not
+        graph.add_edge(30, 10)
+        reduction = reduce_graph(graph, 'MIS')
+        self.assertEqual([sorted(sub.nodes) for sub in reduction.subproblems], [[0, 1, 2], [0, 1, 2, 3, 4]])
+        self.assertEqual(reduction.mappings[0], [11, 12, 13])
+        self.assertEqual(reduction.mappings[1], [14, 15, 16, 17, 18])
+        self.assertEqual(reduction.removed, 2)
+
+    def test_lift_is_optimal(self):
+        for seed in range(20):
+            graph = nx.gnm_random_graph(9, 11, seed=seed)
+            for u, v in graph.edges:
+                graph[u][v]['weight'] = (u * 7 + v) % 4 - 1
+
+            reduction = reduce_graph(graph, 'MIS')
+            solutions = [brute_force(sub, (0, 1), independent, lambda g, c: sum(c.values()))
+                         for sub in reduction.subproblems]
+            lifted = reduction.lift(solutions)
+            self.assertTrue(independent(graph, lifted))
+            best = brute_force(graph, (0, 1), independent, lambda g, c: sum(c.values()))
+            self.assertEqual(sum(lifted.values()), sum(best.values()))
+
+            cover = reduce_graph(graph, 'MinimumVertexCover')
+            solutions = [{node: 1 - value for node, value in
+                          brute_force(sub, (0, 1), independent, lambda g, c: sum(c.values())).items()}
+                         for sub in cover.subproblems]
+            lifted = cover.lift(solutions)
+            self.assertTrue(all(lifted[u] or lifted[v] for u, v in graph.edges))
+            self.assertEqual(sum(lifted.values()), graph.number_of_nodes() - sum(best.values()))
+
+            reduction = reduce_graph(graph, 'MaximumCut')
+            solutions = [brute_force(sub, (0, 1), lambda g, c: True, cut_weight) for sub in reduction.subproblems]
+            best = brute_force(graph, (0, 1), lambda g, c: True, cut_weight)
+            self.assertEqual(cut_weight(graph, reduction.lift(solutions)), cut_weight(graph, best))
+
+    def test_coloring(self):
+        graph = nx.complete_graph(4)
+        graph.add_edges_from([(3, 4), (4, 5), (5, 6), (6, 4)])
+        reduction = reduce_graph(graph, 'KColor', colors=4)
+        self.assertEqual(reduction.subproblems, [])
+        colors = reduction.lift([])
+        self.assertTrue(all(colors[u] != colors[v] for u, v in graph.edges))
+        self.assertLess(max(colors.values()), 4)
+
+    def test_other_problems_untouched(self):
+        reduction = reduce_graph(nx.path_graph(4), 'TSP')
+        self.assertEqual(len(reduction.subproblems), 1)
+        self.assertEqual(reduction.lift(['0110']), {0: 0, 1: 1, 2: 1, 3: 0})
+
+    def test_generator_lifts_solution(self):
+        code = "import networkx as nx\nedges = {}\nG = nx.Graph()\nG.add_edges_from(edges)\n" \
+               "independent_set = nx.maximal_independent_set(G)\n"
+        # solved entirely by the rules: no circuit, the solution and its image all the same
+        tree = nx.balanced_tree(2, 3)
+        generator = QASMGenerator(presolve=True)
+        artifacts, img_ios = generator.qasm_generate(code.format(list(tree.edges)))
+        self.assertEqual(artifacts, {})
+        self.assertTrue(independent(tree, generator.solution))
+        self.assertEqual(sum(generator.solution.values()), 10)
+        self.assertIn('presolve', img_ios)
+
+        # solutions of the components, found by brute force here, mapped back to the original nodes
+        graph = nx.relabel_nodes(nx.disjoint_union(nx.complete_graph(4), nx.cycle_graph(5)),
+                                 {node: node + 10 for node in range(9)})
+        graph.add_edge(30, 10)
+
+        def solve(sub, *args):
+            return brute_force(sub, (0, 1), independent, lambda g, c: sum(c.values()))
+        generator = QASMGenerator(presolve=True, render_images=False)
+        with mock.patch.object(QASMGenerator, '_solve_graph_instance', side_effect=solve):
+            generator.qasm_generate(code.format(list(graph.edges)))
+        self.assertEqual(sorted(generator.solution), sorted(graph.nodes))
+        self.assertTrue(independent(graph, generator.solution))
+        self.assertEqual(sum(generator.solution.values()), 4)
+
+    def test_solution_decoding(self):
+        path = nx.path_graph(3)
+        self.assertEqual(ising_assignment('010', 3, 'MIS'), {0: 0, 1: 1, 2: 0})
+        self.assertTrue(is_solution(path, 'MinimumVertexCover', ising_assignment('010', 3, 'MinimumVertexCover')))
+        self.assertFalse(is_solution(path, 'MIS', ising_assignment('110', 3, 'MIS')))
+        colors = ising_assignment('0100' '1000' '0100', 3, 'KColor')
+        self.assertEqual(colors, {0: 1, 1: 0, 2: 1})
+        self.assertTrue(is_solution(path, 'KColor', colors))
+        self.assertIsNone(ising_assignment('1100' '1000' '0100', 3, 'KColor'))
+
+
+if __name__ == '__main__':
+    unittest.main()
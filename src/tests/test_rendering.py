@@ -0,0 +1,88 @@
+import os
+import tempfile
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
+from qiskit.utils import optionals
+
+from src.app.rendering import CircuitRenderer, qasm_hash
+
+bell = """OPENQASM 2.0;
+include "qelib1.inc";
+qreg q[2];
+h q[0];
+cx q[0],q[1];
+"""
+
+addition_code = """
+left = 4
+right = 5
+sum = addition(left, right)
+"""
+
+
+class MyTestCase(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.directory = tempfile.TemporaryDirectory()
+        cls.environ = mock.patch.dict(os.environ, {
+            'CLASSIQ_CACHE_DIR': os.path.join(cls.directory.name, 'results'),
+            'CLASSIQ_RENDER_CACHE_DIR': os.path.join(cls.directory.name, 'circuits')})
+        cls.environ.start()
+        from src.app.app import app
+        from src.app import tasks
+        tasks.circuit_renderer = CircuitRenderer(directory=os.path.join(cls.directory.name, 'circuits'),
+                                                 executor=ThreadPoolExecutor(max_workers=1))
+        cls.client = app.test_client()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.environ.stop()
+        cls.directory.cleanup()
+
+    @unittest.skipUnless(optionals.HAS_PYLATEX, "the matplotlib circuit drawer needs pylatexenc")
+    def test_cached_by_qasm_hash(self):
+        with tempfile.TemporaryDirectory() as directory:
+            renderer = CircuitRenderer(directory=directory, executor=ThreadPoolExecutor(max_workers=1))
+            png = renderer.render(bell)
+            self.assertTrue(png.startswith(b'\x89PNG'))
+            self.assertEqual(renderer.render('\n' + bell + '\n'), png)
+            self.assertEqual(renderer.stats()['hits'], 1)
+            self.assertNotEqual(qasm_hash(bell), qasm_hash(bell, decompose=True))
+            restarted = CircuitRenderer(directory=directory, executor=ThreadPoolExecutor(max_workers=1))
+            self.assertEqual(restarted.cached(qasm_hash(bell)), png)
+
+    def test_rendered_by_another_process(self):
+        from src.app import app as app_module
+        directory = app_module.circuit_renderer._disk.directory
+        # a renderer of its own, as in a job worker process, writing to the shared directory
+        key = qasm_hash(bell + '// worker\n')
+        CircuitRenderer(directory=directory)._store(key, b'\x89PNG worker')
+        response = self.client.get(f'/render_circuit/{key}.png')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data, b'\x89PNG worker')
+        self.assertEqual(self.client.get('/render_circuit/..png').status_code, 404)
+
+    def test_invalid_qasm_not_cached(self):
+        renderer = CircuitRenderer(executor=ThreadPoolExecutor(max_workers=1))
+        with self.assertRaises(Exception):
+            renderer.render('OPENQASM 2.0; qreg q[1]; foo q[0];')
+        self.assertEqual(renderer.stats()['memory_entries'], 0)
+
+    def test_images_flag(self):
+        result = self.client.post('/generate_circuit', json={'classical_code': addition_code, 'images': False}).json
+        self.assertNotIn('circuit_image', result)
+        self.assertEqual(result['img_ios'], {})
+        self.assertEqual(result['qasm_hash']['QFT'], qasm_hash(result['qasm_code']['QFT']))
+        self.assertEqual(self.client.get(f"/render_circuit/{result['qasm_hash']['QFT']}.png").status_code, 404)
+
+    @unittest.skipUnless(optionals.HAS_PYLATEX, "the matplotlib circuit drawer needs pylatexenc")
+    def test_render_endpoint(self):
+        rendered = self.client.post('/render_circuit', json={'qasm': bell}).json
+        self.assertTrue(rendered['circuit_image'].startswith('data:image/png;base64,'))
+        self.assertEqual(self.client.get(f'/render_circuit/{qasm_hash(bell)}.png').mimetype, 'image/png')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,108 @@
+import tempfile
+import unittest
+
+import networkx as nx
+import numpy as np
+
+from Framework.cache import ResultCache, problem_key
+from Framework.parser import ProblemParser, ProblemType
+
+maxcut_code = """
+import networkx as nx
+
+def maxcut_bruteforce(G):
+    return 0
+
+G = nx.Graph()
+G.add_edges_from([(0, 1), (1, 2), (2, 0), (2, 3)])
+maxcut_bruteforce(G)
+"""
+
+maxcut_code_reformatted = """
+import networkx as nx
+def maxcut_bruteforce(graph):
+    return 0
+my_graph = nx.Graph()
+my_graph.add_edges_from([(2, 3),
+                         (1, 0), (1, 2),
+                         (0, 2)])
+maxcut_bruteforce(my_graph)
+"""
+
+
+class MyTestCase(unittest.TestCase):
+    def test_same_problem_same_key(self):
+        parser = ProblemParser()
+        parser.parse_code(maxcut_code)
+        key = ResultCache.key_for(parser)
+        parser.parse_code(maxcut_code_reformatted)
+        self.assertEqual(key, ResultCache.key_for(parser))
+
+    def test_different_problem_different_key(self):
+        g1 = nx.Graph([(0, 1), (1, 2)])
+        g2 = nx.Graph([(0, 1), (1, 3)])
+        self.assertNotEqual(problem_key(ProblemType.GRAPH, 'MaximumCut', g1),
+                            problem_key(ProblemType.GRAPH, 'MaximumCut', g2))
+        self.assertNotEqual(problem_key(ProblemType.GRAPH, 'MaximumCut', g1),
+                            problem_key(ProblemType.GRAPH, 'MIS', g1))
+
+    def test_numeric_literals_normalized(self):
+        self.assertEqual(problem_key(ProblemType.EIGENVALUE, None, np.array([[1, 0], [0, 1]])),
+                         problem_key(ProblemType.EIGENVALUE, None, np.array([[1.0, 0.0], [0.0, 1.0]])))
+
+    def test_lru_eviction(self):
+        cache = ResultCache(max_entries=2)
+        cache.put('a', {'grover': 'a'}, {})
+        cache.put('b', {'grover': 'b'}, {})
+        cache.get('a')
+        cache.put('c', {'grover': 'c'}, {})
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.get('a'), ({'grover': 'a'}, {}))
+        self.assertEqual(cache.stats()['memory_entries'], 2)
+
+    def test_disk_survives_restart(self):
+        with tempfile.TemporaryDirectory() as directory:
+            cache = ResultCache(directory=directory)
+            cache.put('key', {'qaoa': 'OPENQASM 2.0;'}, {'qaoa': 'png'})
+            restarted = ResultCache(directory=directory)
+            self.assertEqual(restarted.get('key'), ({'qaoa': 'OPENQASM 2.0;'}, {'qaoa': 'png'}))
+            self.assertEqual(restarted.stats()['hits'], 1)
+
+    def test_disk_size_bound(self):
+        with tempfile.TemporaryDirectory() as directory:
+            cache = ResultCache(directory=directory, max_entries=1, disk_max_entries=2)
+            for key in 'abc':
+                cache.put(key, {'grover': key}, {})
+            restarted = ResultCache(directory=directory)
+            self.assertIsNone(restarted.get('a'))
+            self.assertIsNotNone(restarted.get('c'))
+
+    def test_disk_shared_between_processes(self):
+        with tempfile.TemporaryDirectory() as directory:
+            # two caches on one directory, as in two worker processes
+            first = ResultCache(directory=directory, disk_max_entries=3)
+            second = ResultCache(directory=directory, disk_max_entries=3)
+            first.put('a', {'grover': 'a'}, {})
+            second.put('b', {'grover': 'b'}, {})
+            second.put('c', {'grover': 'c'}, {})
+            self.assertEqual(second.get('a'), ({'grover': 'a'}, {}))
+            # the read refreshed 'a' for both, 'b' is now the least recently used
+            first.put('d', {'grover': 'd'}, {})
+            # the bound holds for the directory, not per cache
+            self.assertEqual(second.stats()['disk_entries'], 3)
+            self.assertIsNone(ResultCache(directory=directory).get('b'))
+            self.assertIsNotNone(ResultCache(directory=directory).get('a'))
+
+    def test_eigenvalue_hit_keeps_observable(self):
+        from Framework.generator import QASMGenerator
+        code = "import numpy as np\nmatrix = np.array([[1, 0], [0, -1]])\neigenvalues = np.linalg.eigvals(matrix)\n"
+        cache = ResultCache()
+        QASMGenerator(cache=cache, render_images=False).qasm_generate(code)
+        generator = QASMGenerator(cache=cache, render_images=False)
+        generator.qasm_generate(code)
+        self.assertEqual(cache.stats()['hits'], 1)
+        self.assertEqual(generator.observable.to_list(), [('Z', 1.0)])
+
+
+if __name__ == '__main__':
+    unittest.main()
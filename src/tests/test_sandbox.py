@@ -0,0 +1,60 @@
+import os
+import unittest
+
+import numpy as np
+
+from Framework.sandbox import SandboxPool
+from src.classiq_exceptions import SandboxError
+
+DATASET = """
+import numpy as np
+X = np.arange(40, dtype=float).reshape(20, 2)
+y = np.arange(20) % 2
+X_train, X_test, y_train, y_test = X[:15], X[15:], y[:15], y[15:]
+"""
+NAMES = ('X_train', 'y_train', 'X_test', 'y_test')
+
+
+class MyTestCase(unittest.TestCase):
+    def setUp(self):
+        self.pool = SandboxPool(max_jobs=2, cpu_seconds=1, memory_bytes=2 * 1024 ** 3, timeout=20,
+                                warm_modules=('numpy',))
+
+    def tearDown(self):
+        self.pool.shutdown()
+
+    def test_shared_arrays(self):
+        values = self.pool.run(DATASET, NAMES)
+        np.testing.assert_array_equal(values['X_train'], np.arange(30).reshape(15, 2))
+        np.testing.assert_array_equal(values['y_test'], [1, 0, 1, 0, 1])
+        # mapped from shared memory, copy on write
+        self.assertIsInstance(values['X_train'], np.memmap)
+        values['X_train'][0, 0] = -1.0
+        self.assertEqual(os.listdir(self.pool._directory), [])
+
+    def test_errors(self):
+        with self.assertRaisesRegex(SandboxError, 'ZeroDivisionError'):
+            self.pool.run("X_train = 1 / 0\n", NAMES)
+        with self.assertRaisesRegex(SandboxError, 'does not define y_train, X_test, y_test'):
+            self.pool.run("X_train = [1.0]\n", NAMES)
+
+    def test_limits(self):
+        with self.assertRaisesRegex(SandboxError, 'did not finish within 1 s'):
+            self.pool.run("import time\ntime.sleep(30)\n", NAMES, timeout=1)
+        with self.assertRaisesRegex(SandboxError, 'CPU time limit'):
+            self.pool.run("while True:\n    pass\n", NAMES)
+        with self.assertRaisesRegex(SandboxError, 'MemoryError'):
+            self.pool.run("import numpy as np\nX_train = np.ones(2 ** 31)\n", NAMES)
+        self.assertEqual(self.pool.stats()['killed'], 2)
+        # the killed workers were replaced
+        self.assertEqual(self.pool.run(DATASET, NAMES)['y_train'].shape, (15,))
+
+    def test_recycled(self):
+        pids = [int(self.pool.run("import os\npid = os.getpid()\n", ('pid',))['pid']) for _ in range(3)]
+        self.assertEqual(pids[0], pids[1])
+        self.assertNotEqual(pids[1], pids[2])
+        self.assertEqual(self.pool.stats()['recycled'], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
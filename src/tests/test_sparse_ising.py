@@ -0,0 +1,66 @@
+import unittest
+
+import numpy as np
+from qiskit_optimization import QuadraticProgram
+from qiskit_optimization.translators import from_docplex_mp
+
+from algorithms.numpy_qaoa import NumpyQAOA
+from applications.quadratic_program import SparseIsing
+
+
+def random_program(seed, maximize=False):
+    rng = np.random.default_rng(seed)
+    program = QuadraticProgram()
+    program.binary_var_list(5)
+    quadratic = {(int(i), int(j)): float(rng.normal()) for i, j in rng.integers(0, 5, (6, 2))}
+    (program.maximize if maximize else program.minimize)(constant=1.5, linear=rng.normal(size=5),
+                                                         quadratic=quadratic)
+    return program
+
+
+class MyTestCase(unittest.TestCase):
+    def test_canonical_form(self):
+        ising = SparseIsing(3, [2, 0, 2], [1.0, 0.0, 2.0], [1, 0, 2, 1], [0, 1, 2, 2], [1.0, 2.0, 5.0, -1.0], 1.0)
+        np.testing.assert_array_equal(ising.linear_indices, [2])
+        np.testing.assert_array_equal(ising.linear_weights, [3.0])
+        np.testing.assert_array_equal(np.stack((ising.rows, ising.cols)), [[0, 1], [1, 2]])
+        np.testing.assert_array_equal(ising.quadratic_weights, [3.0, -1.0])
+        self.assertEqual(ising.offset, 6.0)
+        self.assertEqual(ising.rows.dtype, np.int32)
+        with self.assertRaises(ValueError):
+            SparseIsing(2, rows=[0], cols=[2], quadratic_weights=[1.0])
+
+    def test_matches_qiskit_to_ising(self):
+        for seed in range(6):
+            program = random_program(seed, maximize=seed % 2 == 1)
+            operator, offset = program.to_ising()
+            ising = SparseIsing.from_quadratic_program(program)
+            self.assertAlmostEqual(ising.offset, offset)
+            np.testing.assert_allclose(ising.to_sparse_pauli_op().to_matrix(), operator.to_matrix(), atol=1e-12)
+            sign = -1 if seed % 2 else 1
+            expected = [sign * program.objective.evaluate([(index >> i) & 1 for i in range(5)])
+                        for index in range(32)]
+            np.testing.assert_allclose(ising.diagonal(), expected)
+
+    def test_round_trips(self):
+        ising = SparseIsing.from_quadratic_program(random_program(7))
+        for program in (ising.to_quadratic_program(), from_docplex_mp(ising.to_docplex())):
+            np.testing.assert_allclose(SparseIsing.from_quadratic_program(program).diagonal(), ising.diagonal())
+
+    def test_maxcut(self):
+        ising = SparseIsing.from_maxcut([0, 1, 2], [1, 2, 0], [1.0, 2.0, 3.0])
+        # the best cut separates node 2 from the others
+        self.assertEqual(ising.diagonal().min(), -5.0)
+        self.assertEqual(int(np.argmin(ising.diagonal())), 3)
+        engine = NumpyQAOA.from_ising(ising)
+        np.testing.assert_allclose(engine.cost, ising.diagonal())
+
+    def test_empty(self):
+        ising = SparseIsing(2, offset=1.0)
+        self.assertEqual(ising.num_terms, 0)
+        np.testing.assert_array_equal(ising.diagonal(), [1.0] * 4)
+        self.assertEqual(ising.to_sparse_pauli_op().num_qubits, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,81 @@
+import unittest
+
+import numpy as np
+from qiskit import QuantumCircuit
+from qiskit.circuit.library import TwoLocal
+from qiskit.quantum_info import Operator
+
+from Framework.artifact import CircuitArtifact
+from Framework.transpile_cache import TranspileCache, structural_hash
+
+
+def bell(angle=0.5):
+    circuit = QuantumCircuit(2)
+    circuit.h(0)
+    circuit.cx(0, 1)
+    circuit.rz(angle, 1)
+    return circuit
+
+
+def oracle(flip):
+    gate = QuantumCircuit(2, name='oracle')
+    gate.cz(0, 1) if flip else gate.cx(0, 1)
+    circuit = QuantumCircuit(2)
+    circuit.append(gate.to_gate(), [0, 1])
+    return circuit
+
+
+class MyTestCase(unittest.TestCase):
+    def test_structural_hash(self):
+        self.assertEqual(structural_hash(bell()), structural_hash(bell()))
+        self.assertNotEqual(structural_hash(bell()), structural_hash(bell(0.25)))
+        # same gate name, other definition
+        self.assertNotEqual(structural_hash(oracle(True)), structural_hash(oracle(False)))
+
+    def test_hits_and_misses(self):
+        cache = TranspileCache()
+        compiled = cache.get(bell())
+        self.assertIs(cache.get(bell()), compiled)
+        measured = cache.get(bell(), measure=True)
+        self.assertEqual(measured.count_ops().get('measure'), 2)
+        cache.get(bell(), optimization_level=2)
+        stats = cache.stats()
+        self.assertEqual((stats['hits'], stats['misses'], stats['entries']), (1, 3, 3))
+
+    def test_bounded(self):
+        cache = TranspileCache(max_entries=2)
+        for angle in (0.1, 0.2, 0.3):
+            cache.get(bell(angle))
+        self.assertEqual(len(cache), 2)
+        self.assertEqual(cache.stats()['evictions'], 1)
+        cache = TranspileCache(max_operations=2)
+        cache.get(bell())
+        self.assertEqual(len(cache), 0)
+
+    def test_bind_after_transpile(self):
+        cache = TranspileCache()
+        values = np.linspace(0.1, 1.2, TwoLocal(3, ['ry', 'rz'], 'cz', reps=1).num_parameters)
+        for scale in (1, 2):
+            # a new ansatz each time, equal in structure but with its own Parameter objects
+            ansatz = TwoLocal(3, ['ry', 'rz'], 'cz', reps=1)
+            bound = cache.bind(ansatz, values * scale)
+            self.assertEqual(bound.num_parameters, 0)
+            self.assertTrue(Operator(bound).equiv(Operator(ansatz.assign_parameters(values * scale))))
+        self.assertEqual(cache.stats()['misses'], 1)
+        self.assertEqual(cache.stats()['bindings'], 2)
+        with self.assertRaises(ValueError):
+            cache.bind(ansatz, values[:-1])
+
+    def test_artifact_uses_cache(self):
+        cache = TranspileCache()
+        ansatz = TwoLocal(2, 'ry', 'cz', reps=1)
+        values = [0.3] * ansatz.num_parameters
+        artifact = CircuitArtifact(ansatz.assign_parameters(values), parameterized=ansatz, parameter_values=values)
+        artifact.transpiled(cache=cache)
+        CircuitArtifact(bell()).transpiled(cache=cache)
+        CircuitArtifact(bell()).transpiled(cache=cache)
+        self.assertEqual((cache.hits, cache.misses, cache.bindings), (1, 2, 1))
+
+
+if __name__ == '__main__':
+    unittest.main()
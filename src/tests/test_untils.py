@@ -21,6 +21,25 @@ class MyTestCase(unittest.TestCase):
         pauli_decomp = decompose_into_pauli(matrix)
         assert np.allclose(pauli_decomp.to_matrix(), matrix), "matrix is not a matrix"
 
+    def test_matrix_transition_random_hermitian(self):
+        rng = np.random.default_rng(7)
+        for n in range(1, 5):
+            a = rng.normal(size=(2 ** n, 2 ** n)) + 1j * rng.normal(size=(2 ** n, 2 ** n))
+            matrix = a + a.conj().T
+            pauli_decomp = decompose_into_pauli(matrix)
+            assert np.allclose(pauli_decomp.to_matrix(), matrix), "matrix is not a Pauli decomposition"
+
+    def test_matrix_transition_sparse(self):
+        from scipy.sparse import csr_matrix
+        matrix = np.array([[-2, 0, 0, -5], [0, 4, 1, 0], [0, 1, 4, 0], [-5, 0, 0, -2]])
+        pauli_decomp = decompose_into_pauli(csr_matrix(matrix))
+        assert np.allclose(pauli_decomp.to_matrix(), matrix), "matrix is not a Pauli decomposition"
+
+    def test_matrix_transition_drops_zero_terms(self):
+        matrix = np.diag([1, -1, 1, -1])
+        pauli_decomp = decompose_into_pauli(matrix)
+        self.assertEqual(pauli_decomp.paulis.to_labels(), ['IZ'])
+
     def test_num_qubits(self):
         assert qubit_num(2) == 1, "false"
         assert qubit_num(4) == 2, "false"
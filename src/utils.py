@@ -3,13 +3,13 @@ import math
 from io import BytesIO
 
 import numpy as np
-from matplotlib import pyplot as plt
-from qiskit.quantum_info import SparsePauliOp
+from qiskit.quantum_info import SparsePauliOp, PauliList
 from qiskit.quantum_info import Statevector
 from qiskit import QuantumRegister, ClassicalRegister, QuantumCircuit
 
 
 def plot_gen_img_io():
+    from matplotlib import pyplot as plt
     buf = BytesIO()
     plt.savefig(buf, format='png')
     buf.seek(0)
@@ -20,6 +20,7 @@ def plot_gen_img_io():
 
 
 def img_gen_img_io(img):
+    from matplotlib import pyplot as plt
     buf = BytesIO()
     img.figure.savefig(buf, format='png')
     buf.seek(0)
@@ -78,39 +79,102 @@ def generate_pauli_operators(n):
     return pauli_strings
 
 
-def decompose_into_pauli(matrix):
+def _walsh_hadamard(values):
+    """
+    Unnormalized Walsh-Hadamard transform along the last axis, in place.
+
+    Parameters:
+    values (numpy.ndarray): Array whose last dimension is a power of 2.
+
+    Returns:
+    numpy.ndarray: `values`, with values[..., z] = sum_c (-1)^popcount(z & c) values[..., c].
+    """
+    dim = values.shape[-1]
+    lead = values.shape[:-1]
+    h = 1
+    while h < dim:
+        view = values.reshape(lead + (dim // (2 * h), 2, h))
+        left = view[..., 0, :].copy()
+        view[..., 0, :] += view[..., 1, :]
+        view[..., 1, :] *= -1
+        view[..., 1, :] += left
+        h *= 2
+    return values
+
+
+def _popcount(values):
+    """Number of set bits of each entry of a non-negative integer array."""
+    values = values.copy()
+    count = np.zeros_like(values)
+    while np.any(values):
+        count += values & 1
+        values >>= 1
+    return count
+
+
+def _pauli_coefficients_dense(matrix, n):
+    # rows[x, c] = matrix[c ^ x, c]: every Pauli with X-part x only sees these entries
+    dim = 2 ** n
+    cols = np.arange(dim)
+    rows = np.bitwise_xor(cols[None, :], cols[:, None])
+    coeffs = np.asarray(matrix, dtype=complex)[rows, cols[None, :]]
+    return cols, _walsh_hadamard(coeffs)
+
+
+def _pauli_coefficients_sparse(matrix, n):
+    # group the non-zero entries by their X-part so only the populated x rows are transformed
+    coo = matrix.tocoo()
+    x_parts = np.bitwise_xor(coo.row, coo.col).astype(np.int64)
+    xs, group = np.unique(x_parts, return_inverse=True)
+    coeffs = np.zeros((len(xs), 2 ** n), dtype=complex)
+    np.add.at(coeffs, (group, coo.col), coo.data)
+    return xs, _walsh_hadamard(coeffs)
+
+
+def decompose_into_pauli(matrix, atol=1e-12):
     """
     Decompose a square matrix into a linear combination of Pauli matrices using SparsePauliOp,
     ignoring the imaginary part of the matrix.
 
+    The coefficient of the Pauli string with X-part x and Z-part z is
+    (-i)^popcount(x & z) / 2^n * sum_c (-1)^popcount(z & c) matrix[c ^ x, c], so all 4^n
+    coefficients are obtained with one Walsh-Hadamard transform per X-part, O(n 4^n),
+    without ever forming a Pauli matrix.
+
     Parameters:
-    matrix (numpy.ndarray): A square matrix with dimensions 2^k x 2^k.
+    matrix (numpy.ndarray or scipy.sparse matrix): A square matrix with dimensions 2^k x 2^k.
+    atol (float): Coefficients with an absolute value below this tolerance are dropped.
 
     Returns:
     SparsePauliOp: A SparsePauliOp object containing the linear combination of Pauli operators.
     """
     dim = matrix.shape[0]
-    if not (np.log2(dim) % 1 == 0):
+    if matrix.shape[0] != matrix.shape[1] or not (np.log2(dim) % 1 == 0):
         raise ValueError("Matrix dimension must be a power of 2.")
 
     n = int(np.log2(dim))
 
-    # Generate Pauli operators for n qubits
-    pauli_strings = generate_pauli_operators(n)
-    pauli_ops = [SparsePauliOp.from_list([(ps, 1)]).to_matrix() for ps in pauli_strings]
-
-    # Compute coefficients
-    coeffs = []
-    for pauli_matrix in pauli_ops:
-        coeff = np.trace(np.dot(matrix, pauli_matrix)) / (2 ** n)
-        if not np.isclose(np.imag(coeff), 0):
-            raise ValueError("Imaginary part of matrix is nonzero... Other words, the matrix provided is not "
-                             "representable by pauli matrix, maybe try another one??")
-        coeffs.append(coeff)
-    # Create SparsePauliOp with the coefficients
-    pauli_op = SparsePauliOp.from_list([(ps, coeff) for ps, coeff in zip(pauli_strings, coeffs)])
-
-    return pauli_op
+    if hasattr(matrix, 'tocoo'):
+        xs, coeffs = _pauli_coefficients_sparse(matrix, n)
+    else:
+        xs, coeffs = _pauli_coefficients_dense(matrix, n)
+    zs = np.arange(2 ** n)
+    # Y = iXZ, so each Y factor contributes a -i to the coefficient of the (x, z) string
+    phases = (-1j) ** (_popcount(xs[:, None] & zs[None, :]) % 4)
+    coeffs = coeffs * phases / (2 ** n)
+
+    if not np.allclose(np.imag(coeffs), 0):
+        raise ValueError("Imaginary part of matrix is nonzero... Other words, the matrix provided is not "
+                         "representable by pauli matrix, maybe try another one??")
+
+    x_idx, z_idx = np.nonzero(np.abs(coeffs) > atol)
+    if len(x_idx) == 0:
+        return SparsePauliOp.from_list([('I' * n, 0)])
+    bits = np.arange(n)
+    x = (xs[x_idx][:, None] >> bits) & 1
+    z = (zs[z_idx][:, None] >> bits) & 1
+    paulis = PauliList.from_symplectic(z.astype(bool), x.astype(bool))
+    return SparsePauliOp(paulis, coeffs[x_idx, z_idx])
 
 
 def decompose_into_pauli1(matrix):